@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from communication.protocol import create_message, TOPIC_AGENT_HEARTBEAT, TOPIC_SYSTEM_LOG
+from communication.request_reply import reply_to
+from config.settings import AGENT_HEARTBEAT_INTERVAL
+
+class AsyncBaseAgent:
+    """Coroutine counterpart of BaseAgent, run on an AsyncMessageBus event loop.
+
+    start(), stop() and join() keep the thread-agent signatures so main.py and the
+    cluster manager can drive both kinds of agent the same way.
+    """
+
+    def __init__(self, agent_id, message_bus):
+        self.agent_id = agent_id
+        self.message_bus = message_bus
+        self._is_running = True
+        self._stopped = None
+        self._future = None
+
+    def register_subscriptions(self):
+        pass
+
+    async def setup(self):
+        pass
+
+    async def run(self):
+        self._stopped = asyncio.Event()
+        if not self._is_running:
+            self._stopped.set()
+        self.log("Agent started.")
+        await self.setup()
+
+        while self._is_running:
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=AGENT_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                self.send_heartbeat()
+
+        await self.teardown()
+        self.log("Agent shutting down.")
+
+    async def teardown(self):
+        pass
+
+    def start(self):
+        self._future = asyncio.run_coroutine_threadsafe(self.run(), self.message_bus.loop)
+
+    def stop(self):
+        self._is_running = False
+        if self._stopped is not None:
+            self.message_bus.loop.call_soon_threadsafe(self._stopped.set)
+
+    def join(self, timeout=None):
+        if self._future is None:
+            return
+        try:
+            self._future.result(timeout)
+        except Exception:
+            pass
+
+    def send_message(self, topic, payload=None, recipient_id=None):
+        msg = create_message(topic, self.agent_id, payload, recipient_id)
+        return self.message_bus.send_message(msg)
+
+    def send_messages(self, messages):
+        batch = [create_message(topic, self.agent_id, payload, recipient_id) for topic, payload, recipient_id in messages]
+        return self.message_bus.send_messages(batch)
+
+    def reply(self, request, payload=None):
+        return self.message_bus.send_message(reply_to(request, self.agent_id, payload))
+
+    def send_heartbeat(self):
+        self.send_message(TOPIC_AGENT_HEARTBEAT)
+
+    def log(self, message, level=logging.INFO):
+        log_message = f"[{self.agent_id}] {message}"
+        logging.log(level, log_message)
+        self.send_message(TOPIC_SYSTEM_LOG, payload={"log": log_message})
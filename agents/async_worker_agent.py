@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import time
+from agents.async_base_agent import AsyncBaseAgent
+from agents.task_executors import simulated_processing_time
+from communication.protocol import (
+    TOPIC_TASK_EXECUTE, TOPIC_TASK_COMPLETED, TOPIC_AGENT_REGISTER,
+    TOPIC_AGENT_STATUS_UPDATE, TOPIC_RESOURCE_UPDATE, TOPIC_SYSTEM_COMMAND, TOPIC_WORKER_DISCOVERY,
+    CMD_SHUTDOWN_WORKER
+)
+from utils.resource_sampler import get_resource_sampler
+
+class AsyncWorkerAgent(AsyncBaseAgent):
+    """WorkerAgent that executes tasks as coroutines instead of one thread per task."""
+
+    # Agent ids of the async workers running in this process, which share its event loop.
+    running = set()
+
+    def __init__(self, agent_id, message_bus, node_id: str):
+        super().__init__(agent_id, message_bus)
+        self.node_id = node_id
+        self.status = "IDLE"
+        self.current_task = None
+        self.current_task_id = None
+        self.current_execution = None
+        self.last_heartbeat = time.time()
+        self.tasks_completed = 0
+        self.sampler = get_resource_sampler()
+
+    def register_subscriptions(self):
+        self.message_bus.subscribe(TOPIC_TASK_EXECUTE, self.handle_task_execute)
+        self.message_bus.subscribe(TOPIC_SYSTEM_COMMAND, self.handle_system_command)
+        self.message_bus.subscribe(TOPIC_WORKER_DISCOVERY, self.handle_discovery_request)
+
+    async def setup(self):
+        register_payload = {
+            "agent_id": self.agent_id,
+            "status": self.status,
+            "node_id": self.node_id
+        }
+        self.running.add(self.agent_id)
+        self.send_message(TOPIC_AGENT_REGISTER, payload=register_payload)
+        self.update_status(self.status)
+        self.report_resources()
+
+    async def teardown(self):
+        self.running.discard(self.agent_id)
+        if self.current_execution:
+            self.current_execution.cancel()
+
+    def send_heartbeat(self):
+        self.last_heartbeat = time.time()
+        cpu_usage, memory_usage = self.resource_usage()
+        heartbeat_payload = {
+            "agent_id": self.agent_id,
+            "status": self.status,
+            "node_id": self.node_id,
+            "current_task_id": self.current_task_id,
+            "heartbeat": True,
+            "timestamp": self.last_heartbeat,
+            "cpu_usage": cpu_usage,
+            "memory_usage": memory_usage
+        }
+        self.send_messages([
+            (TOPIC_AGENT_STATUS_UPDATE, heartbeat_payload, None),
+            (TOPIC_RESOURCE_UPDATE, self.get_resource_payload(), None),
+        ])
+
+    async def handle_task_execute(self, message):
+        if not self._is_running:
+            return
+
+        if self.status == "BUSY":
+            self.log(f"Worker {self.agent_id} is already BUSY, cannot accept new task")
+            return
+
+        task = message["payload"]["task"]
+        task_id = task.get('task_id', 'unknown')
+        self.current_task = task
+        self.current_task_id = task_id
+
+        self.log(f"Received task {task_id} for execution")
+        self.update_status("BUSY", task_id=task_id)
+        self.report_resources()
+
+        # Run as its own task so this agent's mailbox keeps draining commands while it executes.
+        self.current_execution = asyncio.ensure_future(self.execute_task(task))
+
+    async def execute_task(self, task):
+        """Execute a task; awaiting this returns its final status ("completed" or "failed")."""
+        task_id = task.get('task_id', 'unknown')
+        started_at = time.time()
+        try:
+            processing_time = simulated_processing_time(task)
+            self.log(f"Task {task_id} estimated processing time: {processing_time:.2f} seconds")
+
+            start_time = time.time()
+            while time.time() - start_time < processing_time:
+                await asyncio.sleep(min(1.0, processing_time - (time.time() - start_time)))
+                if time.time() - start_time > 1.0:
+                    progress = min(100, int(((time.time() - start_time) / processing_time) * 100))
+                    self.log(f"Task {task_id} progress: {progress}%")
+
+            self.log(f"Successfully completed task {task_id}")
+            self.tasks_completed += 1
+            result_status = "completed"
+        except asyncio.CancelledError:
+            self.log(f"Worker shutting down, aborting task {task_id}")
+            raise
+        except Exception as e:
+            self.log(f"Error executing task {task_id}: {e}", level=logging.ERROR)
+            result_status = "failed"
+
+        await self._finish_task(task_id, result_status, started_at)
+        return result_status
+
+    async def _finish_task(self, task_id, result_status, started_at=None):
+        self.current_task = None
+        self.current_task_id = None
+        self.current_execution = None
+        self.status = "IDLE" if result_status == "completed" else "FAILED"
+
+        status_update_payload = {
+            "agent_id": self.agent_id,
+            "status": self.status,
+            "node_id": self.node_id,
+            "task_completed": task_id,
+            "tasks_completed": self.tasks_completed,
+            "timestamp": time.time()
+        }
+        completed_payload = {
+            "task_id": task_id,
+            "worker_id": self.agent_id,
+            "node_id": self.node_id,
+            "status": result_status,
+            "started_at": started_at,
+            "completion_time": time.time()
+        }
+        self.send_messages([
+            (TOPIC_AGENT_STATUS_UPDATE, status_update_payload, None),
+            (TOPIC_TASK_COMPLETED, completed_payload, None),
+            (TOPIC_RESOURCE_UPDATE, self.get_resource_payload(), None),
+        ])
+        self.log(f"Task {task_id} finished with status: {result_status}. Worker now {self.status}")
+
+        if self.status == "FAILED":
+            await asyncio.sleep(5.0)
+            if self.status == "FAILED":
+                self.update_status("IDLE")
+
+    async def handle_system_command(self, message):
+        payload = message.get("payload", {})
+        command = payload.get("command")
+
+        if message.get("recipient_id"):
+            if command == CMD_SHUTDOWN_WORKER:
+                self.log("Received shutdown command. Will terminate after current task.")
+                await self.graceful_shutdown()
+            elif command == "PAUSE_WORKER":
+                self.log("Received pause command - stopping task acceptance")
+                self.update_status("PAUSED")
+            elif command == "RESUME_WORKER":
+                self.log("Received resume command - resuming task acceptance")
+                if self.status == "PAUSED":
+                    self.update_status("IDLE")
+
+    def handle_discovery_request(self, message):
+        self.reply(message, {
+            "agent_id": self.agent_id,
+            "node_id": self.node_id,
+            "status": self.status,
+            "current_task_id": self.current_task_id,
+            "last_heartbeat": self.last_heartbeat
+        })
+
+    async def graceful_shutdown(self):
+        if self.current_execution:
+            self.log(f"Waiting for current task {self.current_task_id} to complete before shutdown")
+            await asyncio.shield(self.current_execution)
+        final_status = {
+            "agent_id": self.agent_id,
+            "status": "SHUTTING_DOWN",
+            "node_id": self.node_id,
+            "timestamp": time.time()
+        }
+        self.send_message(TOPIC_AGENT_STATUS_UPDATE, payload=final_status)
+        self.stop()
+
+    def update_status(self, status, task_id=None):
+        self.status = status
+        cpu_usage, memory_usage = self.resource_usage()
+        payload = {
+            "agent_id": self.agent_id,
+            "status": self.status,
+            "node_id": self.node_id,
+            "timestamp": time.time(),
+            "cpu_usage": cpu_usage,
+            "memory_usage": memory_usage,
+            "tasks_completed": self.tasks_completed
+        }
+        if task_id:
+            payload["task_id"] = task_id
+            payload["current_task_id"] = task_id
+        self.send_message(TOPIC_AGENT_STATUS_UPDATE, payload=payload)
+
+    def resource_usage(self):
+        """CPU and memory from the shared sampler's cached reading of this process.
+
+        Coroutines of every async worker run on one event loop, so the process
+        CPU is split evenly over them; memory is the share of node memory held
+        by the process, as for WorkerAgent.
+        """
+        reading = self.sampler.reading
+        cpu = reading["process_cpu_percent"] / max(1, len(self.running))
+        return round(cpu, 2), round(reading["process_memory_percent"], 2)
+
+    def get_resource_payload(self):
+        cpu, mem = self.resource_usage()
+        reading = self.sampler.reading
+        return {
+            "agent_id": self.agent_id,
+            "node_id": self.node_id,
+            "cpu": cpu,
+            "memory": mem,
+            "node_cpu": reading["node_cpu_percent"],
+            "node_memory": reading["node_memory_percent"],
+            "process_rss": reading["process_rss"],
+            "status": self.status,
+            "timestamp": time.time()
+        }
+
+    def report_resources(self):
+        self.send_message(TOPIC_RESOURCE_UPDATE, payload=self.get_resource_payload())
@@ -1,16 +1,28 @@
 import threading
-import time
 import logging
-from communication.protocol import create_message, TOPIC_AGENT_HEARTBEAT, TOPIC_SYSTEM_LOG
-from config.settings import AGENT_HEARTBEAT_INTERVAL
+from collections import deque
+from communication.protocol import create_message, TOPIC_AGENT_HEARTBEAT, TOPIC_SYSTEM_LOG, BROADCAST
+from communication.request_reply import reply_to
+from config.settings import AGENT_HEARTBEAT_INTERVAL, REQUEST_TIMEOUT
+from utils.timer_wheel import get_timer_wheel
 
 class BaseAgent(threading.Thread):
+    """Agent thread that sleeps until something is posted to its mailbox.
+
+    Messages are handled by the bus's dispatch threads; the agent thread itself
+    only runs setup() and the callbacks posted to it, including the ones the
+    shared timer wheel fires for schedule(), so an idle agent costs no CPU.
+    """
+
     def __init__(self, agent_id, message_bus):
         super().__init__(name=agent_id)
         self.agent_id = agent_id
         self.message_bus = message_bus
         self._is_running = True
         self.daemon = True
+        self.wakeup = threading.Event()
+        self.mailbox = deque()
+        self.timers = set()
 
     def register_subscriptions(self):
         pass
@@ -21,24 +33,63 @@ class BaseAgent(threading.Thread):
     def run(self):
         self.log(f"Agent started.")
         self.setup()
-        last_heartbeat_time = time.time()
-        
+        self.schedule(AGENT_HEARTBEAT_INTERVAL, self.send_heartbeat, interval=AGENT_HEARTBEAT_INTERVAL)
+
         while self._is_running:
-            self.on_message_loop()
-            current_time = time.time()
-            if current_time - last_heartbeat_time >= AGENT_HEARTBEAT_INTERVAL:
-                self.send_heartbeat()
-                last_heartbeat_time = current_time
-            time.sleep(0.1)
+            self.wakeup.wait()
+            self.wakeup.clear()
+            self.run_mailbox()
         
         self.log("Agent shutting down.")
 
-    def on_message_loop(self):
-        pass
+    def post(self, callback):
+        """Run callback on this agent's thread."""
+        self.mailbox.append(callback)
+        self.wakeup.set()
+
+    def run_mailbox(self):
+        while self._is_running and self.mailbox:
+            callback = self.mailbox.popleft()
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"[{self.agent_id}] Callback {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def schedule(self, delay, callback, interval=None):
+        """Post callback to this agent after `delay` seconds, then every `interval` seconds if given.
+
+        Returns a timer handle for cancel_timer(); every timer still pending is
+        cancelled when the agent stops.
+        """
+        def fire():
+            if interval is None:
+                self.timers.discard(handle)
+            self.post(callback)
+        handle = get_timer_wheel().schedule(delay, fire, interval)
+        self.timers.add(handle)
+        return handle
+
+    def cancel_timer(self, handle):
+        get_timer_wheel().cancel(handle)
+        self.timers.discard(handle)
 
     def send_message(self, topic, payload=None, recipient_id=None):
         msg = create_message(topic, self.agent_id, payload, recipient_id)
-        self.message_bus.send_message(msg)
+        return self.message_bus.send_message(msg)
+
+    def send_messages(self, messages):
+        """Publish several (topic, payload, recipient_id) tuples as one batch."""
+        batch = [create_message(topic, self.agent_id, payload, recipient_id) for topic, payload, recipient_id in messages]
+        return self.message_bus.send_messages(batch)
+
+    def request(self, topic, payload=None, recipient_id=None, timeout=REQUEST_TIMEOUT):
+        return self.message_bus.request(topic, payload, timeout, recipient_id, self.agent_id)
+
+    def scatter_gather(self, topic, payload=None, recipient_id=BROADCAST, timeout=REQUEST_TIMEOUT, expected_replies=None):
+        return self.message_bus.scatter_gather(topic, payload, timeout, recipient_id, self.agent_id, expected_replies)
+
+    def reply(self, request, payload=None):
+        return self.message_bus.send_message(reply_to(request, self.agent_id, payload))
 
     def send_heartbeat(self):
         self.send_message(TOPIC_AGENT_HEARTBEAT)
@@ -49,4 +100,7 @@ class BaseAgent(threading.Thread):
         self.send_message(TOPIC_SYSTEM_LOG, payload={"log": log_message})
 
     def stop(self):
-        self._is_running = False
\ No newline at end of file
+        self._is_running = False
+        for handle in list(self.timers):
+            self.cancel_timer(handle)
+        self.wakeup.set()
\ No newline at end of file
@@ -2,19 +2,21 @@ import threading
 from agents.base_agent import BaseAgent
 from agents.worker_agent import WorkerAgent
 from communication.protocol import (
-    TOPIC_SYSTEM_COMMAND, CMD_SCALE_OUT, CMD_SCALE_IN, CMD_SHUTDOWN_WORKER
+    TOPIC_SYSTEM_COMMAND, TOPIC_CLUSTER_QUERY, CMD_SCALE_OUT, CMD_SCALE_IN, CMD_SHUTDOWN_WORKER
 )
 from config.settings import CLUSTER_MANAGER_ID
 from utils.helpers import generate_unique_id
 
 class ClusterManagerAgent(BaseAgent):
-    def __init__(self, message_bus, initial_agents_list: list, agents_lock: threading.Lock):
+    def __init__(self, message_bus, initial_agents_list: list, agents_lock: threading.Lock, worker_factory=None):
         super().__init__(CLUSTER_MANAGER_ID, message_bus)
         self.agents = initial_agents_list
         self.agents_lock = agents_lock
+        self.worker_factory = worker_factory or (lambda worker_id, node_id: WorkerAgent(worker_id, self.message_bus, node_id))
 
     def register_subscriptions(self):
         self.message_bus.subscribe(TOPIC_SYSTEM_COMMAND, self.handle_system_command)
+        self.message_bus.subscribe(TOPIC_CLUSTER_QUERY, self.handle_cluster_query)
 
     def setup(self):
         pass
@@ -26,11 +28,19 @@ class ClusterManagerAgent(BaseAgent):
         elif command == CMD_SCALE_IN:
             self.scale_in(message["payload"].get("target_worker"))
 
+    def handle_cluster_query(self, message):
+        with self.agents_lock:
+            workers = [
+                {"agent_id": agent.agent_id, "node_id": agent.node_id}
+                for agent in self.agents if hasattr(agent, "node_id")
+            ]
+        self.reply(message, {"workers": workers})
+
     def scale_out(self):
         self.log("Scale-out command received. Provisioning new worker agent.")
         new_worker_id = generate_unique_id("worker_dynamic_")
         new_node_id = f"dynamic-node-{generate_unique_id()}"
-        new_worker = WorkerAgent(new_worker_id, self.message_bus, new_node_id)
+        new_worker = self.worker_factory(new_worker_id, new_node_id)
         new_worker.register_subscriptions()
         
         with self.agents_lock:
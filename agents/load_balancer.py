@@ -1,173 +1,419 @@
 from agents.base_agent import BaseAgent
 from communication.protocol import (
-    TOPIC_TASK_REQUEST, TOPIC_AGENT_REGISTER, TOPIC_TASK_EXECUTE, 
-    TOPIC_AGENT_STATUS_UPDATE, TOPIC_SYSTEM_COMMAND, CMD_PAUSE_WORKER, CMD_RESUME_WORKER
+    TOPIC_TASK_REQUEST, TOPIC_AGENT_REGISTER, TOPIC_TASK_EXECUTE, TOPIC_TASK_COMPLETED,
+    TOPIC_AGENT_STATUS_UPDATE, TOPIC_SYSTEM_COMMAND, TOPIC_WORKER_DISCOVERY, TOPIC_CLUSTER_QUERY,
+    TOPIC_TASK_RETURN, TOPIC_STEAL_CANDIDATES, TOPIC_TASK_STOLEN, CMD_PAUSE_WORKER, CMD_RESUME_WORKER,
+    CMD_CANCEL_TASK
 )
-from config.settings import LOAD_BALANCER_ID
-from collections import deque
+from agents.task_executors import batchable, task_type
+from agents.worker_registry import WorkerRegistry
+from agents.placement import create_placement_strategy
+from config.settings import (
+    LOAD_BALANCER_ID, CLUSTER_MANAGER_ID, DISCOVERY_TIMEOUT, DISCOVERY_MIN_INTERVAL, WORK_STEAL_MAX_VICTIMS,
+    HEDGE_PERCENTILE, HEDGE_BUDGET_PERCENT, HEDGE_MIN_SAMPLES, HEDGE_WINDOW, HEDGE_CHECK_INTERVAL,
+    TASK_BATCH_MAX_SIZE, TASK_BATCH_MAX_WAIT, BACKLOG_WAIT_WINDOW, LOCALITY_WAIT, PLACEMENT_STRATEGY,
+    SHORTEST_JOB_FIRST, PREDICTOR_REKEY_INTERVAL, DISPATCH_RETRY_DELAY, HEDGE_ESTIMATE_FACTOR
+)
+from communication.lanes import LaneFullError
+from tasks.backlog import TaskBacklog
+from tasks.predictor import get_processing_time_predictor
+from collections import Counter, deque
 import threading
 import time
 
+NO_LOCATION = (None, "unspecified")
+
+def batch_group(task):
+    """Tasks batch with others of the same type and the same data location."""
+    return task_type(task), task.get("location")
+
 class LoadBalancerAgent(BaseAgent):
-    def __init__(self, message_bus):
+    def __init__(self, message_bus, placement=PLACEMENT_STRATEGY, shortest_job_first=SHORTEST_JOB_FIRST, predictor=None):
         super().__init__(LOAD_BALANCER_ID, message_bus)
-        self.workers = {}
-        self.paused_workers = set()
-        self.task_backlog = deque()
-        self.discovery_lock = threading.Lock()
+        self.registry = WorkerRegistry()
+        self.workers = self.registry.workers
+        self.predictor = predictor or get_processing_time_predictor()
+        self.placement = create_placement_strategy(placement, self)
+        self.shortest_job_first = shortest_job_first
+        self.task_backlog = TaskBacklog(batch_group, estimate=self.predictor.estimate if shortest_job_first else None)
+        self.predictor_version = self.predictor.version
+        self.discovery_lock = threading.RLock()
         self.last_discovery_time = 0
-        self.discovery_interval = 10
+        self.discovery = None
+        self.maintenance_interval = 10
         self.worker_timeout = 60
+        self.leases = {}
+        self.durations = deque(maxlen=HEDGE_WINDOW)
+        self.tasks_dispatched = 0
+        self.hedges_launched = 0
+        self.hedge_wins = 0
+        self.wait_times = {}
+        self.dispatch_retry_at = None
+        self.locality = Counter()
+        self.locality_waiting = {}
+        self.batches_dispatched = 0
 
     def register_subscriptions(self):
         self.message_bus.subscribe(TOPIC_AGENT_REGISTER, self.handle_worker_registration)
         self.message_bus.subscribe(TOPIC_TASK_REQUEST, self.handle_task_request)
         self.message_bus.subscribe(TOPIC_AGENT_STATUS_UPDATE, self.handle_agent_status_update)
+        self.message_bus.subscribe(TOPIC_TASK_COMPLETED, self.handle_task_completed)
+        self.message_bus.subscribe(TOPIC_TASK_RETURN, self.handle_task_return)
+        self.message_bus.subscribe(TOPIC_STEAL_CANDIDATES, self.handle_steal_candidates)
+        self.message_bus.subscribe(TOPIC_TASK_STOLEN, self.handle_task_stolen)
         self.message_bus.subscribe(TOPIC_SYSTEM_COMMAND, self.handle_system_command)
-        self.message_bus.subscribe("TOPIC_CLUSTER_RESPONSE", self.handle_cluster_response)
 
     def setup(self):
         self.discover_existing_workers()
-        self.start_periodic_tasks()
-
-    def start_periodic_tasks(self):
-        def periodic_discovery():
-            while True:
-                time.sleep(self.discovery_interval)
-                self.cleanup_stale_workers()
-                if time.time() - self.last_discovery_time > self.discovery_interval:
-                    self.discover_existing_workers()
-                self.log_system_status()
-        
-        discovery_thread = threading.Thread(target=periodic_discovery, daemon=True)
-        discovery_thread.start()
+        self.schedule(self.maintenance_interval, self.run_maintenance, interval=self.maintenance_interval)
+        self.schedule(HEDGE_CHECK_INTERVAL, self.check_stragglers, interval=HEDGE_CHECK_INTERVAL)
+        if self.shortest_job_first:
+            self.schedule(PREDICTOR_REKEY_INTERVAL, self.reprioritize_backlog, interval=PREDICTOR_REKEY_INTERVAL)
+
+    def run_maintenance(self):
+        self.cleanup_stale_workers()
+        self.log_system_status()
 
     def cleanup_stale_workers(self):
-        current_time = time.time()
-        stale_workers = []
-        
-        for worker_id, data in self.workers.items():
-            if current_time - data.get("last_seen", 0) > self.worker_timeout:
-                stale_workers.append(worker_id)
-        
+        with self.discovery_lock:
+            stale_workers = self.registry.stale(time.time() - self.worker_timeout)
+            for worker_id in stale_workers:
+                self.registry.remove(worker_id)
         for worker_id in stale_workers:
             self.log(f"Removing stale worker: {worker_id}")
-            del self.workers[worker_id]
-            self.paused_workers.discard(worker_id)
 
     def log_system_status(self):
-        idle_workers = [w_id for w_id, data in self.workers.items() if data["status"] == "IDLE"]
-        busy_workers = [w_id for w_id, data in self.workers.items() if data["status"] == "BUSY"]
+        registry = self.registry
+        idle_workers = sorted(registry.by_status.get("IDLE", ()))
+        busy_workers = sorted(registry.by_status.get("BUSY", ()))
         
         self.log(f"=== SYSTEM STATUS ===")
         self.log(f"Tasks in backlog: {len(self.task_backlog)}")
-        self.log(f"Total workers: {len(self.workers)}")
+        self.log(f"Total workers: {len(registry)}")
+        self.log(f"Free capacity (slots + prefetch): {registry.total_free}/{registry.total_capacity}")
+        self.log(f"Placement strategy: {self.placement.name}")
+        self.log(f"Micro-batches dispatched: {self.batches_dispatched}")
+        hit_rate = self.locality_hit_rate()
+        if hit_rate is not None:
+            self.log(f"Locality: {self.locality['local']}/{self.locality['local'] + self.locality['remote']} tasks with a data location "
+                     f"ran on its node ({100.0 * hit_rate:.1f}%), {self.locality['waited']} waited for a local slot")
+        for priority, stats in sorted(self.wait_time_stats().items()):
+            self.log(f"Backlog wait, priority {priority}: {stats['count']} tasks, mean {stats['mean']:.3f}s, "
+                     f"p50 {stats['p50']:.3f}s, p95 {stats['p95']:.3f}s, max {stats['max']:.3f}s")
+        for template, stats in sorted(self.predictor.summary().items()):
+            self.log(f"Processing time, {template}: {stats['count']} tasks, EWMA {stats['ewma']:.3f}s, "
+                     f"p50 {stats['p50']:.3f}s, p95 {stats['p95']:.3f}s")
         self.log(f"IDLE workers: {len(idle_workers)} - {idle_workers}")
         self.log(f"BUSY workers: {len(busy_workers)} - {busy_workers}")
-        self.log(f"Paused workers: {len(self.paused_workers)}")
+        self.log(f"Paused workers: {len(registry.paused)}")
+        threshold = self.hedge_threshold()
+        self.log(f"In-flight leases: {len(self.leases)}, hedge threshold: {f'{threshold:.2f}s' if threshold else 'n/a'}, "
+                 f"hedges: {self.hedges_launched}/{self.tasks_dispatched} dispatches, won by the hedge: {self.hedge_wins}")
+        etas = {task_id: self.eta(task_id) for task_id in list(self.leases)}
+        longest = sorted((task_id for task_id, eta in etas.items() if eta is not None), key=etas.get, reverse=True)[:5]
+        if longest:
+            self.log("Expected time left in flight, longest first: " + ", ".join(f"{task_id} {etas[task_id]:.2f}s" for task_id in longest))
 
     def discover_existing_workers(self):
+        """Scatter-gather worker discovery, bounded by DISCOVERY_TIMEOUT.
+
+        Every worker answers the discovery request with its current status. The
+        cluster manager's membership list tells the gather how many replies to
+        expect, so it normally completes as soon as the last worker has answered.
+        """
         with self.discovery_lock:
+            if self.discovery is not None and not self.discovery.done():
+                return
             self.last_discovery_time = time.time()
-            
-            discovery_message = {
-                "command": "WORKER_DISCOVERY_REQUEST",
-                "requester": self.agent_id,
-                "timestamp": self.last_discovery_time
-            }
-            
-            self.send_message(TOPIC_SYSTEM_COMMAND, payload=discovery_message, recipient_id="broadcast")
-            self.request_worker_status_from_cluster()
-            self.log(f"Sent worker discovery broadcast and cluster status request")
+            discovery = self.discovery = self.scatter_gather(TOPIC_WORKER_DISCOVERY, timeout=DISCOVERY_TIMEOUT)
 
-    def request_worker_status_from_cluster(self):
-        cluster_request = {
-            "command": "GET_ALL_WORKER_STATUS",
-            "requester": self.agent_id,
-            "timestamp": time.time()
-        }
-        
-        self.send_message("TOPIC_CLUSTER_QUERY", payload=cluster_request, recipient_id="cluster_manager")
+        def on_membership(future):
+            if future.exception() is None:
+                discovery.expect(len(future.result().get("workers", [])))
 
-    def handle_cluster_response(self, message):
-        payload = message.get("payload", {})
-        command = payload.get("command")
-        
-        if command == "WORKER_STATUS_LIST":
-            cluster_workers = payload.get("workers", [])
-            current_time = time.time()
-            
-            for worker_info in cluster_workers:
-                worker_id = worker_info.get("agent_id")
-                if worker_id and worker_id.startswith("worker_"):
-                    self.workers[worker_id] = {
-                        "status": worker_info.get("status", "IDLE"),
-                        "node_id": worker_info.get("node_id", "unknown"),
-                        "last_seen": current_time
-                    }
-            
-            self.log(f"Updated worker registry from cluster manager: {len(cluster_workers)} workers")
-            self.try_dispatch_backlog()
+        self.request(TOPIC_CLUSTER_QUERY, recipient_id=CLUSTER_MANAGER_ID, timeout=DISCOVERY_TIMEOUT).add_done_callback(on_membership)
+        # The gather completes on a bus or timer thread; merge the replies on our own.
+        discovery.add_done_callback(lambda future: self.post(lambda: self.handle_discovery_replies(future)))
+        self.log("Sent worker discovery request")
+
+    def discover_if_stale(self, reason):
+        if time.time() - self.last_discovery_time > DISCOVERY_MIN_INTERVAL:
+            self.log(f"{reason} Triggering discovery.")
+            self.discover_existing_workers()
+
+    def handle_discovery_replies(self, future):
+        replies = future.result()
+        current_time = time.time()
+        with self.discovery_lock:
+            for reply in replies:
+                worker_id = reply.get("agent_id")
+                if worker_id in self.registry:
+                    # Status updates already keep known workers current; a reply may predate an assignment.
+                    self.registry.touch(worker_id, current_time)
+                elif worker_id and worker_id.startswith("worker_"):
+                    self.registry.add(worker_id, reply, current_time)
+        self.log(f"Discovery finished: {len(replies)} workers replied in {current_time - self.last_discovery_time:.3f}s")
+        self.try_dispatch_backlog()
 
     def handle_worker_registration(self, message):
         worker_id = message["payload"].get("agent_id") or message.get("sender_id")
         
         if worker_id and worker_id.startswith("worker_"):
-            payload = message["payload"]
-            status = payload.get("status", "IDLE")
-            node_id = payload.get("node_id", "unknown-dynamic-node")
-            current_time = time.time()
-
-            self.workers[worker_id] = {
-                "status": status, 
-                "node_id": node_id,
-                "last_seen": current_time
-            }
+            payload = dict(message["payload"])
+            payload.setdefault("node_id", "unknown-dynamic-node")
+            with self.discovery_lock:
+                entry = self.registry.add(worker_id, payload, time.time())
             
-            self.log(f"Registered worker: {worker_id} on node {node_id}. Status: {status}")
+            self.log(f"Registered worker: {worker_id} on node {entry['node_id']}. Status: {entry['status']}, capacity: {entry['capacity']}")
 
-            if status == "IDLE":
-                self.log(f"New IDLE worker {worker_id} available. Checking backlog.")
+            if self.free_capacity(worker_id):
+                self.log(f"New worker {worker_id} has free capacity. Checking backlog.")
                 self.try_dispatch_backlog()
 
+    def free_capacity(self, worker_id):
+        """Units (tasks or batches) we may still send a worker: free slots plus room in its prefetch buffer."""
+        return self.registry.free_capacity(worker_id)
+
     def handle_agent_status_update(self, message):
         payload = message.get("payload", {})
         agent_id = payload.get("agent_id")
         status = payload.get("status")
-        command = payload.get("command")
         
-        if command == "WORKER_DISCOVERY_RESPONSE":
-            if agent_id and agent_id.startswith("worker_"):
-                self.workers[agent_id] = {
-                    "status": status or "IDLE",
-                    "node_id": payload.get("node_id", "unknown"),
-                    "last_seen": time.time()
-                }
-                self.log(f"Discovered worker via response: {agent_id} - {status}")
-                return
-        
-        if agent_id and agent_id in self.workers:
-            self.workers[agent_id]["status"] = status
-            self.workers[agent_id]["last_seen"] = time.time()
+        if agent_id and agent_id in self.registry:
+            with self.discovery_lock:
+                data = self.workers[agent_id]
+                self.registry.set_status(agent_id, status)
+                self.registry.touch(agent_id, time.time())
+                self.registry.update_capacity(agent_id, payload)
             
-            self.log(f"Worker {agent_id} status updated to {status}")
+            self.log(f"Worker {agent_id} status updated to {status} ({self.free_capacity(agent_id)}/{data['capacity']} capacity free)")
             
-            if status == "IDLE":
+            if self.free_capacity(agent_id):
                 self.try_dispatch_backlog()
 
+    def handle_task_completed(self, message):
+        """Settle a task's lease; the first successful completion wins.
+
+        Later completions of the same task (a hedge loser that finished before
+        its cancel arrived, or a redelivery) find no lease and only free the
+        worker's capacity.
+        """
+        payload = message.get("payload", {})
+        task_id = payload.get("task_id")
+        worker_id = payload.get("worker_id")
+        data = self.workers.get(worker_id)
+        cancels = []
+        with self.discovery_lock:
+            self.registry.unassign(worker_id, task_id)
+            lease = self.leases.get(task_id)
+            if lease is not None:
+                lease["workers"].pop(worker_id, None)
+                if payload.get("status") == "completed":
+                    del self.leases[task_id]
+                    self.observe_duration(lease["task"], payload)
+                    # Cache hits finish in milliseconds and would drag the hedge threshold down.
+                    if payload.get("cache") != "hit":
+                        self.durations.append(time.time() - lease["dispatched"])
+                    if worker_id == lease["hedge_worker"]:
+                        self.hedge_wins += 1
+                    cancels = [
+                        (TOPIC_SYSTEM_COMMAND, {"command": CMD_CANCEL_TASK, "task_id": task_id}, loser)
+                        for loser in lease["workers"]
+                    ]
+                elif not lease["workers"]:
+                    del self.leases[task_id]
+        if cancels:
+            self.log(f"Task {task_id} won by {worker_id}; cancelling the copy on {[loser for _, _, loser in cancels]}")
+            self.send_messages(cancels)
+        if data is not None:
+            self.try_dispatch_backlog()
+
+    def observe_duration(self, task, payload):
+        """Feed the predictor a completed task's run time; a batch's time is split over its members."""
+        started_at = payload.get("started_at")
+        completion_time = payload.get("completion_time")
+        if started_at is None or completion_time is None:
+            return
+        batch_size = (payload.get("result") or {}).get("batch_size", 1)
+        self.predictor.observe(task, payload.get("node_id"), max(0.0, completion_time - started_at) / batch_size)
+
+    def reprioritize_backlog(self):
+        """Re-key the backlog once the predictor has learned something since the last time."""
+        with self.discovery_lock:
+            version = self.predictor.version
+            if version != self.predictor_version and self.task_backlog:
+                self.task_backlog.reprioritize()
+            self.predictor_version = version
+
+    def eta(self, task_id):
+        """Expected seconds until a dispatched task completes, or None if it is not in flight."""
+        lease = self.leases.get(task_id)
+        if lease is None:
+            return None
+        worker = self.workers.get(next(iter(lease["workers"]), None), {})
+        estimate = self.predictor.estimate(lease["task"], worker.get("node_id"))
+        return max(0.0, lease["dispatched"] + estimate - time.time())
+
+    def open_lease(self, task, worker_id, now, enqueued_at):
+        self.leases[task["task_id"]] = {
+            "task": task,
+            "enqueued_at": enqueued_at,
+            "workers": {worker_id: now},
+            "dispatched": now,
+            "expected": self.hedge_deadline(task, worker_id, now),
+            "hedge_worker": None
+        }
+
+    def hedge_deadline(self, task, worker_id, dispatched):
+        """When a task dispatched at `dispatched` counts as a straggler; None until there is a hedge threshold.
+
+        That is the global hedge threshold, or HEDGE_ESTIMATE_FACTOR times the
+        HEDGE_PERCENTILE run time the predictor has learned for tasks like it,
+        whichever is later: a template that always runs long is not hedged
+        just for being long.
+        """
+        threshold = self.hedge_threshold()
+        if threshold is None:
+            return None
+        node_id = self.workers.get(worker_id, {}).get("node_id")
+        if self.predictor.known(task, node_id):
+            threshold = max(threshold, HEDGE_ESTIMATE_FACTOR * self.predictor.quantile(task, HEDGE_PERCENTILE / 100, node_id))
+        return dispatched + threshold
+
+    def hedge_threshold(self):
+        """The HEDGE_PERCENTILE of recent dispatch-to-completion times, once there are enough of them."""
+        if len(self.durations) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.durations)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE / 100))]
+
+    def check_stragglers(self):
+        """Start a speculative copy of tasks still in flight past their lease's expected time.
+
+        Each task is hedged at most once, on another worker (on another node
+        where possible), and hedges stay within HEDGE_BUDGET_PERCENT of all
+        dispatches.
+        """
+        threshold = self.hedge_threshold()
+        if threshold is None:
+            return
+        now = time.time()
+        hedges = []
+        with self.discovery_lock:
+            available = self.registry.available
+            for task_id, lease in self.leases.items():
+                if not available or self.hedges_launched >= self.tasks_dispatched * HEDGE_BUDGET_PERCENT / 100:
+                    break
+                if lease["hedge_worker"]:
+                    continue
+                if lease["expected"] is None:
+                    # Dispatched before there were enough samples for a threshold.
+                    lease["expected"] = self.hedge_deadline(lease["task"], next(iter(lease["workers"]), None), lease["dispatched"])
+                if now < lease["expected"]:
+                    continue
+                candidates = [w_id for w_id in available if w_id not in lease["workers"]]
+                if not candidates:
+                    continue
+                busy_nodes = {self.workers[w_id]["node_id"] for w_id in lease["workers"] if w_id in self.workers}
+                worker_id = max(candidates, key=lambda w_id: (self.workers[w_id]["node_id"] not in busy_nodes, available[w_id]))
+                self.registry.assign(worker_id, task_id, task_id)
+                lease["workers"][worker_id] = now
+                lease["hedge_worker"] = worker_id
+                self.hedges_launched += 1
+                hedges.append((TOPIC_TASK_EXECUTE, {"task": lease["task"], "hedge": True}, worker_id))
+                self.log(f"Task {task_id} in flight for {now - lease['dispatched']:.2f}s "
+                         f"(expected within {lease['expected'] - lease['dispatched']:.2f}s); hedging on {worker_id}")
+        if hedges:
+            self.send_messages(hedges)
+
+    def handle_task_return(self, message):
+        """Put tasks a worker handed back (prefetched or refused) back in the backlog.
+
+        They keep their original enqueue time, so aging puts them ahead of
+        tasks of the same priority that arrived after them.
+        """
+        payload = message.get("payload", {})
+        worker_id = payload.get("worker_id")
+        tasks = payload.get("tasks", [])
+        data = self.workers.get(worker_id)
+        with self.discovery_lock:
+            for task in tasks:
+                self.registry.unassign(worker_id, task.get("task_id"))
+            # A returned hedge copy is dropped while the other copy still runs.
+            requeue = []
+            for task in tasks:
+                lease = self.leases.get(task.get("task_id"))
+                if lease is not None:
+                    lease["workers"].pop(worker_id, None)
+                    if lease["workers"]:
+                        continue
+                    del self.leases[task["task_id"]]
+                requeue.append((task, lease["enqueued_at"] if lease else None))
+            if data is not None:
+                self.registry.update_capacity(worker_id, payload)
+                # The return can overtake the pause or shutdown notice it follows.
+                if payload.get("reason") == "paused":
+                    self.registry.pause(worker_id)
+                elif payload.get("reason") == "shutdown":
+                    self.registry.set_status(worker_id, "SHUTTING_DOWN")
+            for task, enqueued_at in requeue:
+                self.task_backlog.push(task, enqueued_at)
+        self.log(f"Worker {worker_id} returned {len(tasks)} tasks ({payload.get('reason')}). Backlog size: {len(self.task_backlog)}")
+        self.try_dispatch_backlog()
+
+    def handle_steal_candidates(self, message):
+        """Tell an idle worker which peers hold tasks they have not started, same node first.
+
+        A worker with more assigned units than slots has the rest in its
+        prefetch buffer. With a backlog of our own the thief gets nothing: the
+        backlog will reach it sooner.
+        """
+        payload = message.get("payload", {})
+        thief_id = payload.get("agent_id")
+        node_id = payload.get("node_id")
+        victims = []
+        with self.discovery_lock:
+            if not self.task_backlog:
+                queued = {
+                    w_id: self.registry.units(w_id) - self.workers[w_id]["slots"]
+                    for w_id in self.registry.overcommitted if w_id != thief_id
+                }
+                victims = sorted(queued, key=lambda w_id: (self.workers[w_id]["node_id"] != node_id, -queued[w_id]))
+        self.reply(message, {"victims": victims[:WORK_STEAL_MAX_VICTIMS]})
+
+    def handle_task_stolen(self, message):
+        payload = message.get("payload", {})
+        task_ids = payload.get("task_ids", [])
+        victim_id = payload.get("from_worker")
+        thief_id = payload.get("to_worker")
+        with self.discovery_lock:
+            if victim_id in self.registry:
+                for task_id in task_ids:
+                    self.registry.unassign(victim_id, task_id)
+                self.registry.update_capacity(victim_id, payload)
+            if thief_id in self.registry:
+                for task_id in task_ids:
+                    self.registry.assign(thief_id, task_id, task_ids[0])
+            for task_id in task_ids:
+                lease = self.leases.get(task_id)
+                if lease is not None and lease["workers"].pop(payload.get("from_worker"), None) is not None:
+                    lease["workers"][payload.get("to_worker")] = time.time()
+                    if lease["hedge_worker"] == payload.get("from_worker"):
+                        lease["hedge_worker"] = payload.get("to_worker")
+        self.log(f"Tasks {task_ids} moved from {payload.get('from_worker')} to {payload.get('to_worker')} by work stealing")
+
     def handle_task_request(self, message):
         task = message["payload"]["task"]
-        self.task_backlog.append(task)
+        with self.discovery_lock:
+            self.task_backlog.push(task)
         
         self.log(f"Received task {task.get('task_id', 'unknown')}. Backlog size: {len(self.task_backlog)}")
         
         self.try_dispatch_backlog()
         
         if len(self.task_backlog) > 5:
-            available_workers = self.get_available_workers()
-            if not available_workers:
-                self.log(f"No available workers found with {len(self.task_backlog)} tasks queued. Triggering discovery.")
-                self.discover_existing_workers()
+            if not self.registry.available:
+                self.discover_if_stale(f"No available workers found with {len(self.task_backlog)} tasks queued.")
                 self.send_scaling_pause_request()
 
     def send_scaling_pause_request(self):
@@ -185,37 +431,24 @@ class LoadBalancerAgent(BaseAgent):
     def handle_system_command(self, message):
         payload = message.get("payload", {})
         command = payload.get("command")
-        
-        if command == "WORKER_DISCOVERY_REQUEST":
-            if self.agent_id.startswith("worker_"):
-                response = {
-                    "command": "WORKER_DISCOVERY_RESPONSE",
-                    "agent_id": self.agent_id,
-                    "status": getattr(self, 'status', 'IDLE'),
-                    "node_id": getattr(self, 'node_id', 'unknown'),
-                    "timestamp": time.time()
-                }
-                self.send_message(TOPIC_AGENT_STATUS_UPDATE, payload=response)
-            return
-        
         target = payload.get("target_worker")
         
-        if command == CMD_PAUSE_WORKER and target in self.workers:
+        if command == CMD_PAUSE_WORKER and target in self.registry:
             self.log(f"Pausing assignments to worker {target}")
-            self.paused_workers.add(target)
+            with self.discovery_lock:
+                self.registry.pause(target)
             
-        elif command == CMD_RESUME_WORKER and target in self.paused_workers:
+        elif command == CMD_RESUME_WORKER and target in self.registry.paused:
             self.log(f"Resuming assignments to worker {target}")
-            self.paused_workers.remove(target)
+            with self.discovery_lock:
+                self.registry.resume(target)
             
             self.log(f"Worker {target} resumed. Checking backlog.")
             self.try_dispatch_backlog()
 
     def get_available_workers(self):
-        return [
-            w_id for w_id, data in self.workers.items() 
-            if data["status"] == "IDLE" and w_id not in self.paused_workers
-        ]
+        """Free capacity per worker that can take work right now: a live index, not a copy."""
+        return self.registry.available
 
     def validate_task(self, task):
         required_fields = ["task_id", "data", "priority", "location"]
@@ -225,7 +458,81 @@ class LoadBalancerAgent(BaseAgent):
                 return False
         return True
 
+    def record_wait(self, task, waited):
+        window = self.wait_times.get(task.get("priority"))
+        if window is None:
+            window = self.wait_times[task.get("priority")] = deque(maxlen=BACKLOG_WAIT_WINDOW)
+        window.append(waited)
+
+    def wait_time_stats(self):
+        """Backlog wait (enqueue to dispatch) per priority over the last BACKLOG_WAIT_WINDOW dispatches."""
+        stats = {}
+        for priority, window in self.wait_times.items():
+            ordered = sorted(window)
+            stats[priority] = {
+                "count": len(ordered),
+                "mean": sum(ordered) / len(ordered),
+                "p50": ordered[len(ordered) // 2],
+                "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "max": ordered[-1]
+            }
+        return stats
+
+    def schedule_dispatch_retry(self, delay):
+        """Dispatch again after `delay`, for tasks held back for a batch or a local worker."""
+        retry_at = time.time() + delay
+        if self.dispatch_retry_at is not None and self.dispatch_retry_at <= retry_at:
+            return
+        self.dispatch_retry_at = retry_at
+        self.schedule(delay, self.retry_dispatch)
+
+    def recall_assignments(self, assignments):
+        """Undo TOPIC_TASK_EXECUTE assignments the bus did not queue; returns the number of tasks put back.
+
+        The worker's capacity is freed, the lease is dropped and each task goes
+        back in the backlog with its original enqueue time. A later locality
+        wait starts afresh.
+        """
+        recalled = 0
+        for _, payload, worker_id in assignments:
+            for task in payload.get("tasks") or [payload["task"]]:
+                self.registry.unassign(worker_id, task["task_id"])
+                lease = self.leases.pop(task["task_id"], None)
+                self.locality_waiting.pop(task["task_id"], None)
+                self.task_backlog.push(task, lease["enqueued_at"] if lease else None)
+                self.tasks_dispatched -= 1
+                recalled += 1
+        return recalled
+
+    def retry_dispatch(self):
+        self.dispatch_retry_at = None
+        self.try_dispatch_backlog()
+
+    def locality_hit_rate(self):
+        """Share of dispatched tasks with a data location that went to a worker on that node."""
+        located = self.locality["local"] + self.locality["remote"]
+        return self.locality["local"] / located if located else None
+
     def try_dispatch_backlog(self):
+        """Assign backlog tasks, most urgent first, to workers chosen by the placement strategy.
+
+        With SHORTEST_JOB_FIRST, tasks of one priority that arrived together go
+        out shortest expected run time first (see TaskBacklog).
+
+        Tasks of a batchable type go out as micro-batches of up to
+        TASK_BATCH_MAX_SIZE (and the worker's max_batch) in one
+        TOPIC_TASK_EXECUTE. A batch short of the maximum is held back while its
+        oldest task has waited less than TASK_BATCH_MAX_WAIT, in case more of
+        its type and location arrive.
+
+        Placement is locality-aware, in the style of delay scheduling: a task
+        goes to a worker on the node holding its data where one has free
+        capacity. Otherwise it waits up to LOCALITY_WAIT, counted from the
+        first time it was passed over, while the tasks behind it are
+        dispatched, and then goes to any worker. Tasks whose location has no
+        worker at all do not wait. Among the workers that qualify, the
+        PLACEMENT_STRATEGY picks one (see agents/placement.py).
+        """
         with self.discovery_lock:
             if not self.task_backlog:
                 return
@@ -236,38 +543,97 @@ class LoadBalancerAgent(BaseAgent):
                 self.log(f"No available workers for {len(self.task_backlog)} queued tasks")
                 return
 
-            dispatched_count = 0
+            worker_nodes = self.registry.dispatchable_by_node
+            assignments = []
+            held = []
+            retry_delay = None
+            dispatched = 0
             while self.task_backlog and available_workers:
-                task_to_assign = self.task_backlog.popleft()
+                task_to_assign, enqueued_at = self.task_backlog.pop()
                 
                 if not self.validate_task(task_to_assign):
+                    self.locality_waiting.pop(task_to_assign["task_id"], None)
                     continue
                 
-                worker_to_assign = available_workers.pop(0)
-                
-                self.workers[worker_to_assign]["status"] = "BUSY"
-                self.workers[worker_to_assign]["last_seen"] = time.time()
-                
-                task_payload = {
-                    "task_id": task_to_assign["task_id"],
-                    "data": task_to_assign["data"],
-                    "priority": task_to_assign["priority"],
-                    "location": task_to_assign["location"]
-                }
+                location = task_to_assign["location"]
+                candidates = self.registry.available_by_node.get(location)
+                if not candidates:
+                    # The wait counts from the first time a free non-local worker was passed over.
+                    now = time.time()
+                    first_skipped = self.locality_waiting.get(task_to_assign["task_id"], now)
+                    wait_left = LOCALITY_WAIT - (now - first_skipped)
+                    if location not in NO_LOCATION and location in worker_nodes and wait_left > 0:
+                        if task_to_assign["task_id"] not in self.locality_waiting:
+                            self.locality_waiting[task_to_assign["task_id"]] = now
+                            self.locality["waited"] += 1
+                        held.append((task_to_assign, enqueued_at))
+                        retry_delay = min(retry_delay or wait_left, wait_left)
+                        continue
+                    candidates = available_workers
 
-                self.send_message(
-                    TOPIC_TASK_EXECUTE, 
-                    payload={"task": task_payload}, 
-                    recipient_id=worker_to_assign
-                )
-                
-                dispatched_count += 1
-                self.log(f"Task {task_to_assign['task_id']} assigned to worker {worker_to_assign}")
+                worker_to_assign = self.placement.choose(task_to_assign, candidates)
+                batch = [(task_to_assign, enqueued_at)]
+                max_batch = min(TASK_BATCH_MAX_SIZE, self.workers[worker_to_assign]["max_batch"])
+                if max_batch > 1 and batchable(task_to_assign):
+                    batch += [
+                        (task, task_enqueued_at)
+                        for task, task_enqueued_at in self.task_backlog.take(batch_group(task_to_assign), max_batch - 1)
+                        if self.validate_task(task)
+                    ]
+                    waited = time.time() - min(task_enqueued_at for _, task_enqueued_at in batch)
+                    if len(batch) < max_batch and waited < TASK_BATCH_MAX_WAIT:
+                        held.extend(batch)
+                        retry_delay = min(retry_delay or TASK_BATCH_MAX_WAIT, TASK_BATCH_MAX_WAIT)
+                        continue
+
+                now = time.time()
+                self.registry.touch(worker_to_assign, now)
+                task_payloads = []
+                node_id = self.workers[worker_to_assign]["node_id"]
+                for task, task_enqueued_at in batch:
+                    self.locality_waiting.pop(task["task_id"], None)
+                    self.record_wait(task, now - task_enqueued_at)
+                    if task["location"] not in NO_LOCATION:
+                        self.locality["local" if task["location"] == node_id else "remote"] += 1
+                    self.registry.assign(worker_to_assign, task["task_id"], task_to_assign["task_id"])
+                    task_payload = {
+                        "task_id": task["task_id"],
+                        "data": task["data"],
+                        "priority": task["priority"],
+                        "location": task["location"]
+                    }
+                    self.open_lease(task_payload, worker_to_assign, now, task_enqueued_at)
+                    self.tasks_dispatched += 1
+                    task_payloads.append(task_payload)
+                dispatched += len(batch)
+
+                if len(batch) == 1:
+                    assignments.append((TOPIC_TASK_EXECUTE, {"task": task_payloads[0]}, worker_to_assign))
+                    self.log(f"Task {task_to_assign['task_id']} assigned to worker {worker_to_assign}, "
+                             f"expected to take {self.predictor.estimate(task_to_assign, node_id):.2f}s")
+                else:
+                    self.batches_dispatched += 1
+                    assignments.append((TOPIC_TASK_EXECUTE, {"tasks": task_payloads}, worker_to_assign))
+                    self.log(f"Batch of {len(batch)} {task_type(task_to_assign)} tasks {[task['task_id'] for task in task_payloads]} assigned to worker {worker_to_assign}")
+
+            for task, task_enqueued_at in held:
+                self.task_backlog.push(task, task_enqueued_at)
+            if retry_delay is not None:
+                self.schedule_dispatch_retry(retry_delay)
 
-            self.log(f"Dispatched {dispatched_count} tasks. Remaining backlog: {len(self.task_backlog)}")
+            try:
+                delivered = self.send_messages(assignments)
+            except LaneFullError as e:
+                delivered = e.results or []
+            undelivered = [
+                assignment for i, assignment in enumerate(assignments)
+                if i >= len(delivered) or not delivered[i]
+            ]
+            if undelivered:
+                dispatched -= self.recall_assignments(undelivered)
+                self.log(f"Message bus refused {len(undelivered)} assignments; tasks returned to the backlog")
+                self.schedule_dispatch_retry(DISPATCH_RETRY_DELAY)
+            self.log(f"Dispatched {dispatched} tasks in {len(assignments) - len(undelivered)} assignments. Remaining backlog: {len(self.task_backlog)}")
             
             if self.task_backlog and not self.get_available_workers():
-                current_time = time.time()
-                if current_time - self.last_discovery_time > 5:
-                    self.log("Still have tasks but no available workers. Triggering discovery.")
-                    self.discover_existing_workers()
\ No newline at end of file
+                self.discover_if_stale("Still have tasks but no available workers.")
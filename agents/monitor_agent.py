@@ -7,27 +7,22 @@ class MonitorAgent(BaseAgent):
     def __init__(self, message_bus):
         super().__init__(MONITOR_AGENT_ID, message_bus)
         self.agent_heartbeats = {}
-        self.last_check_time = time.time()
 
     def register_subscriptions(self):
         self.message_bus.subscribe(TOPIC_AGENT_HEARTBEAT, self.handle_heartbeat)
 
     def setup(self):
-        pass
+        self.schedule(MONITOR_CHECK_INTERVAL, self.check_agent_health, interval=MONITOR_CHECK_INTERVAL)
 
     def handle_heartbeat(self, message):
         agent_id = message["sender_id"]
         self.agent_heartbeats[agent_id] = time.time()
         self.log(f"Received heartbeat from {agent_id}")
 
-    def on_message_loop(self):
-        current_time = time.time()
-        if current_time - self.last_check_time > MONITOR_CHECK_INTERVAL:
-            self.check_agent_health()
-            self.last_check_time = current_time
-
     def check_agent_health(self):
         self.log("Performing agent health check...")
+        self.log(f"Message bus shard depths: {self.message_bus.get_shard_depths()}")
+        self.log(f"Message bus lanes: {self.message_bus.get_lane_stats()}")
         current_time = time.time()
         unhealthy_threshold = AGENT_HEARTBEAT_INTERVAL * 2.5
         
@@ -0,0 +1,139 @@
+import bisect
+import hashlib
+import random
+import time
+from data.storage import content_key
+from config.settings import PLACEMENT_HASH_REPLICAS
+
+class PlacementStrategy:
+    """Chooses the worker for a dispatch unit.
+
+    The load balancer narrows the candidates first (workers with free
+    capacity, local ones where the task has a data location), so a strategy
+    only ranks them. choose() runs under the balancer's lock and may read its
+    registry and leases directly.
+    """
+
+    name = None
+
+    def __init__(self, balancer):
+        self.balancer = balancer
+        self.registry = balancer.registry
+
+    def choose(self, task, candidates):
+        raise NotImplementedError
+
+class MostFreeCapacity(PlacementStrategy):
+    """The candidate with the most free capacity (free slots plus prefetch room)."""
+
+    name = "most_free"
+
+    def choose(self, task, candidates):
+        return max(candidates, key=self.registry.available.get)
+
+class LeastCpu(PlacementStrategy):
+    """The candidate with the lowest reported CPU use per slot; ties go to the most free capacity.
+
+    CPU use is only as fresh as the worker's last status report, so a burst of
+    dispatches between reports is spread by free capacity alone.
+    """
+
+    name = "least_cpu"
+
+    def choose(self, task, candidates):
+        workers = self.registry.workers
+        return min(candidates, key=lambda w_id: (workers[w_id]["cpu_usage"] / workers[w_id]["slots"], -workers[w_id]["free"]))
+
+class PowerOfTwoChoices(PlacementStrategy):
+    """Of two candidates picked at random, the one with more free capacity."""
+
+    name = "power_of_two"
+
+    def choose(self, task, candidates):
+        candidates = list(candidates)
+        if len(candidates) <= 2:
+            sampled = candidates
+        else:
+            sampled = random.sample(candidates, 2)
+        return max(sampled, key=self.registry.available.get)
+
+class ConsistentHash(PlacementStrategy):
+    """Sends tasks with the same data to the same worker, so its result cache serves the repeats.
+
+    Workers sit on a hash ring at PLACEMENT_HASH_REPLICAS points each. A task
+    goes to the first worker clockwise from the hash of its data that is a
+    candidate; when the owner is full, the task moves to the next one on the
+    ring, and adding or removing a worker only moves the keys next to it.
+    """
+
+    name = "consistent_hash"
+
+    def __init__(self, balancer):
+        super().__init__(balancer)
+        self.ring = []
+        self.generation = None
+
+    @staticmethod
+    def ring_hash(key):
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def rebuild(self):
+        self.ring = sorted(
+            (self.ring_hash(f"{worker_id}#{replica}"), worker_id)
+            for worker_id in self.registry.workers
+            for replica in range(PLACEMENT_HASH_REPLICAS)
+        )
+        self.generation = self.registry.generation
+
+    def choose(self, task, candidates):
+        if self.generation != self.registry.generation:
+            self.rebuild()
+        start = bisect.bisect(self.ring, (int(content_key(task.get("data"))[:16], 16),))
+        for i in range(len(self.ring)):
+            worker_id = self.ring[(start + i) % len(self.ring)][1]
+            if worker_id in candidates:
+                return worker_id
+        return max(candidates, key=self.registry.available.get)
+
+class CostModel(PlacementStrategy):
+    """The candidate expected to finish the task soonest.
+
+    A worker's backlog is the expected time left on every task assigned to it,
+    spread over its slots; the task's own expected processing time is added
+    on top. Expected times come from the balancer's predictor, for the
+    worker's node.
+    """
+
+    name = "cost_model"
+
+    def estimate(self, task, worker_id):
+        return self.balancer.predictor.estimate(task, self.registry.workers[worker_id]["node_id"])
+
+    def pending_work(self, worker_id, now):
+        entry = self.registry.workers[worker_id]
+        leases = self.balancer.leases
+        work = 0.0
+        for task_id in entry["assigned"]:
+            lease = leases.get(task_id)
+            if lease is not None:
+                elapsed = now - lease["workers"].get(worker_id, now)
+                work += max(0.0, self.estimate(lease["task"], worker_id) - elapsed)
+        return work / entry["slots"]
+
+    def choose(self, task, candidates):
+        now = time.time()
+        return min(candidates, key=lambda w_id: self.pending_work(w_id, now) + self.estimate(task, w_id))
+
+PLACEMENT_STRATEGIES = {
+    MostFreeCapacity.name: MostFreeCapacity,
+    LeastCpu.name: LeastCpu,
+    PowerOfTwoChoices.name: PowerOfTwoChoices,
+    ConsistentHash.name: ConsistentHash,
+    CostModel.name: CostModel,
+}
+
+def create_placement_strategy(name, balancer):
+    strategy_type = PLACEMENT_STRATEGIES.get(name)
+    if strategy_type is None:
+        raise ValueError(f"Unknown placement strategy '{name}'")
+    return strategy_type(balancer)
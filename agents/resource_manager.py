@@ -15,13 +15,12 @@ class ResourceManagerAgent(BaseAgent):
         super().__init__(RESOURCE_MANAGER_ID, message_bus)
         self.task_queue = task_queue
         self.resources = {}
-        self.last_check_time = time.time()
 
     def register_subscriptions(self):
         self.message_bus.subscribe(TOPIC_RESOURCE_UPDATE, self.handle_resource_update)
     
     def setup(self):
-        pass
+        self.schedule(RESOURCE_MANAGER_CHECK_INTERVAL, self.evaluate_system_state, interval=RESOURCE_MANAGER_CHECK_INTERVAL)
 
     def handle_resource_update(self, message):
         agent_id = message["payload"]["agent_id"]
@@ -34,12 +33,6 @@ class ResourceManagerAgent(BaseAgent):
         })
         self.log(f"Resource update for {agent_id}: CPU={message['payload']['cpu']}%, Memory={message['payload']['memory']}%")
 
-    def on_message_loop(self):
-        current_time = time.time()
-        if current_time - self.last_check_time > RESOURCE_MANAGER_CHECK_INTERVAL:
-            self.evaluate_system_state()
-            self.last_check_time = current_time
-
     def evaluate_system_state(self):
         self.log("Evaluating system resource state...")
         self.check_for_overloaded_workers()
@@ -0,0 +1,330 @@
+import multiprocessing
+import pickle
+import random
+import struct
+import threading
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, CancelledError, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+from config.settings import (
+    CPU_WORK_ITERATIONS_PER_SECOND, TASK_EXECUTORS, DEFAULT_TASK_EXECUTOR, PROCESS_POOL_SIZE,
+    SHARED_MEMORY_THRESHOLD, TASK_PROGRESS_INTERVAL, TASK_WORKLOAD
+)
+
+SETUP_TIME = 2.0
+VECTOR_CHUNK = 1 << 20
+
+CONTROL_SIZE = 24
+PROGRESS = struct.Struct("dd")
+PROGRESS_OFFSET = 8
+
+class TaskCancelled(Exception):
+    pass
+
+def task_type(task):
+    """The template a task was generated from: the text before the ':' in its data."""
+    data = task.get("data")
+    if isinstance(data, str):
+        return data.split(":", 1)[0].strip()
+    return "generic"
+
+def complexity_factor(task):
+    data_complexity = len(str(task.get('data', '')))
+    return min(data_complexity / 100.0, 6.0)
+
+def simulated_processing_time(task):
+    return SETUP_TIME + complexity_factor(task) + random.uniform(0, 2)
+
+def expected_processing_time(task):
+    """The mean of simulated_processing_time(task), for placement decisions."""
+    return SETUP_TIME + complexity_factor(task) + 1.0
+
+def burn_cpu(seconds):
+    """Perform a fixed amount of pure-Python work, roughly `seconds` of one core."""
+    total = 0
+    for i in range(int(seconds * CPU_WORK_ITERATIONS_PER_SECOND)):
+        total += i * i
+    return total
+
+def burn_cpu_vectorized(seconds):
+    """The same sum of squares as burn_cpu(seconds), computed with NumPy in chunks."""
+    total = 0
+    iterations = int(seconds * CPU_WORK_ITERATIONS_PER_SECOND)
+    for start in range(0, iterations, VECTOR_CHUNK):
+        chunk = np.arange(start, min(start + VECTOR_CHUNK, iterations), dtype=np.int64)
+        total += int(np.dot(chunk, chunk))
+    return total
+
+def simulate_work(seconds, workload, vectorized=False):
+    if workload != "cpu":
+        time.sleep(seconds)
+    elif vectorized:
+        burn_cpu_vectorized(seconds)
+    else:
+        burn_cpu(seconds)
+
+def run_simulated_task(task, processing_time, workload, report_progress, is_cancelled):
+    """Work through a task in slices of at most a second, checking for cancellation between slices.
+
+    report_progress gets the fraction done and the CPU time the task's thread
+    has used so far; the result carries the total.
+    """
+    cpu_start = time.thread_time()
+    work_done = 0.0
+    while work_done < processing_time:
+        if is_cancelled():
+            raise TaskCancelled(task.get("task_id"))
+        work_slice = min(1.0, processing_time - work_done)
+        simulate_work(work_slice, workload)
+        work_done += work_slice
+        report_progress(work_done / processing_time, time.thread_time() - cpu_start)
+    return {
+        "task_type": task_type(task),
+        "processing_time": round(processing_time, 3),
+        "cpu_time": round(time.thread_time() - cpu_start, 4)
+    }
+
+BATCH_HANDLERS = {}
+
+def batch_handler(*task_types):
+    """Register a handler that runs several tasks of the given types as one batch.
+
+    A handler is called as handler(tasks, processing_times, workload,
+    report_progress, is_cancelled) and returns one result per task, in order.
+    It must be a module-level function so process executors can pickle it.
+    """
+    def register(handler):
+        for name in task_types:
+            BATCH_HANDLERS[name] = handler
+        return handler
+    return register
+
+def batchable(task):
+    return task_type(task) in BATCH_HANDLERS
+
+def batch_handler_for(task):
+    return BATCH_HANDLERS[task_type(task)]
+
+def run_batch(tasks, processing_times, workload, report_progress, is_cancelled, vectorized):
+    """Pay the setup once for the whole batch, then each task's own work.
+
+    The setup and the CPU time are split evenly across the tasks' results.
+    """
+    cpu_start = time.thread_time()
+    work = [SETUP_TIME] + [max(processing_time - SETUP_TIME, 0.0) for processing_time in processing_times]
+    total = sum(work)
+    work_done = 0.0
+    for seconds in work:
+        while seconds > 0:
+            if is_cancelled():
+                raise TaskCancelled(tasks[0].get("task_id"))
+            work_slice = min(1.0, seconds)
+            simulate_work(work_slice, workload, vectorized)
+            seconds -= work_slice
+            work_done += work_slice
+            report_progress(work_done / total, time.thread_time() - cpu_start)
+    setup_share = SETUP_TIME / len(tasks)
+    cpu_share = (time.thread_time() - cpu_start) / len(tasks)
+    return [{
+        "task_type": task_type(task),
+        "processing_time": round(task_work + setup_share, 3),
+        "cpu_time": round(cpu_share, 4),
+        "batch_size": len(tasks)
+    } for task, task_work in zip(tasks, work[1:])]
+
+@batch_handler("Transcode audio file", "Process customer feedback log")
+def run_batch_sequential(tasks, processing_times, workload, report_progress, is_cancelled):
+    return run_batch(tasks, processing_times, workload, report_progress, is_cancelled, vectorized=False)
+
+@batch_handler("Run ML inference on image batch", "Calculate financial risk model for transaction", "Analyze sales data for region")
+def run_batch_vectorized(tasks, processing_times, workload, report_progress, is_cancelled):
+    return run_batch(tasks, processing_times, workload, report_progress, is_cancelled, vectorized=True)
+
+def to_shared(obj):
+    """Reference to `obj` for handing to another process.
+
+    Small objects go inline and are pickled with the call; above
+    SHARED_MEMORY_THRESHOLD bytes the pickle is written to a shared memory
+    block and only its name crosses the pipe. The receiver reads it with
+    from_shared(); whoever created the block unlinks it with release().
+    """
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) <= SHARED_MEMORY_THRESHOLD:
+        return ("inline", obj)
+    block = shared_memory.SharedMemory(create=True, size=len(data))
+    block.buf[:len(data)] = data
+    block.close()
+    return ("shm", block.name, len(data))
+
+def from_shared(ref):
+    if ref[0] == "inline":
+        return ref[1]
+    block = shared_memory.SharedMemory(name=ref[1])
+    try:
+        return pickle.loads(bytes(block.buf[:ref[2]]))
+    finally:
+        block.close()
+
+def release(ref):
+    if ref[0] == "shm":
+        try:
+            block = shared_memory.SharedMemory(name=ref[1])
+        except FileNotFoundError:
+            return
+        block.close()
+        block.unlink()
+
+def run_in_process(job, args_ref, control_name):
+    """Pool-process entry point: job(*args, report_progress, is_cancelled).
+
+    The control block is shared with the submitting worker slot: byte 0 is the
+    cancel flag it sets, and two doubles at PROGRESS_OFFSET are the fraction
+    done and the CPU time used, which it polls.
+    """
+    control = shared_memory.SharedMemory(name=control_name)
+    try:
+        result = job(
+            *from_shared(args_ref),
+            lambda fraction, cpu_time: PROGRESS.pack_into(control.buf, PROGRESS_OFFSET, fraction, cpu_time),
+            lambda: control.buf[0] == 1
+        )
+        return to_shared(result)
+    finally:
+        control.close()
+
+class ThreadTaskExecutor:
+    """Runs jobs on the calling worker slot thread.
+
+    A job is run_simulated_task or a batch handler, called with its arguments
+    followed by report_progress and is_cancelled; execution_id names the run
+    for cancel() and cpu_time().
+    """
+
+    name = "thread"
+
+    def __init__(self):
+        self.cancel_events = {}
+        self.cpu_times = {}
+
+    def run(self, execution_id, job, args, report_progress):
+        cancelled = self.cancel_events[execution_id] = threading.Event()
+
+        def on_progress(fraction, cpu_time):
+            self.cpu_times[execution_id] = cpu_time
+            report_progress(fraction)
+
+        try:
+            return job(*args, on_progress, cancelled.is_set)
+        finally:
+            self.cancel_events.pop(execution_id, None)
+            self.cpu_times.pop(execution_id, None)
+
+    def cpu_time(self, execution_id):
+        return self.cpu_times.get(execution_id, 0.0)
+
+    def cancel(self, execution_id):
+        event = self.cancel_events.get(execution_id)
+        if event is None:
+            return False
+        event.set()
+        return True
+
+class ProcessTaskExecutor:
+    """Runs jobs in the process-wide pool of worker processes.
+
+    The worker slot that submits a job blocks on its future, relaying the
+    progress the pool process writes to their shared control block every
+    TASK_PROGRESS_INTERVAL seconds. cancel() drops a task that has not started
+    yet and flags a running one, which stops at its next slice.
+    """
+
+    name = "process"
+
+    def __init__(self):
+        self.running = {}
+        self.lock = threading.Lock()
+
+    def run(self, execution_id, job, args, report_progress):
+        control = shared_memory.SharedMemory(create=True, size=CONTROL_SIZE)
+        control.buf[:CONTROL_SIZE] = bytes(CONTROL_SIZE)
+        args_ref = to_shared(args)
+        try:
+            future = get_process_pool().submit(run_in_process, job, args_ref, control.name)
+            with self.lock:
+                self.running[execution_id] = (future, control)
+            reported = 0.0
+            while True:
+                try:
+                    result_ref = future.result(timeout=TASK_PROGRESS_INTERVAL)
+                    break
+                except FutureTimeoutError:
+                    progress = PROGRESS.unpack_from(control.buf, PROGRESS_OFFSET)[0]
+                    if progress > reported:
+                        reported = progress
+                        report_progress(progress)
+                except CancelledError:
+                    raise TaskCancelled(execution_id)
+            try:
+                return from_shared(result_ref)
+            finally:
+                release(result_ref)
+        finally:
+            with self.lock:
+                self.running.pop(execution_id, None)
+                control.close()
+            control.unlink()
+            release(args_ref)
+
+    def cancel(self, execution_id):
+        with self.lock:
+            running = self.running.get(execution_id)
+            if running is None:
+                return False
+            future, control = running
+            if not future.cancel():
+                control.buf[0] = 1
+            return True
+
+    def cpu_time(self, execution_id):
+        with self.lock:
+            running = self.running.get(execution_id)
+            return PROGRESS.unpack_from(running[1].buf, PROGRESS_OFFSET)[1] if running else 0.0
+
+EXECUTOR_TYPES = {
+    ThreadTaskExecutor.name: ThreadTaskExecutor,
+    ProcessTaskExecutor.name: ProcessTaskExecutor,
+}
+
+def create_executors():
+    """One executor of each kind, keyed by the names TASK_EXECUTORS uses.
+
+    Daemonic processes cannot start children, so a worker that already runs in
+    its own process (the "processes" runtime) executes everything on threads.
+    """
+    if multiprocessing.current_process().daemon:
+        thread_executor = ThreadTaskExecutor()
+        return {name: thread_executor for name in EXECUTOR_TYPES}
+    return {name: executor_type() for name, executor_type in EXECUTOR_TYPES.items()}
+
+def executor_name(task, workload=TASK_WORKLOAD):
+    """The executor a task runs on. Only CPU-bound work goes to the process pool.
+
+    A sleeping task would hold a pool process (and its worker slot while it
+    queues for one) without using a core, so with any other workload every
+    task runs on a thread.
+    """
+    if workload != "cpu":
+        return ThreadTaskExecutor.name
+    return TASK_EXECUTORS.get(task_type(task), DEFAULT_TASK_EXECUTOR)
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def get_process_pool():
+    """The process-wide pool behind every ProcessTaskExecutor, started on first use."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=PROCESS_POOL_SIZE, mp_context=multiprocessing.get_context("spawn"))
+        return _process_pool
@@ -1,212 +1,561 @@
 import time
-import random
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from agents.base_agent import BaseAgent
 from communication.protocol import (
     TOPIC_TASK_EXECUTE, TOPIC_TASK_COMPLETED, TOPIC_AGENT_REGISTER, 
-    TOPIC_AGENT_STATUS_UPDATE, TOPIC_RESOURCE_UPDATE, TOPIC_SYSTEM_COMMAND, CMD_SHUTDOWN_WORKER
+    TOPIC_AGENT_STATUS_UPDATE, TOPIC_RESOURCE_UPDATE, TOPIC_SYSTEM_COMMAND, TOPIC_WORKER_DISCOVERY,
+    TOPIC_TASK_RETURN, TOPIC_STEAL_CANDIDATES, TOPIC_TASK_STEAL, TOPIC_TASK_STOLEN, CMD_SHUTDOWN_WORKER, CMD_CANCEL_TASK, CMD_PAUSE_WORKER, CMD_RESUME_WORKER
+)
+from agents.task_executors import (
+    TaskCancelled, batch_handler_for, create_executors, executor_name, run_simulated_task,
+    simulated_processing_time, task_type
+)
+from config.settings import (
+    TASK_WORKLOAD, WORKER_SLOTS, WORKER_PREFETCH_DEPTH, WORK_STEALING, WORK_STEAL_TIMEOUT, LOAD_BALANCER_ID,
+    RESOURCE_SAMPLE_INTERVAL, TASK_BATCH_MAX_SIZE
 )
 from data.processor import preprocess_data
 from tasks.task import TaskStatus
+from data.storage import content_key, get_result_cache
+from utils.resource_sampler import get_resource_sampler
 
 class WorkerAgent(BaseAgent):
-    def __init__(self, agent_id, message_bus, node_id: str):
+    """Runs up to `slots` tasks at once on a bounded thread pool.
+
+    Status payloads carry `slots` and `free_slots` so the load balancer can
+    dispatch against free capacity; `status` stays IDLE while nothing runs and
+    BUSY while at least one task does.
+
+    Up to `prefetch_depth` further tasks wait in a local buffer and start as
+    soon as a slot frees up, so the next task is already here when one
+    finishes. `free_capacity` counts both, and is what the load balancer
+    dispatches against. Buffered tasks go back to the load balancer
+    (TOPIC_TASK_RETURN) when the worker is paused or shut down.
+
+    A worker left with a free slot and an empty buffer steals a buffered task
+    from a peer (see try_steal). Only tasks that have not started can be
+    stolen, and the victim removes one from its buffer under the slot lock
+    before sending it on, so a task runs on exactly one worker.
+
+    Each slot hands its task to the executor TASK_EXECUTORS names for the
+    task's type: the slot thread itself, or the shared process pool. The
+    pool is only used for the "cpu" workload.
+
+    The load balancer may send a micro-batch of up to `max_batch` tasks of one
+    batchable type (TOPIC_TASK_EXECUTE with "tasks"). A batch takes one slot
+    or one buffer place, runs through its type's batch handler, and still
+    reports every task with its own TOPIC_TASK_COMPLETED.
+    """
+
+    def __init__(self, agent_id, message_bus, node_id: str, workload=TASK_WORKLOAD, slots=WORKER_SLOTS,
+                 prefetch_depth=WORKER_PREFETCH_DEPTH, work_stealing=WORK_STEALING, max_batch=TASK_BATCH_MAX_SIZE):
         super().__init__(agent_id, message_bus)
         self.node_id = node_id
+        self.workload = workload
+        self.slots = slots
         self.status = "IDLE"
-        self.current_task = None
-        self.current_task_id = None
+        self.prefetch_depth = prefetch_depth
+        self.max_batch = max_batch
+        self.running_tasks = {}
+        self.busy_slots = 0
+        self.task_buffer = deque()
+        self.batch_of = {}
+        self.cancelled_members = set()
+        self.accepting_prefetch = True
+        self.draining = False
+        self.work_stealing = work_stealing
+        self.stealing = False
+        self.slot_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=slots, thread_name_prefix=f"{agent_id}-slot")
+        self.task_executors = create_executors()
         self.last_heartbeat = time.time()
         self.tasks_completed = 0
-        
-        self.start_heartbeat()
+        self.sampler = get_resource_sampler()
+        self.result_cache = get_result_cache()
+        self.task_cpu_seconds = 0.0
+        self.usage_sampled_at = time.monotonic()
+        self.usage_cpu_seconds = 0.0
+        self.cpu_usage = 0.0
 
     def register_subscriptions(self):
         self.message_bus.subscribe(TOPIC_TASK_EXECUTE, self.handle_task_execute)
         self.message_bus.subscribe(TOPIC_SYSTEM_COMMAND, self.handle_system_command)
-        
+        self.message_bus.subscribe(TOPIC_WORKER_DISCOVERY, self.handle_discovery_request)
+        self.message_bus.subscribe(TOPIC_TASK_STEAL, self.handle_steal_request)
+
     def setup(self):
         register_payload = {
             "agent_id": self.agent_id,
             "status": self.status, 
-            "node_id": self.node_id
+            "node_id": self.node_id,
+            **self.capacity_fields()
         }
         self.send_message(TOPIC_AGENT_REGISTER, payload=register_payload)
         
         self.update_status(self.status)
         
-        self.report_resources(is_busy=False)
+        self.report_resources()
 
-    def start_heartbeat(self):
-        def heartbeat_loop():
-            while self._is_running:
-                try:
-                    time.sleep(30)
-                    if self._is_running:
-                        self.send_heartbeat()
-                except Exception as e:
-                    self.log(f"Heartbeat error: {e}", level='error')
-        
-        heartbeat_thread = threading.Thread(target=heartbeat_loop, daemon=True)
-        heartbeat_thread.start()
+    def free_slots(self):
+        return self.slots - self.busy_slots
+
+    def free_capacity(self):
+        buffer_room = self.prefetch_depth - len(self.task_buffer) if self.accepting_prefetch else 0
+        return max(0, self.free_slots()) + max(0, buffer_room)
+
+    def capacity_fields(self):
+        return {
+            "slots": self.slots,
+            "free_slots": self.free_slots(),
+            "prefetch_depth": self.prefetch_depth,
+            "queued_tasks": sum(len(unit) for unit in self.task_buffer),
+            "free_capacity": self.free_capacity(),
+            "max_batch": self.max_batch
+        }
+
+    def processing_time(self, task):
+        """How long `task` runs here; benchmarks override it to model faster or slower nodes."""
+        return simulated_processing_time(task)
+
+    def task_cpu_time(self):
+        """CPU seconds used by this worker's tasks so far, finished and running."""
+        running = sum(
+            task_executor.cpu_time(task_id)
+            for task_executor in set(self.task_executors.values())
+            for task_id in list(self.running_tasks)
+        )
+        return self.task_cpu_seconds + running
+
+    def resource_usage(self):
+        """CPU as % of one core used by this worker's tasks, memory as % of node memory held by this process.
+
+        The CPU rate is recomputed at most every RESOURCE_SAMPLE_INTERVAL
+        seconds; memory comes from the shared sampler's cached reading.
+        """
+        now = time.monotonic()
+        if now - self.usage_sampled_at >= RESOURCE_SAMPLE_INTERVAL:
+            cpu_seconds = self.task_cpu_time()
+            self.cpu_usage = min(100.0 * self.slots, 100.0 * (cpu_seconds - self.usage_cpu_seconds) / (now - self.usage_sampled_at))
+            self.usage_sampled_at = now
+            self.usage_cpu_seconds = cpu_seconds
+        return round(self.cpu_usage, 2), round(self.sampler.reading["process_memory_percent"], 2)
 
     def send_heartbeat(self):
         self.last_heartbeat = time.time()
 
-        cpu_usage = random.uniform(2, 98)
-        memory_usage = random.uniform(10, 80)
+        cpu_usage, memory_usage = self.resource_usage()
 
         heartbeat_payload = {
             "agent_id": self.agent_id,
             "status": self.status,
             "node_id": self.node_id,
-            "current_task_id": self.current_task_id,
+            "current_task_ids": list(self.running_tasks),
+            **self.capacity_fields(),
             "heartbeat": True,
             "timestamp": self.last_heartbeat,
-            "cpu_usage": round(cpu_usage, 2),
-            "memory_usage": round(memory_usage, 2)
+            "cpu_usage": cpu_usage,
+            "memory_usage": memory_usage
         }
 
         self.send_message(TOPIC_AGENT_STATUS_UPDATE, payload=heartbeat_payload)
-        self.report_resources(is_busy=(self.status == "BUSY"))
+        self.report_resources()
 
     def handle_task_execute(self, message):
         if not self._is_running:
             return
 
-        if self.status == "BUSY":
-            self.log(f"Worker {self.agent_id} is already BUSY, cannot accept new task")
-            return
+        payload = message["payload"]
+        tasks = payload.get("tasks") or [payload["task"]]
+        if payload.get("hedge"):
+            # Marked on the task itself, so the mark survives buffering and stealing.
+            tasks = [dict(task, hedge=True) for task in tasks]
+        task_ids = [task.get('task_id', 'unknown') for task in tasks]
+        label = task_ids[0] if len(tasks) == 1 else f"batch {task_ids}"
 
-        task_data = message["payload"]["task"]
-        task_id = task_data.get('task_id', 'unknown')
-        
-        self.current_task = task_data
-        self.current_task_id = task_id
+        with self.slot_lock:
+            if self.draining:
+                started = None
+            elif self.busy_slots < self.slots:
+                self.busy_slots += 1
+                self.running_tasks.update(zip(task_ids, tasks))
+                started = True
+            elif self.accepting_prefetch and len(self.task_buffer) < self.prefetch_depth:
+                self.task_buffer.append(tasks)
+                buffered = len(self.task_buffer)
+                started = False
+            else:
+                started = None
         
-        self.log(f"Received task {task_id} for execution")
+        if started is None:
+            reason = "shutdown" if self.draining else "full"
+            self.log(f"Worker {self.agent_id} is {'shutting down' if self.draining else 'full'}, returning {label}")
+            self.return_tasks(tasks, reason)
+            return
+        if not started:
+            self.log(f"Buffered {label} ({buffered}/{self.prefetch_depth} prefetched)")
+            return
+
+        stolen_from = payload.get("stolen_from")
+        self.log(f"Received {label} for execution" + (f", stolen from {stolen_from}" if stolen_from else "") + f" ({self.free_slots()}/{self.slots} slots free)")
         
-        self.update_status("BUSY", task_id=task_id)
-        self.report_resources(is_busy=True)
+        self.update_status("BUSY", task_id=task_ids[0])
+        self.report_resources()
 
-        task_thread = threading.Thread(
-            target=self._execute_task_in_background,
-            args=(self.current_task,),
-            daemon=True
-        )
-        task_thread.start()
+        self.executor.submit(self._run_unit, tasks)
+
+    def _run_unit(self, tasks):
+        """Run one dispatched unit (a task or a batch) on this slot, free the slot, then report."""
+        outcomes = []
+        started_at = time.time()
+        try:
+            if len(tasks) == 1:
+                outcomes = self._execute_task(tasks[0])
+            else:
+                outcomes = self._execute_batch(tasks)
+        finally:
+            self._release_slot(tasks)
+            if outcomes:
+                self._finish_tasks(outcomes, started_at)
+            if self.draining and not self.running_tasks and self._is_running:
+                self.log("Running tasks finished, shutting down")
+                self.stop()
 
-    def _execute_task_in_background(self, task):
+    def _execute_task(self, task):
         task_id = task.get('task_id', 'unknown')
-        self.log(f"Starting execution of task {task_id} in background thread")
+        task_executor = self.task_executors[executor_name(task, self.workload)]
         
         try:
-            data_complexity = len(str(task.get('data', '')))
-            base_time = 2.0
-            complexity_factor = min(data_complexity / 100.0, 6.0)
-            processing_time = base_time + complexity_factor + random.uniform(0, 2)
-            
-            self.log(f"Task {task_id} estimated processing time: {processing_time:.2f} seconds")
-            
-            start_time = time.time()
-            while time.time() - start_time < processing_time:
-                if not self._is_running:
-                    self.log(f"Worker shutting down, aborting task {task_id}")
-                    return
-                    
-                time.sleep(min(1.0, processing_time - (time.time() - start_time)))
-                
-                if time.time() - start_time > 1.0:
-                    progress = min(100, int(((time.time() - start_time) / processing_time) * 100))
-                    self.log(f"Task {task_id} progress: {progress}%")
-
-            self.log(f"Successfully completed task {task_id}")
-            self.tasks_completed += 1
-            self._finish_task(task_id, "completed")
+            def execute():
+                self.log(f"Starting execution of task {task_id} ({task_type(task)}) on the {task_executor.name} executor")
+                processing_time = self.processing_time(task)
+                self.log(f"Task {task_id} estimated processing time: {processing_time:.2f} seconds")
+
+                def report_progress(fraction):
+                    if fraction * processing_time > 1.0:
+                        self.log(f"Task {task_id} progress: {min(100, int(fraction * 100))}%")
+
+                return task_executor.run(task_id, run_simulated_task, (task, processing_time, self.workload), report_progress)
+
+            # Identical task data yields the same result: serve repeats from the
+            # cache, and let concurrent repeats wait for the first execution. A
+            # hedge copy must not wait on the straggler it is racing.
+            result, cache = self.result_cache.run(content_key(task.get("data")), execute, coalesce=not task.get("hedge"))
+
+            if cache == "miss":
+                self.log(f"Successfully completed task {task_id}")
+            else:
+                self.log(f"Completed task {task_id} from the result cache ({cache})")
+            # Several slot threads finish tasks at once.
+            with self.slot_lock:
+                if cache == "miss":
+                    self.task_cpu_seconds += result.get("cpu_time", 0.0)
+                self.tasks_completed += 1
+            return [(task_id, "completed", result, cache)]
+
+        except TaskCancelled:
+            if not self._is_running:
+                self.log(f"Worker shutting down, aborted task {task_id}")
+                return []
+            self.log(f"Task {task_id} cancelled")
+            return [(task_id, "cancelled", None, None)]
             
         except Exception as e:
             self.log(f"Error executing task {task_id}: {e}", level='error')
-            self._finish_task(task_id, "failed")
+            return [(task_id, "failed", None, None)]
+
+    def _execute_batch(self, tasks):
+        """Run a micro-batch through its type's batch handler.
+
+        The result cache is consulted for the whole batch first: stored results
+        are served, payloads another execution is computing are waited for, and
+        only one task per remaining payload goes into the batch. A member
+        cancelled while the batch runs (a hedge loser) is reported as cancelled
+        when the batch ends.
+        """
+        keys = [content_key(task.get("data")) for task in tasks]
+        stored, waiting, claimed = self.result_cache.claim(keys)
+        leaders = {}
+        for task, key in zip(tasks, keys):
+            if key in claimed and key not in leaders:
+                leaders[key] = task
+
+        results = {}
+        cancelled = set()
+        failure = None
+        if leaders:
+            try:
+                computed, cancelled = self._run_batch(list(leaders.values()))
+            except Exception as e:
+                for key in leaders:
+                    self.result_cache.fail(key, e)
+                if isinstance(e, TaskCancelled) and not self._is_running:
+                    self.log(f"Worker shutting down, aborted batch {[task['task_id'] for task in tasks]}")
+                    return []
+                failure = "cancelled" if isinstance(e, TaskCancelled) else "failed"
+                self.log(f"Batch {[task['task_id'] for task in leaders.values()]} {failure}" + (f": {e}" if failure == "failed" else ""))
+            else:
+                for key, result in zip(leaders, computed):
+                    self.result_cache.finish(key, result)
+                    with self.slot_lock:
+                        self.task_cpu_seconds += result.get("cpu_time", 0.0)
+                    results[key] = result
+
+        outcomes = []
+        for task, key in zip(tasks, keys):
+            task_id = task["task_id"]
+            if task_id in cancelled:
+                outcomes.append((task_id, "cancelled", None, None))
+                continue
+            if key in stored:
+                result, cache = stored[key], "hit"
+            elif key in results:
+                result, cache = results[key], "miss" if leaders[key] is task else "coalesced"
+            elif key in waiting:
+                try:
+                    result, cache = waiting[key].result(), "coalesced"
+                except Exception:
+                    outcomes.extend(self._execute_task(task))
+                    continue
+            else:
+                outcomes.append((task_id, failure, None, None))
+                continue
+            with self.slot_lock:
+                self.tasks_completed += 1
+            outcomes.append((task_id, "completed", result, cache))
+        return outcomes
+
+    def _run_batch(self, tasks):
+        """Execute tasks of one type as a single job; returns their results and the members cancelled meanwhile."""
+        task_ids = [task["task_id"] for task in tasks]
+        execution_id = task_ids[0]
+        task_executor = self.task_executors[executor_name(tasks[0], self.workload)]
+        processing_times = [self.processing_time(task) for task in tasks]
+        with self.slot_lock:
+            self.batch_of.update(dict.fromkeys(task_ids, execution_id))
+        self.log(f"Starting batch of {len(tasks)} {task_type(tasks[0])} tasks {task_ids} on the {task_executor.name} executor")
+
+        def report_progress(fraction):
+            self.log(f"Batch {execution_id} progress: {min(100, int(fraction * 100))}%")
 
-    def _finish_task(self, task_id, result_status):
         try:
-            self.current_task = None
-            self.current_task_id = None
-            
-            if result_status == "completed":
-                self.status = "IDLE"
+            if len(tasks) == 1:
+                results = [task_executor.run(execution_id, run_simulated_task,
+                                             (tasks[0], processing_times[0], self.workload), report_progress)]
             else:
+                results = task_executor.run(execution_id, batch_handler_for(tasks[0]),
+                                            (tasks, processing_times, self.workload), report_progress)
+        finally:
+            with self.slot_lock:
+                for task_id in task_ids:
+                    self.batch_of.pop(task_id, None)
+                cancelled = self.cancelled_members.intersection(task_ids)
+                self.cancelled_members.difference_update(task_ids)
+        self.log(f"Successfully completed batch {task_ids}")
+        return results, cancelled
+
+    def cancel_task(self, task_id):
+        cancel_batch = False
+        with self.slot_lock:
+            unit = next((unit for unit in self.task_buffer if any(task["task_id"] == task_id for task in unit)), None)
+            if unit is not None:
+                unit[:] = [task for task in unit if task["task_id"] != task_id]
+                if not unit:
+                    self.task_buffer.remove(unit)
+            execution_id = self.batch_of.get(task_id)
+            if execution_id is not None:
+                self.cancelled_members.add(task_id)
+                members = [member for member, batch in self.batch_of.items() if batch == execution_id]
+                cancel_batch = self.cancelled_members.issuperset(members)
+        if unit is not None:
+            self._finish_tasks([(task_id, "cancelled", None, None)])
+            return True
+        if execution_id is not None:
+            if cancel_batch:
+                self.cancel_execution(execution_id)
+            return True
+        return self.cancel_execution(task_id)
+
+    def cancel_execution(self, execution_id):
+        for task_executor in set(self.task_executors.values()):
+            if task_executor.cancel(execution_id):
+                return True
+        return False
+
+    def _release_slot(self, tasks):
+        with self.slot_lock:
+            for task in tasks:
+                self.running_tasks.pop(task.get("task_id", "unknown"), None)
+            self.busy_slots -= 1
+            can_start = self._is_running and self.busy_slots < self.slots
+            next_unit = self.task_buffer.popleft() if self.task_buffer and can_start else None
+            if next_unit is not None:
+                self.busy_slots += 1
+                self.running_tasks.update((task["task_id"], task) for task in next_unit)
+        if next_unit is not None:
+            self.log(f"Starting prefetched tasks {[task['task_id'] for task in next_unit]}")
+            self.executor.submit(self._run_unit, next_unit)
+        elif self.work_stealing:
+            self.post(self.try_steal)
+
+    def _finish_tasks(self, outcomes, started_at=None):
+        """Report finished tasks: one status update, a TOPIC_TASK_COMPLETED per task, one resource update."""
+        task_ids = [outcome[0] for outcome in outcomes]
+        try:
+            if any(outcome[1] == "failed" for outcome in outcomes):
                 self.status = "FAILED"
-                threading.Timer(5.0, lambda: setattr(self, 'status', 'IDLE')).start()
+                self.schedule(5.0, self.recover_from_failure)
+            elif self.status in ("IDLE", "BUSY"):
+                self.status = "BUSY" if self.running_tasks else "IDLE"
             
+            now = time.time()
             status_update_payload = {
                 "agent_id": self.agent_id,
                 "status": self.status,
                 "node_id": self.node_id,
-                "task_completed": task_id,
+                "task_completed": task_ids[-1],
                 "tasks_completed": self.tasks_completed,
-                "timestamp": time.time()
+                **self.capacity_fields(),
+                "timestamp": now
             }
-            self.send_message(TOPIC_AGENT_STATUS_UPDATE, payload=status_update_payload)
+            messages = [(TOPIC_AGENT_STATUS_UPDATE, status_update_payload, None)]
+            for task_id, result_status, result, cache in outcomes:
+                messages.append((TOPIC_TASK_COMPLETED, {
+                    "task_id": task_id,
+                    "worker_id": self.agent_id,
+                    "node_id": self.node_id,
+                    "status": result_status,
+                    "result": result,
+                    "cache": cache,
+                    "started_at": started_at,
+                    "completion_time": now
+                }, None))
+            messages.append((TOPIC_RESOURCE_UPDATE, self.get_resource_payload(), None))
+            self.send_messages(messages)
             
-            completed_payload = {
-                "task_id": task_id,
-                "worker_id": self.agent_id,
-                "node_id": self.node_id,
-                "status": result_status,
-                "completion_time": time.time()
-            }
-            self.send_message(TOPIC_TASK_COMPLETED, payload=completed_payload)
-            
-            self.report_resources(is_busy=False)
-            
-            self.log(f"Task {task_id} finished with status: {result_status}. Worker now {self.status}")
+            for task_id, result_status, _, _ in outcomes:
+                self.log(f"Task {task_id} finished with status: {result_status}. Worker now {self.status}")
             
         except Exception as e:
-            self.log(f"Error finishing task {task_id}: {e}", level='error')
+            self.log(f"Error finishing tasks {task_ids}: {e}", level='error')
+
+    def try_steal(self):
+        """Ask the load balancer which peers have buffered tasks, then try them in turn.
+
+        The load balancer lists peers it has given more tasks than they have
+        slots, same-node peers first. Runs on the agent thread, one attempt at a
+        time.
+        """
+        if self.stealing or not self._is_running or self.status not in ("IDLE", "BUSY"):
+            return
+        if self.task_buffer or self.free_slots() <= 0:
+            return
+        self.stealing = True
+        candidates = self.request(TOPIC_STEAL_CANDIDATES, {"agent_id": self.agent_id, "node_id": self.node_id},
+                                  recipient_id=LOAD_BALANCER_ID, timeout=WORK_STEAL_TIMEOUT)
+        candidates.add_done_callback(
+            lambda future: self.post(lambda: self.steal_from([] if future.exception() else future.result().get("victims", [])))
+        )
+
+    def steal_from(self, victims):
+        if not victims or not self._is_running or self.free_slots() <= 0:
+            self.stealing = False
+            return
+        victim = victims[0]
+        attempt = self.request(TOPIC_TASK_STEAL, {"thief_id": self.agent_id, "node_id": self.node_id},
+                               recipient_id=victim, timeout=WORK_STEAL_TIMEOUT)
+
+        def on_answer(future):
+            if future.exception() is None and future.result().get("task_id"):
+                # The task itself arrives as a TOPIC_TASK_EXECUTE from the victim.
+                self.stealing = False
+                return
+            self.steal_from(victims[1:])
+
+        attempt.add_done_callback(lambda future: self.post(lambda: on_answer(future)))
+
+    def handle_steal_request(self, message):
+        """Give the most recently buffered task (or batch) to a thief and tell the load balancer it moved."""
+        thief_id = message.get("payload", {}).get("thief_id")
+        with self.slot_lock:
+            tasks = self.task_buffer.pop() if self.task_buffer else None
+        if tasks is None:
+            self.reply(message, {"task_id": None})
+            return
+        task_ids = [task["task_id"] for task in tasks]
+        self.log(f"Tasks {task_ids} stolen by {thief_id}")
+        self.send_messages([
+            (TOPIC_TASK_STOLEN, {"task_ids": task_ids, "from_worker": self.agent_id, "to_worker": thief_id, **self.capacity_fields()}, LOAD_BALANCER_ID),
+            (TOPIC_TASK_EXECUTE, {"tasks": tasks, "stolen_from": self.agent_id}, thief_id),
+        ])
+        self.reply(message, {"task_id": task_ids[0]})
+
+    def recover_from_failure(self):
+        if self.status == "FAILED":
+            self.update_status("BUSY" if self.running_tasks else "IDLE")
 
     def handle_system_command(self, message):
         payload = message.get("payload", {})
         command = payload.get("command")
-        
-        if command == "WORKER_DISCOVERY_REQUEST":
-            self.log(f"Responding to worker discovery request from {payload.get('requester', 'unknown')}")
-            self.respond_to_discovery()
-            return
-        
-        if message.get("recipient_id") == self.agent_id or message.get("recipient_id") == "broadcast":
+
+        if command == CMD_PAUSE_WORKER and payload.get("target_worker") == self.agent_id:
+            self.log("Paused by the resource manager - returning prefetched tasks")
+            self.accepting_prefetch = False
+            self.return_buffered_tasks("paused")
+        elif command == CMD_RESUME_WORKER and payload.get("target_worker") == self.agent_id:
+            self.accepting_prefetch = True
+
+        # The bus only delivers directed commands to their recipient, so any
+        # addressed message that reaches this handler is meant for this worker.
+        if message.get("recipient_id"):
             if command == CMD_SHUTDOWN_WORKER:
-                self.log("Received shutdown command. Will terminate after current task.")
+                self.log("Received shutdown command. Will terminate after the running tasks.")
                 self.graceful_shutdown()
+            elif command == CMD_CANCEL_TASK:
+                task_id = payload.get("task_id")
+                if self.cancel_task(task_id):
+                    self.log(f"Cancelling task {task_id}")
             elif command == "PAUSE_WORKER":
                 self.log("Received pause command - stopping task acceptance")
                 self.status = "PAUSED"
+                self.accepting_prefetch = False
                 self.update_status("PAUSED")
+                self.return_buffered_tasks("paused")
             elif command == "RESUME_WORKER":
                 self.log("Received resume command - resuming task acceptance")
                 if self.status == "PAUSED":
-                    self.status = "IDLE"
-                    self.update_status("IDLE")
+                    self.accepting_prefetch = True
+                    self.update_status("BUSY" if self.running_tasks else "IDLE")
 
-    def respond_to_discovery(self):
-        discovery_response = {
-            "command": "WORKER_DISCOVERY_RESPONSE",
-            "agent_id": self.agent_id,
-            "status": self.status,
-            "node_id": self.node_id,
-            "current_task_id": self.current_task_id,
-            "last_heartbeat": self.last_heartbeat,
-            "timestamp": time.time()
-        }
-        self.send_message(TOPIC_AGENT_STATUS_UPDATE, payload=discovery_response)
-        self.log(f"Sent discovery response - Status: {self.status}")
+    def return_buffered_tasks(self, reason):
+        with self.slot_lock:
+            tasks = [task for unit in self.task_buffer for task in unit]
+            self.task_buffer.clear()
+        if tasks:
+            self.return_tasks(tasks, reason)
+
+    def return_tasks(self, tasks, reason):
+        """Hand tasks that will not run here back to the load balancer's backlog."""
+        self.log(f"Returning {len(tasks)} tasks to the load balancer ({reason})")
+        self.send_message(TOPIC_TASK_RETURN, payload={
+            "worker_id": self.agent_id,
+            "tasks": tasks,
+            "reason": reason,
+            **self.capacity_fields()
+        })
+
+    def handle_discovery_request(self, message):
+        self.reply(message, self.get_worker_info())
 
     def graceful_shutdown(self):
-        if self.current_task:
-            self.log(f"Waiting for current task {self.current_task_id} to complete before shutdown")
-        else:
-            self.log("No active task, shutting down immediately")
-        
+        """Stop taking work, return buffered tasks, and stop once the running ones have reported.
+
+        Tasks dispatched to the worker after this point are returned to the
+        load balancer, so every task it was given either completes here or goes
+        back to the backlog.
+        """
+        self.status = "SHUTTING_DOWN"
         final_status = {
             "agent_id": self.agent_id,
             "status": "SHUTTING_DOWN",
@@ -214,22 +563,31 @@ class WorkerAgent(BaseAgent):
             "timestamp": time.time()
         }
         self.send_message(TOPIC_AGENT_STATUS_UPDATE, payload=final_status)
-        self.stop()
+        with self.slot_lock:
+            self.draining = True
+            self.accepting_prefetch = False
+            running = list(self.running_tasks)
+        self.return_buffered_tasks("shutdown")
+        if running:
+            self.log(f"Waiting for running tasks {running} to finish before shutting down")
+        else:
+            self.log("No running tasks, shutting down now")
+            self.stop()
 
     def update_status(self, status, task_id=None):
         self.status = status
         
-        cpu_usage = random.uniform(2, 98)
-        memory_usage = random.uniform(10, 80)
+        cpu_usage, memory_usage = self.resource_usage()
 
         payload = {
             "agent_id": self.agent_id,
             "status": self.status,
             "node_id": self.node_id,
             "timestamp": time.time(),
-            "cpu_usage": round(cpu_usage, 2),
-            "memory_usage": round(memory_usage, 2),
-            "tasks_completed": self.tasks_completed
+            "cpu_usage": cpu_usage,
+            "memory_usage": memory_usage,
+            "tasks_completed": self.tasks_completed,
+            **self.capacity_fields()
         }
         
         if task_id:
@@ -239,24 +597,26 @@ class WorkerAgent(BaseAgent):
         self.send_message(TOPIC_AGENT_STATUS_UPDATE, payload=payload)
         self.log(f"Status updated to {status}" + (f" for task {task_id}" if task_id else ""))
 
-    def report_resources(self, is_busy):
+    def get_resource_payload(self):
+        cpu, mem = self.resource_usage()
+        reading = self.sampler.reading
+        return {
+            "agent_id": self.agent_id,
+            "node_id": self.node_id,
+            "cpu": cpu,
+            "memory": mem,
+            "task_cpu_seconds": round(self.task_cpu_time(), 3),
+            "node_cpu": reading["node_cpu_percent"],
+            "node_memory": reading["node_memory_percent"],
+            "process_rss": reading["process_rss"],
+            "result_cache": self.result_cache.stats(),
+            "status": self.status,
+            "timestamp": time.time()
+        }
+
+    def report_resources(self):
         try:
-            if is_busy:
-                cpu = random.uniform(60, 98)
-                mem = random.uniform(40, 80)
-            else:
-                cpu = random.uniform(2, 15)
-                mem = random.uniform(10, 25)
-                
-            payload = {
-                "agent_id": self.agent_id,
-                "node_id": self.node_id,
-                "cpu": round(cpu, 2),
-                "memory": round(mem, 2),
-                "status": self.status,
-                "timestamp": time.time()
-            }
-            self.send_message(TOPIC_RESOURCE_UPDATE, payload=payload)
+            self.send_message(TOPIC_RESOURCE_UPDATE, payload=self.get_resource_payload())
             
         except Exception as e:
             self.log(f"Error reporting resources: {e}", level='error')
@@ -266,6 +626,14 @@ class WorkerAgent(BaseAgent):
             "agent_id": self.agent_id,
             "node_id": self.node_id,
             "status": self.status,
-            "current_task_id": self.current_task_id,
+            "current_task_ids": list(self.running_tasks),
+            "queued_task_ids": [task["task_id"] for unit in self.task_buffer for task in unit],
+            **self.capacity_fields(),
             "last_heartbeat": self.last_heartbeat
-        }
\ No newline at end of file
+        }
+
+    def stop(self):
+        super().stop()
+        for task_id in list(self.running_tasks):
+            self.cancel_execution(task_id)
+        self.executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -0,0 +1,54 @@
+import logging
+import multiprocessing
+from config import logging_config
+
+def run_worker_process(address, worker_id, node_id, worker_options=None):
+    """Entry point of a worker OS process: one WorkerAgent on a RemoteMessageBus."""
+    from agents.worker_agent import WorkerAgent
+    from communication.transport import RemoteMessageBus
+
+    logging_config.setup_logging()
+    message_bus = RemoteMessageBus(address)
+    worker = WorkerAgent(worker_id, message_bus, node_id, **(worker_options or {}))
+    worker.register_subscriptions()
+    message_bus.start()
+    worker.start()
+    try:
+        worker.join()
+    finally:
+        message_bus.stop()
+    logging.info(f"Worker process for {worker_id} exiting.")
+
+class WorkerProcessHandle:
+    """Stands in for a WorkerAgent in the controller's agent list when the worker runs in its own process.
+
+    The worker itself subscribes and registers through the transport once the
+    process is up, so register_subscriptions() is a no-op here.
+    """
+
+    def __init__(self, agent_id, node_id, address, worker_options=None):
+        self.agent_id = agent_id
+        self.node_id = node_id
+        context = multiprocessing.get_context("spawn")
+        self.process = context.Process(
+            target=run_worker_process,
+            args=(address, agent_id, node_id, worker_options),
+            name=agent_id,
+            daemon=True
+        )
+
+    def register_subscriptions(self):
+        pass
+
+    def start(self):
+        self.process.start()
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def join(self, timeout=None):
+        self.process.join(timeout)
+
+    def is_alive(self):
+        return self.process.is_alive()
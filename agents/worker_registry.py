@@ -0,0 +1,204 @@
+import heapq
+from collections import Counter, defaultdict
+
+DISPATCHABLE_STATUSES = ("IDLE", "BUSY")
+
+class WorkerRegistry:
+    """The load balancer's view of its workers, with indexes kept current on every change.
+
+    Entries are plain dicts (status, node_id, last_seen, slots, capacity,
+    max_batch, reported_free_capacity, cpu_usage, assigned) and are read directly, but
+    every change goes through a method here so the indexes stay in step:
+
+    - `by_status`: worker ids per status, and `paused`
+    - `available`: free capacity of every worker that can take work now, and
+      `available_by_node`
+    - `dispatchable_by_node`: IDLE or BUSY workers per node, free or not
+    - `overcommitted`: workers with more assigned units than slots, i.e.
+      with tasks waiting in their prefetch buffer
+    - `total_capacity` and `total_free`
+    - `seen`: a heap of (last_seen, worker_id); older entries for a worker
+      are skipped when they surface
+    - `generation`: bumped whenever a worker is added or removed
+
+    so a dispatch, a status report or a stale-worker sweep costs time in the
+    workers it touches, not in the size of the registry.
+    """
+
+    def __init__(self):
+        self.workers = {}
+        self.by_status = defaultdict(set)
+        self.paused = set()
+        self.available = {}
+        self.available_by_node = defaultdict(set)
+        self.dispatchable_by_node = defaultdict(set)
+        self.overcommitted = set()
+        self.total_capacity = 0
+        self.total_free = 0
+        self.seen = []
+        self.generation = 0
+
+    def __contains__(self, worker_id):
+        return worker_id in self.workers
+
+    def __len__(self):
+        return len(self.workers)
+
+    def get(self, worker_id):
+        return self.workers.get(worker_id)
+
+    def add(self, worker_id, payload, now):
+        """Register (or re-register) a worker from its registration or discovery payload."""
+        paused = worker_id in self.paused
+        if worker_id in self.workers:
+            self.remove(worker_id)
+        if paused:
+            self.paused.add(worker_id)
+        entry = self.workers[worker_id] = {
+            "status": payload.get("status") or "IDLE",
+            "node_id": payload.get("node_id", "unknown"),
+            "last_seen": now,
+            "assigned": {},
+            "units": Counter(),
+            "capacity": 0,
+            "free": 0
+        }
+        self.by_status[entry["status"]].add(worker_id)
+        if entry["status"] in DISPATCHABLE_STATUSES:
+            self.dispatchable_by_node[entry["node_id"]].add(worker_id)
+        heapq.heappush(self.seen, (now, worker_id))
+        self.generation += 1
+        self.update_capacity(worker_id, payload)
+        return entry
+
+    def remove(self, worker_id):
+        entry = self.workers.pop(worker_id)
+        self.discard_index(self.by_status, entry["status"], worker_id)
+        self.discard_index(self.dispatchable_by_node, entry["node_id"], worker_id)
+        self.discard_index(self.available_by_node, entry["node_id"], worker_id)
+        self.available.pop(worker_id, None)
+        self.paused.discard(worker_id)
+        self.overcommitted.discard(worker_id)
+        self.total_capacity -= entry["capacity"]
+        self.total_free -= entry["free"]
+        self.generation += 1
+        return entry
+
+    @staticmethod
+    def discard_index(index, key, worker_id):
+        members = index.get(key)
+        if members is not None:
+            members.discard(worker_id)
+            if not members:
+                del index[key]
+
+    def set_status(self, worker_id, status):
+        entry = self.workers[worker_id]
+        if status == entry["status"]:
+            return
+        self.discard_index(self.by_status, entry["status"], worker_id)
+        self.discard_index(self.dispatchable_by_node, entry["node_id"], worker_id)
+        entry["status"] = status
+        self.by_status[status].add(worker_id)
+        if status in DISPATCHABLE_STATUSES:
+            self.dispatchable_by_node[entry["node_id"]].add(worker_id)
+        self.refresh(worker_id)
+
+    def touch(self, worker_id, now):
+        self.workers[worker_id]["last_seen"] = now
+        heapq.heappush(self.seen, (now, worker_id))
+        if len(self.seen) > 4 * len(self.workers) + 64:
+            self.seen = [(entry["last_seen"], w_id) for w_id, entry in self.workers.items()]
+            heapq.heapify(self.seen)
+
+    def stale(self, cutoff):
+        """Workers not seen since `cutoff`."""
+        stale = []
+        while self.seen and self.seen[0][0] < cutoff:
+            last_seen, worker_id = heapq.heappop(self.seen)
+            entry = self.workers.get(worker_id)
+            if entry is not None and entry["last_seen"] == last_seen:
+                stale.append(worker_id)
+        return stale
+
+    def pause(self, worker_id):
+        self.paused.add(worker_id)
+        self.refresh(worker_id)
+
+    def resume(self, worker_id):
+        self.paused.discard(worker_id)
+        self.refresh(worker_id)
+
+    def update_capacity(self, worker_id, payload):
+        """Record a worker's reported slots, prefetch depth, free capacity and CPU use.
+
+        Workers without a prefetch buffer (the asyncio ones) only report slots.
+        """
+        entry = self.workers[worker_id]
+        slots = payload.get("slots", entry.get("slots", 1))
+        self.total_capacity -= entry["capacity"]
+        entry["slots"] = slots
+        entry["capacity"] = slots + payload.get("prefetch_depth", 0)
+        self.total_capacity += entry["capacity"]
+        entry["max_batch"] = payload.get("max_batch", entry.get("max_batch", 1))
+        free_slots = payload.get("free_slots", 0 if entry["status"] == "BUSY" else slots)
+        entry["reported_free_capacity"] = payload.get("free_capacity", free_slots)
+        entry["cpu_usage"] = payload.get("cpu_usage", entry.get("cpu_usage", 0.0))
+        self.refresh(worker_id)
+
+    def assign(self, worker_id, task_id, unit_id):
+        """Record a task sent to a worker as part of dispatch unit `unit_id` (a single task or a batch)."""
+        entry = self.workers[worker_id]
+        if task_id in entry["assigned"]:
+            return
+        entry["assigned"][task_id] = unit_id
+        if not entry["units"][unit_id]:
+            # Until the worker reports again, its free capacity is one place less.
+            entry["reported_free_capacity"] -= 1
+        entry["units"][unit_id] += 1
+        self.refresh(worker_id)
+
+    def unassign(self, worker_id, task_id):
+        entry = self.workers.get(worker_id)
+        if entry is None or task_id not in entry["assigned"]:
+            return
+        unit_id = entry["assigned"].pop(task_id)
+        entry["units"][unit_id] -= 1
+        if not entry["units"][unit_id]:
+            del entry["units"][unit_id]
+        self.refresh(worker_id)
+
+    def units(self, worker_id):
+        return len(self.workers[worker_id]["units"])
+
+    def free_capacity(self, worker_id):
+        return self.workers[worker_id]["free"]
+
+    def refresh(self, worker_id):
+        """Recompute one worker's free capacity and its place in the indexes.
+
+        Free capacity counts dispatch units: free slots plus room in the
+        prefetch buffer, a batch taking one place like a single task. The
+        worker's last report can lag behind our own assignments (or behind its
+        completions), so take the more conservative of the two counts.
+        """
+        entry = self.workers.get(worker_id)
+        if entry is None:
+            return
+        units = len(entry["units"])
+        if entry["status"] not in DISPATCHABLE_STATUSES or worker_id in self.paused:
+            free = 0
+        else:
+            free = max(0, min(entry["capacity"] - units, entry["reported_free_capacity"]))
+        self.total_free += free - entry["free"]
+        entry["free"] = free
+        if free:
+            self.available[worker_id] = free
+            self.available_by_node[entry["node_id"]].add(worker_id)
+        elif worker_id in self.available:
+            del self.available[worker_id]
+            self.discard_index(self.available_by_node, entry["node_id"], worker_id)
+        if units > entry.get("slots", 1):
+            self.overcommitted.add(worker_id)
+        else:
+            self.overcommitted.discard(worker_id)
@@ -0,0 +1,85 @@
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import argparse
+import statistics
+import threading
+import time
+
+from communication.message_bus import MessageBus
+from communication.protocol import create_message, TOPIC_TASK_EXECUTE
+
+class CountingSubscriber:
+    def __init__(self, agent_id, expected):
+        self.agent_id = agent_id
+        self.expected = expected
+        self.received = 0
+        self.done = threading.Event()
+
+    def handle(self, message):
+        self.received += 1
+        if self.received >= self.expected:
+            self.done.set()
+
+    def handle_batch(self, messages):
+        self.received += len(messages)
+        if self.received >= self.expected:
+            self.done.set()
+
+def run_case(num_messages, num_workers, batch_publish, batch_delivery, publish_batch_size):
+    bus = MessageBus(lanes={"control": {"priority": 0, "weight": 1, "maxsize": 0, "overflow": "block"}})
+    per_worker = num_messages // num_workers
+    subscribers = [CountingSubscriber(f"worker_{i}", per_worker) for i in range(num_workers)]
+    for subscriber in subscribers:
+        if batch_delivery:
+            bus.subscribe_batch(TOPIC_TASK_EXECUTE, subscriber.handle_batch)
+        else:
+            bus.subscribe(TOPIC_TASK_EXECUTE, subscriber.handle)
+    bus.start()
+
+    messages = [
+        create_message(TOPIC_TASK_EXECUTE, "benchmark", {"task": {"task_id": i}}, f"worker_{i % num_workers}")
+        for i in range(per_worker * num_workers)
+    ]
+
+    start = time.perf_counter()
+    if batch_publish:
+        for offset in range(0, len(messages), publish_batch_size):
+            bus.send_messages(messages[offset:offset + publish_batch_size])
+    else:
+        for message in messages:
+            bus.send_message(message)
+    for subscriber in subscribers:
+        subscriber.done.wait()
+    elapsed = time.perf_counter() - start
+
+    bus.stop()
+    bus.join(2)
+    return len(messages) / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single and batched MessageBus throughput.")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the median is reported")
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--publish-batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    cases = [
+        ("single publish, single delivery", False, False),
+        ("batch publish, single delivery", True, False),
+        ("single publish, batch delivery", False, True),
+        ("batch publish, batch delivery", True, True),
+    ]
+    print(f"{args.messages} messages to {args.workers} subscribers, median of {args.repeat} runs")
+    for name, batch_publish, batch_delivery in cases:
+        rate = statistics.median(
+            run_case(args.messages, args.workers, batch_publish, batch_delivery, args.publish_batch_size)
+            for _ in range(args.repeat)
+        )
+        print(f"{name:<34} {rate:>12,.0f} msg/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import argparse
+import logging
+import threading
+import time
+
+from agents.load_balancer import LoadBalancerAgent
+from agents.worker_agent import WorkerAgent
+from communication.message_bus import MessageBus
+from communication.protocol import create_message, TOPIC_TASK_REQUEST, TOPIC_TASK_COMPLETED
+from config.settings import HEDGE_MIN_SAMPLES
+
+class StragglerWorker(WorkerAgent):
+    """Tasks take `task_time`, except the first run of a "Stall" task anywhere, which takes `stall_time`."""
+
+    stalled = set()
+    stalled_lock = threading.Lock()
+
+    def __init__(self, agent_id, message_bus, node_id, task_time, stall_time):
+        super().__init__(agent_id, message_bus, node_id, workload="sleep", prefetch_depth=0, work_stealing=False)
+        self.task_time = task_time
+        self.stall_time = stall_time
+
+    def processing_time(self, task):
+        if task["data"].startswith("Stall"):
+            with self.stalled_lock:
+                if task["task_id"] not in self.stalled:
+                    self.stalled.add(task["task_id"])
+                    return self.stall_time
+        return self.task_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Completion time of a stalled task with hedging: the hedge copy must win.")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--task-time", type=float, default=0.2)
+    parser.add_argument("--stall-time", type=float, default=20.0)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    bus = MessageBus()
+    workers = [StragglerWorker(f"worker_bench_{i}", bus, f"node-{i}", args.task_time, args.stall_time) for i in range(args.workers)]
+    completions = {}
+    done = threading.Condition()
+    def on_completed(message):
+        payload = message["payload"]
+        if payload.get("status") != "completed":
+            return
+        with done:
+            completions.setdefault(payload["task_id"], (time.perf_counter(), payload["worker_id"], payload.get("cache")))
+            done.notify_all()
+
+    load_balancer = LoadBalancerAgent(bus)
+    bus.subscribe(TOPIC_TASK_COMPLETED, on_completed, agent_id="benchmark")
+    for agent in workers + [load_balancer]:
+        agent.register_subscriptions()
+    bus.start()
+    for agent in workers + [load_balancer]:
+        agent.start()
+    time.sleep(1)
+
+    # Warm up the hedge threshold with ordinary tasks, each with its own data.
+    warmup = HEDGE_MIN_SAMPLES + 5
+    bus.send_messages([
+        create_message(TOPIC_TASK_REQUEST, "benchmark", {"task": {
+            "task_id": f"task_warmup_{i}", "data": f"Generate report: {i}", "priority": 5, "location": "unspecified"
+        }})
+        for i in range(warmup)
+    ])
+    with done:
+        done.wait_for(lambda: len(completions) >= warmup, timeout=60)
+
+    start = time.perf_counter()
+    bus.send_message(create_message(TOPIC_TASK_REQUEST, "benchmark", {"task": {
+        "task_id": "task_stalled", "data": "Stall: report", "priority": 5, "location": "unspecified"
+    }}))
+    with done:
+        finished = done.wait_for(lambda: "task_stalled" in completions, timeout=args.stall_time * 2)
+
+    for agent in workers + [load_balancer]:
+        agent.stop()
+    bus.stop()
+
+    if not finished:
+        print("FAIL: the stalled task never completed")
+        sys.exit(1)
+    completed_at, worker_id, cache = completions["task_stalled"]
+    elapsed = completed_at - start
+    print(f"Stalled task ({args.stall_time:.1f}s on its first worker) completed after {elapsed:.2f}s "
+          f"on {worker_id} (cache: {cache}); hedges launched: {load_balancer.hedges_launched}, won: {load_balancer.hedge_wins}")
+    if load_balancer.hedge_wins < 1 or elapsed >= args.stall_time:
+        print("FAIL: the hedge did not beat the stalled primary")
+        sys.exit(1)
+    print("OK: the hedge won")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import argparse
+import logging
+import time
+
+from agents.base_agent import BaseAgent
+from communication.message_bus import MessageBus
+
+class PollingAgent(BaseAgent):
+    """The previous agent loop: wake every 100 ms and check timers by hand."""
+
+    def run(self):
+        last_heartbeat_time = time.time()
+        while self._is_running:
+            current_time = time.time()
+            if current_time - last_heartbeat_time >= 10:
+                last_heartbeat_time = current_time
+            time.sleep(0.1)
+
+class QuietAgent(BaseAgent):
+    def log(self, message, level=logging.INFO):
+        pass
+
+def run_case(agent_class, num_agents, seconds):
+    bus = MessageBus()
+    agents = [agent_class(f"idle_{i}", bus) for i in range(num_agents)]
+    bus.start()
+    for agent in agents:
+        agent.start()
+    time.sleep(1)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    time.sleep(seconds)
+    cpu_used = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    for agent in agents:
+        agent.stop()
+    for agent in agents:
+        agent.join(2)
+    bus.stop()
+    return cpu_used / wall * 100
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU used by idle agents: 100 ms polling loop vs event-driven loop.")
+    parser.add_argument("--agents", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.agents} idle agents, measured over {args.seconds:.0f}s")
+    for label, agent_class in (("polling", PollingAgent), ("event-driven", QuietAgent)):
+        print(f"{label:<13} {run_case(agent_class, args.agents, args.seconds):6.2f}% of one core")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import argparse
+import time
+import tracemalloc
+
+from communication.protocol import create_message, TOPIC_AGENT_HEARTBEAT, TOPIC_TASK_EXECUTE
+
+def create_dict_message(topic, sender_id, payload=None, recipient_id=None):
+    """The dict-based message create_message used to build."""
+    return {
+        "topic": topic,
+        "sender_id": sender_id,
+        "recipient_id": recipient_id,
+        "payload": payload or {},
+    }
+
+def dict_hop(message):
+    return (message.get("topic"), message.get("recipient_id"), message.get("payload"))
+
+def message_hop(message):
+    return (message.topic, message.recipient_id, message.payload)
+
+def measure_memory(factory, count, with_payload):
+    tracemalloc.start()
+    if with_payload:
+        messages = [factory(TOPIC_TASK_EXECUTE, "load_balancer", {"task": i}, "worker_0") for i in range(count)]
+    else:
+        messages = [factory(TOPIC_AGENT_HEARTBEAT, "worker_0") for _ in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del messages
+    return size / count
+
+def measure_throughput(factory, hop, count, hops):
+    start = time.perf_counter()
+    for i in range(count):
+        message = factory(TOPIC_TASK_EXECUTE, "load_balancer", {"task": i}, "worker_0")
+        for _ in range(hops):
+            hop(message)
+    return count / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dict messages with the slotted Message type.")
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--hops", type=int, default=3, help="field lookups per message, as done by lanes/bus/shard")
+    args = parser.parse_args()
+
+    for with_payload in (False, True):
+        label = "with payload" if with_payload else "without payload"
+        dict_bytes = measure_memory(create_dict_message, args.messages, with_payload)
+        message_bytes = measure_memory(create_message, args.messages, with_payload)
+        print(f"bytes/message {label:<16} dict: {dict_bytes:7.1f}   Message: {message_bytes:7.1f}")
+
+    dict_rate = max(measure_throughput(create_dict_message, dict_hop, args.messages, args.hops) for _ in range(3))
+    message_rate = max(measure_throughput(create_message, message_hop, args.messages, args.hops) for _ in range(3))
+    print(f"create + {args.hops} hops          dict: {dict_rate:>10,.0f}/s   Message: {message_rate:>10,.0f}/s")
+
+if __name__ == "__main__":
+    main()
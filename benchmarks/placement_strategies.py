@@ -0,0 +1,110 @@
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import argparse
+import json
+import logging
+import threading
+import time
+
+from agents.load_balancer import LoadBalancerAgent
+from agents.placement import PLACEMENT_STRATEGIES
+from agents.worker_agent import WorkerAgent
+from communication.message_bus import MessageBus
+from communication.protocol import create_message, TOPIC_TASK_REQUEST, TOPIC_TASK_COMPLETED
+from data.storage import ResultCache
+from tasks.predictor import ProcessingTimePredictor
+
+# Processing time multiplier per node: node-3 is a slow machine.
+NODE_SPEED = {"node-1": 1.0, "node-2": 1.0, "node-3": 2.0}
+
+class BenchmarkWorker(WorkerAgent):
+    """A worker whose tasks take `time_scale` of their simulated time, times its node's factor.
+
+    Each worker keeps its own result cache, as workers in separate processes
+    do. Tasks only sleep, so they all run on threads. Batching is off: a
+    batch pays SETUP_TIME unscaled, which would swamp the scaled task times.
+    """
+
+    def __init__(self, agent_id, message_bus, node_id, time_scale):
+        super().__init__(agent_id, message_bus, node_id, workload="sleep", max_batch=1)
+        self.time_scale = time_scale * NODE_SPEED[node_id]
+        self.result_cache = ResultCache()
+
+    def processing_time(self, task):
+        return super().processing_time(task) * self.time_scale
+
+def load_tasks(path, num_tasks):
+    with open(path) as f:
+        return json.load(f)[:num_tasks]
+
+def run_case(strategy, tasks, workers_per_node, time_scale):
+    bus = MessageBus()
+    workers = [
+        BenchmarkWorker(f"worker_{node_id}_{i}", bus, node_id, time_scale)
+        for node_id in NODE_SPEED
+        for i in range(workers_per_node)
+    ]
+
+    submitted = {}
+    latencies = {}
+    cache_hits = []
+    all_done = threading.Event()
+    def on_completed(message):
+        payload = message["payload"]
+        if payload.get("status") != "completed" or payload["task_id"] in latencies:
+            return
+        latencies[payload["task_id"]] = time.perf_counter() - submitted[payload["task_id"]]
+        if payload.get("cache") in ("hit", "coalesced"):
+            cache_hits.append(payload["task_id"])
+        if len(latencies) >= len(tasks):
+            all_done.set()
+
+    load_balancer = LoadBalancerAgent(bus, placement=strategy, predictor=ProcessingTimePredictor())
+    bus.subscribe(TOPIC_TASK_COMPLETED, on_completed, agent_id="benchmark")
+    for agent in workers + [load_balancer]:
+        agent.register_subscriptions()
+    bus.start()
+    for agent in workers + [load_balancer]:
+        agent.start()
+    time.sleep(1)
+
+    start = time.perf_counter()
+    submitted.update(dict.fromkeys((task["task_id"] for task in tasks), start))
+    bus.send_messages([create_message(TOPIC_TASK_REQUEST, "benchmark", {"task": dict(task)}) for task in tasks])
+    all_done.wait()
+    makespan = time.perf_counter() - start
+
+    for agent in workers + [load_balancer]:
+        agent.stop()
+    bus.stop()
+    ordered = sorted(latencies.values())
+    return {
+        "makespan": makespan,
+        "mean": sum(ordered) / len(ordered),
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "cache_hits": len(cache_hits)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Makespan and completion latency per load balancer placement strategy.")
+    parser.add_argument("--tasks", type=int, default=300)
+    parser.add_argument("--workers-per-node", type=int, default=2)
+    parser.add_argument("--time-scale", type=float, default=0.05, help="fraction of the simulated processing time to sleep")
+    parser.add_argument("--strategies", nargs="+", default=list(PLACEMENT_STRATEGIES), choices=list(PLACEMENT_STRATEGIES))
+    parser.add_argument("--workload-file", default=os.path.join(project_root, "data", "tasks.json"))
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    tasks = load_tasks(args.workload_file, args.tasks)
+    print(f"{len(tasks)} tasks from {args.workload_file} on {args.workers_per_node * len(NODE_SPEED)} workers "
+          f"(node speed factors {NODE_SPEED}, time scale {args.time_scale})")
+    print(f"{'strategy':<16} {'makespan':>9} {'mean':>8} {'p99':>8} {'cache hits':>11}")
+    for strategy in args.strategies:
+        stats = run_case(strategy, tasks, args.workers_per_node, args.time_scale)
+        print(f"{strategy:<16} {stats['makespan']:8.2f}s {stats['mean']:7.2f}s {stats['p99']:7.2f}s {stats['cache_hits']:>11}")
+
+if __name__ == "__main__":
+    main()
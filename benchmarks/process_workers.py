@@ -0,0 +1,77 @@
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import argparse
+import threading
+import time
+
+from agents.load_balancer import LoadBalancerAgent
+from agents.worker_agent import WorkerAgent
+from agents.worker_process import WorkerProcessHandle
+from communication.message_bus import MessageBus
+from communication.protocol import create_message, TOPIC_TASK_REQUEST, TOPIC_TASK_COMPLETED
+from communication.transport import TransportServer
+
+def run_case(runtime, num_workers, num_tasks):
+    bus = MessageBus()
+    server = None
+    if runtime == "processes":
+        server = TransportServer(bus)
+        workers = [
+            WorkerProcessHandle(f"worker_bench_{i}", "node-1", server.address, {"workload": "cpu"})
+            for i in range(num_workers)
+        ]
+    else:
+        workers = [WorkerAgent(f"worker_bench_{i}", bus, "node-1", workload="cpu") for i in range(num_workers)]
+
+    completed = []
+    all_done = threading.Event()
+    def on_completed(message):
+        completed.append(message["payload"]["task_id"])
+        if len(completed) >= num_tasks:
+            all_done.set()
+
+    load_balancer = LoadBalancerAgent(bus)
+    bus.subscribe(TOPIC_TASK_COMPLETED, on_completed, agent_id="benchmark")
+    for agent in workers + [load_balancer]:
+        agent.register_subscriptions()
+    bus.start()
+    if server:
+        server.start()
+    for agent in workers + [load_balancer]:
+        agent.start()
+    time.sleep(3 if server else 0.5)
+
+    # Unique data per task, so the result cache cannot serve or coalesce any of them.
+    start = time.perf_counter()
+    bus.send_messages([
+        create_message(TOPIC_TASK_REQUEST, "benchmark", {"task": {
+            "task_id": f"task_bench_{i}", "data": f"Calculate financial risk model: {i}", "priority": 5, "location": "node-1"
+        }})
+        for i in range(num_tasks)
+    ])
+    all_done.wait()
+    elapsed = time.perf_counter() - start
+
+    for agent in workers + [load_balancer]:
+        agent.stop()
+    if server:
+        server.stop()
+    bus.stop()
+    return num_tasks / elapsed, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU-bound task throughput: thread workers vs process workers.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tasks", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{args.tasks} CPU-bound tasks on {args.workers} workers ({os.cpu_count()} cores)")
+    for runtime in ("threads", "processes"):
+        rate, elapsed = run_case(runtime, args.workers, args.tasks)
+        print(f"{runtime:<10} {rate:6.2f} tasks/s   ({elapsed:.1f}s)")
+
+if __name__ == "__main__":
+    main()
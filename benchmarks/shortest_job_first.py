@@ -0,0 +1,88 @@
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import argparse
+import logging
+import threading
+import time
+
+from agents.load_balancer import LoadBalancerAgent
+from communication.message_bus import MessageBus
+from communication.protocol import create_message, TOPIC_TASK_REQUEST, TOPIC_TASK_COMPLETED
+from placement_strategies import NODE_SPEED, BenchmarkWorker, load_tasks
+from tasks.predictor import ProcessingTimePredictor
+
+def run_case(shortest_job_first, tasks, workers_per_node, time_scale):
+    bus = MessageBus()
+    workers = [
+        BenchmarkWorker(f"worker_{node_id}_{i}", bus, node_id, time_scale)
+        for node_id in NODE_SPEED
+        for i in range(workers_per_node)
+    ]
+
+    latencies = {}
+    all_done = threading.Event()
+    def on_completed(message):
+        payload = message["payload"]
+        if payload.get("status") != "completed" or payload["task_id"] in latencies:
+            return
+        latencies[payload["task_id"]] = time.perf_counter() - start
+        if len(latencies) >= len(tasks):
+            all_done.set()
+
+    predictor = ProcessingTimePredictor()
+    load_balancer = LoadBalancerAgent(bus, shortest_job_first=shortest_job_first, predictor=predictor)
+    bus.subscribe(TOPIC_TASK_COMPLETED, on_completed, agent_id="benchmark")
+    for agent in workers + [load_balancer]:
+        agent.register_subscriptions()
+    bus.start()
+    for agent in workers + [load_balancer]:
+        agent.start()
+    time.sleep(1)
+
+    start = time.perf_counter()
+    bus.send_messages([create_message(TOPIC_TASK_REQUEST, "benchmark", {"task": dict(task)}) for task in tasks])
+    all_done.wait()
+    makespan = time.perf_counter() - start
+
+    for agent in workers + [load_balancer]:
+        agent.stop()
+    bus.stop()
+    ordered = sorted(latencies.values())
+    by_priority = {}
+    for task in tasks:
+        by_priority.setdefault(task["priority"], []).append(latencies[task["task_id"]])
+    return {
+        "makespan": makespan,
+        "mean": sum(ordered) / len(ordered),
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "by_priority": {priority: sum(times) / len(times) for priority, times in sorted(by_priority.items())},
+        "predictor": predictor.summary()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Mean completion time with and without shortest-job-first ordering of the backlog.")
+    parser.add_argument("--tasks", type=int, default=300)
+    parser.add_argument("--workers-per-node", type=int, default=2)
+    parser.add_argument("--time-scale", type=float, default=0.05, help="fraction of the simulated processing time to sleep")
+    parser.add_argument("--workload-file", default=os.path.join(project_root, "data", "tasks.json"))
+    parser.add_argument("--show-estimates", action="store_true", help="print what the predictor learned per template")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    tasks = load_tasks(args.workload_file, args.tasks)
+    print(f"{len(tasks)} tasks from {args.workload_file} on {args.workers_per_node * len(NODE_SPEED)} workers "
+          f"(node speed factors {NODE_SPEED}, time scale {args.time_scale}), all submitted at once")
+    print(f"{'order':<22} {'makespan':>9} {'mean':>8} {'p99':>8}   mean by priority")
+    for label, shortest_job_first in (("priority, arrival", False), ("priority, shortest", True)):
+        stats = run_case(shortest_job_first, tasks, args.workers_per_node, args.time_scale)
+        by_priority = ", ".join(f"{priority}: {mean:.2f}s" for priority, mean in stats["by_priority"].items())
+        print(f"{label:<22} {stats['makespan']:8.2f}s {stats['mean']:7.2f}s {stats['p99']:7.2f}s   {by_priority}")
+        if args.show_estimates:
+            for template, summary in sorted(stats["predictor"].items()):
+                print(f"    {template:<48} {summary['count']:>4} tasks, EWMA {summary['ewma']:.3f}s, p95 {summary['p95']:.3f}s")
+
+if __name__ == "__main__":
+    main()
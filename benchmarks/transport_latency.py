@@ -0,0 +1,119 @@
+import sys
+import os
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import argparse
+import multiprocessing
+import socket
+import statistics
+import threading
+import time
+
+from communication.message_bus import MessageBus
+from communication.protocol import create_message
+from communication.transport import TransportServer, RemoteMessageBus
+
+PING = "bench_ping"
+PONG = "bench_pong"
+FLOOD = "bench_flood"
+FLOOD_DONE = "bench_flood_done"
+
+def run_broker(port, coalesce_delay, ready):
+    sys.path.insert(0, project_root)
+    bus = MessageBus()
+    server = TransportServer(bus, ("127.0.0.1", port), coalesce_delay)
+    bus.start()
+    server.start()
+    ready.set()
+    threading.Event().wait()
+
+def run_sink(port, coalesce_delay, pool_size, ready):
+    """Echoes pings back to their sender and counts flood messages."""
+    sys.path.insert(0, project_root)
+    bus = RemoteMessageBus(("127.0.0.1", port), pool_size, coalesce_delay)
+    counted = [0]
+
+    def on_ping(message):
+        bus.send_message(create_message(PONG, "sink", message["payload"], recipient_id=message["sender_id"]))
+
+    def on_flood(message):
+        counted[0] += 1
+        if counted[0] == message["payload"]["total"]:
+            counted[0] = 0
+            bus.send_message(create_message(FLOOD_DONE, "sink", {}, recipient_id=message["sender_id"]))
+
+    bus.subscribe(PING, on_ping, agent_id="sink")
+    bus.subscribe(FLOOD, on_flood, agent_id="sink")
+    time.sleep(0.5)
+    ready.set()
+    threading.Event().wait()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def run_case(coalesce_delay, pool_size, pings, flood):
+    context = multiprocessing.get_context("spawn")
+    port = free_port()
+    broker_ready, sink_ready = context.Event(), context.Event()
+    processes = [context.Process(target=run_broker, args=(port, coalesce_delay, broker_ready), daemon=True)]
+    processes[0].start()
+    broker_ready.wait(10)
+    processes.append(context.Process(target=run_sink, args=(port, coalesce_delay, pool_size, sink_ready), daemon=True))
+    processes[1].start()
+    sink_ready.wait(10)
+
+    bus = RemoteMessageBus(("127.0.0.1", port), pool_size, coalesce_delay)
+    pong = threading.Event()
+    flood_done = threading.Event()
+    bus.subscribe(PONG, lambda message: pong.set(), agent_id="producer")
+    bus.subscribe(FLOOD_DONE, lambda message: flood_done.set(), agent_id="producer")
+    time.sleep(0.2)
+
+    # Round trip: producer -> broker -> sink -> broker -> producer, one at a time.
+    rtts = []
+    for i in range(pings):
+        pong.clear()
+        start = time.perf_counter()
+        bus.send_message(create_message(PING, "producer", {"seq": i}, recipient_id="sink"))
+        pong.wait(5)
+        rtts.append(time.perf_counter() - start)
+
+    # Pipelined one-way throughput, timed until the sink confirms the last message.
+    start = time.perf_counter()
+    for i in range(flood):
+        bus.send_message(create_message(FLOOD, "producer", {"seq": i, "total": flood}, recipient_id="sink"))
+    flood_done.wait(60)
+    elapsed = time.perf_counter() - start
+
+    writes = sum(stats["writes"] for stats in bus.get_lane_stats().values())
+    frames = sum(stats["frames"] for stats in bus.get_lane_stats().values())
+    bus.stop()
+    for process in reversed(processes):
+        process.terminate()
+        process.join()
+    rtts.sort()
+    return {
+        "p50_ms": statistics.median(rtts) * 1000,
+        "p99_ms": rtts[min(len(rtts) - 1, int(len(rtts) * 0.99))] * 1000,
+        "msgs_per_sec": flood / elapsed,
+        "frames_per_write": frames / max(1, writes),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Broker round-trip latency and pipelined throughput over localhost TCP.")
+    parser.add_argument("--pings", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"broker + sink + producer processes, {args.pings} pings, {args.messages} pipelined messages")
+    for label, delay in (("flush when idle", 0.0), ("delay 0.5ms", 0.0005)):
+        result = run_case(delay, args.pool_size, args.pings, args.messages)
+        print(f"{label:<16} rtt p50 {result['p50_ms']:6.3f} ms   p99 {result['p99_ms']:6.3f} ms   "
+              f"{result['msgs_per_sec']:10,.0f} msg/s   {result['frames_per_write']:5.1f} frames/write")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import sys
+import os
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+import argparse
+import logging
+import signal
+import threading
+
+from config import settings, logging_config
+from communication.message_bus import MessageBus
+from communication.transport import TransportServer
+
+def main():
+    """Standalone message broker: a MessageBus that agents on any node reach over TCP."""
+    parser = argparse.ArgumentParser(description="Run the message bus as a standalone TCP broker.")
+    parser.add_argument("--host", default=settings.BROKER_HOST)
+    parser.add_argument("--port", type=int, default=settings.BROKER_PORT)
+    args = parser.parse_args()
+
+    logging_config.setup_logging()
+    message_bus = MessageBus()
+    server = TransportServer(message_bus, (args.host, args.port))
+    message_bus.start()
+    server.start()
+    logging.info(f"Broker ready on {args.host}:{args.port}")
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    try:
+        while not stopped.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    server.stop()
+    message_bus.stop()
+    message_bus.join(2)
+    logging.info("Broker has been shut down.")
+
+if __name__ == "__main__":
+    main()
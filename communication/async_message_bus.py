@@ -0,0 +1,149 @@
+import asyncio
+import inspect
+import logging
+import threading
+from communication.protocol import TOPIC_REPLY, BROADCAST
+from communication.request_reply import RequestTracker, new_reply_address
+from communication.routing import SubscriptionTable, owner_agent_id
+from config.settings import REQUEST_TIMEOUT
+
+class AsyncMessageBus:
+    """A message bus that delivers to coroutine subscribers on one asyncio event loop.
+
+    Each subscriber (keyed like MessageBus shards, by owning agent) gets its own
+    mailbox and consumer task, so messages to one agent stay ordered while agents
+    run concurrently as coroutines. send_message is safe to call from any thread.
+    """
+
+    def __init__(self, loop=None):
+        self.loop = loop or asyncio.new_event_loop()
+        self.subscriptions = SubscriptionTable()
+        self.mailboxes = {}
+        self.consumers = {}
+        self._thread = None
+        self.requests = RequestTracker(new_reply_address("async-bus"))
+        self.subscriptions.add(TOPIC_REPLY, self.requests.resolve, self.requests.reply_address)
+
+    def subscribe(self, topic, callback, agent_id=None):
+        agent_id = self.subscriptions.add(topic, callback, agent_id)
+        logging.info(f"New async subscription to topic '{topic}'" + (f" for agent '{agent_id}'" if agent_id else ""))
+
+    def send_message(self, message):
+        if self._in_loop():
+            self._dispatch(message)
+        else:
+            self.loop.call_soon_threadsafe(self._dispatch, message)
+        return True
+
+    def send_messages(self, messages):
+        messages = list(messages)
+        if self._in_loop():
+            for message in messages:
+                self._dispatch(message)
+        else:
+            self.loop.call_soon_threadsafe(self._dispatch_many, messages)
+        return [True] * len(messages)
+
+    def request(self, topic, payload=None, timeout=REQUEST_TIMEOUT, recipient_id=None, sender_id=None):
+        """Send a request; the returned future resolves with the reply payload or raises TimeoutError."""
+        message, future = self.requests.open(topic, sender_id, payload, recipient_id, timeout)
+        self.send_message(message)
+        return future
+
+    def scatter_gather(self, topic, payload=None, timeout=REQUEST_TIMEOUT, recipient_id=BROADCAST,
+                       sender_id=None, expected_replies=None):
+        """Send a request to many responders; the future resolves with every reply payload received by the deadline."""
+        message, future = self.requests.open(topic, sender_id, payload, recipient_id, timeout, True, expected_replies)
+        self.send_message(message)
+        return future
+
+    def _in_loop(self):
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _dispatch_many(self, messages):
+        for message in messages:
+            self._dispatch(message)
+
+    def _dispatch(self, message):
+        for shard_key, callback in self.subscriptions.lookup(message.topic, message.recipient_id):
+            mailbox = self.mailboxes.get(shard_key)
+            if mailbox is None:
+                mailbox = self.mailboxes[shard_key] = asyncio.Queue()
+                self.consumers[shard_key] = self.loop.create_task(self._consume(shard_key, mailbox))
+            mailbox.put_nowait((callback, message))
+
+    async def _consume(self, shard_key, mailbox):
+        while True:
+            callback, message = await mailbox.get()
+            try:
+                result = callback(message)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logging.error(f"Error processing message in callback for topic {message.topic}: {e}")
+
+    def get_shard_depths(self):
+        return {str(shard_key): mailbox.qsize() for shard_key, mailbox in list(self.mailboxes.items())}
+
+    def get_lane_stats(self):
+        return {}
+
+    def start(self):
+        """Run the event loop on a background thread, mirroring MessageBus.start()."""
+        self._thread = threading.Thread(target=self.loop.run_forever, name="AsyncMessageBus", daemon=True)
+        self._thread.start()
+        logging.info("Async Message Bus is running.")
+
+    def stop(self):
+        def shutdown():
+            for consumer in self.consumers.values():
+                consumer.cancel()
+            # Give the cancelled consumers one loop iteration to unwind before stopping.
+            self.loop.call_soon(self.loop.stop)
+        self.loop.call_soon_threadsafe(shutdown)
+
+    def join(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+        logging.info("Async Message Bus is shutting down.")
+
+class SyncBusAdapter:
+    """Lets thread-based agents (BaseAgent subclasses, the dashboard) use an AsyncMessageBus.
+
+    Their callbacks are blocking, so each delivery runs in the loop's default
+    executor; the per-agent consumer awaits it, which keeps per-agent ordering.
+    """
+
+    def __init__(self, async_bus):
+        self.async_bus = async_bus
+
+    def subscribe(self, topic, callback, agent_id=None):
+        async def run_in_executor(message):
+            await self.async_bus.loop.run_in_executor(None, callback, message)
+        self.async_bus.subscribe(topic, run_in_executor, agent_id if agent_id is not None else owner_agent_id(callback))
+
+    def subscribe_batch(self, topic, callback, agent_id=None):
+        if agent_id is None:
+            agent_id = owner_agent_id(callback)
+        self.subscribe(topic, lambda message: callback([message]), agent_id)
+
+    def send_message(self, message):
+        return self.async_bus.send_message(message)
+
+    def send_messages(self, messages):
+        return self.async_bus.send_messages(messages)
+
+    def request(self, *args, **kwargs):
+        return self.async_bus.request(*args, **kwargs)
+
+    def scatter_gather(self, *args, **kwargs):
+        return self.async_bus.scatter_gather(*args, **kwargs)
+
+    def get_shard_depths(self):
+        return self.async_bus.get_shard_depths()
+
+    def get_lane_stats(self):
+        return self.async_bus.get_lane_stats()
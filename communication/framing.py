@@ -0,0 +1,196 @@
+import struct
+import sys
+import threading
+from communication.protocol import (
+    Message, TOPIC_TASK_REQUEST, TOPIC_TASK_EXECUTE, TOPIC_TASK_COMPLETED, TOPIC_AGENT_REGISTER,
+    TOPIC_AGENT_HEARTBEAT, TOPIC_AGENT_STATUS_UPDATE, TOPIC_SYSTEM_LOG, TOPIC_RESOURCE_UPDATE,
+    TOPIC_SYSTEM_COMMAND, TOPIC_REPLY, TOPIC_WORKER_DISCOVERY, TOPIC_CLUSTER_QUERY, TOPIC_TASK_RETURN,
+    TOPIC_STEAL_CANDIDATES, TOPIC_TASK_STEAL, TOPIC_TASK_STOLEN
+)
+
+# Wire format: every frame is a 4-byte big-endian length, a 1-byte frame type and
+# a body. Values inside a body are tagged (1 byte) and length-prefixed, which keeps
+# frames compact without pickling arbitrary objects across processes.
+
+FRAME_MESSAGE = 1
+FRAME_SUBSCRIBE = 2
+FRAME_DELIVER = 3
+
+FRAME_HEADER = struct.Struct("!IB")
+_U8 = struct.Struct("!B")
+_U32 = struct.Struct("!I")
+_I64 = struct.Struct("!q")
+_F64 = struct.Struct("!d")
+
+# Well-known topics travel as a single byte; code 0 means the topic string follows.
+TOPIC_CODES = {
+    topic: code for code, topic in enumerate((
+        TOPIC_TASK_REQUEST, TOPIC_TASK_EXECUTE, TOPIC_TASK_COMPLETED, TOPIC_AGENT_REGISTER,
+        TOPIC_AGENT_HEARTBEAT, TOPIC_AGENT_STATUS_UPDATE, TOPIC_SYSTEM_LOG, TOPIC_RESOURCE_UPDATE,
+        TOPIC_SYSTEM_COMMAND, TOPIC_REPLY, TOPIC_WORKER_DISCOVERY, TOPIC_CLUSTER_QUERY,
+        TOPIC_TASK_RETURN, TOPIC_STEAL_CANDIDATES, TOPIC_TASK_STEAL, TOPIC_TASK_STOLEN,
+    ), start=1)
+}
+CODE_TOPICS = {code: topic for topic, code in TOPIC_CODES.items()}
+
+class FramingError(Exception):
+    pass
+
+def encode_value(value, out):
+    if value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif isinstance(value, int):
+        if -(1 << 63) <= value < (1 << 63):
+            out += b"i"
+            out += _I64.pack(value)
+        else:
+            encoded = str(value).encode()
+            out += b"I"
+            out += _U32.pack(len(encoded))
+            out += encoded
+    elif isinstance(value, float):
+        out += b"f"
+        out += _F64.pack(value)
+    elif isinstance(value, str):
+        encoded = value.encode("utf-8")
+        out += b"s"
+        out += _U32.pack(len(encoded))
+        out += encoded
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        out += b"y"
+        out += _U32.pack(len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out += b"l"
+        out += _U32.pack(len(value))
+        for item in value:
+            encode_value(item, out)
+    elif isinstance(value, dict):
+        out += b"m"
+        out += _U32.pack(len(value))
+        for key, item in value.items():
+            encode_value(key, out)
+            encode_value(item, out)
+    else:
+        raise FramingError(f"Cannot encode value of type {type(value).__name__}")
+
+def decode_value(buffer, offset):
+    tag = buffer[offset]
+    offset += 1
+    if tag == 0x4E:  # N
+        return None, offset
+    if tag == 0x54:  # T
+        return True, offset
+    if tag == 0x46:  # F
+        return False, offset
+    if tag == 0x69:  # i
+        return _I64.unpack_from(buffer, offset)[0], offset + 8
+    if tag == 0x66:  # f
+        return _F64.unpack_from(buffer, offset)[0], offset + 8
+    if tag in (0x73, 0x79, 0x49):  # s, y, I
+        length = _U32.unpack_from(buffer, offset)[0]
+        offset += 4
+        raw = bytes(buffer[offset:offset + length])
+        offset += length
+        if tag == 0x73:
+            return raw.decode("utf-8"), offset
+        if tag == 0x79:
+            return raw, offset
+        return int(raw), offset
+    if tag == 0x6C:  # l
+        count = _U32.unpack_from(buffer, offset)[0]
+        offset += 4
+        items = []
+        for _ in range(count):
+            item, offset = decode_value(buffer, offset)
+            items.append(item)
+        return items, offset
+    if tag == 0x6D:  # m
+        count = _U32.unpack_from(buffer, offset)[0]
+        offset += 4
+        mapping = {}
+        for _ in range(count):
+            key, offset = decode_value(buffer, offset)
+            mapping[key], offset = decode_value(buffer, offset)
+        return mapping, offset
+    raise FramingError(f"Unknown value tag {tag!r}")
+
+def encode_message(message, out=None):
+    out = bytearray() if out is None else out
+    code = TOPIC_CODES.get(message.topic, 0)
+    out += _U8.pack(code)
+    if code == 0:
+        encode_value(message.topic, out)
+    encode_value(message.sender_id, out)
+    encode_value(message.recipient_id, out)
+    encode_value(message.payload, out)
+    return out
+
+def decode_message(buffer, offset=0):
+    code = buffer[offset]
+    offset += 1
+    if code:
+        topic = CODE_TOPICS[code]
+    else:
+        topic, offset = decode_value(buffer, offset)
+        topic = sys.intern(topic)
+    sender_id, offset = decode_value(buffer, offset)
+    recipient_id, offset = decode_value(buffer, offset)
+    payload, offset = decode_value(buffer, offset)
+    return Message(topic, sender_id, payload, recipient_id), offset
+
+def frame(frame_type, body):
+    return FRAME_HEADER.pack(len(body) + 1, frame_type) + bytes(body)
+
+def message_frame(message):
+    return frame(FRAME_MESSAGE, encode_message(message))
+
+def deliver_frame(target_agent_id, message):
+    body = bytearray()
+    encode_value(target_agent_id, body)
+    return frame(FRAME_DELIVER, encode_message(message, body))
+
+def subscribe_frame(topic, agent_id):
+    body = bytearray()
+    encode_value(topic, body)
+    encode_value(agent_id, body)
+    return frame(FRAME_SUBSCRIBE, body)
+
+class FramedSocket:
+    """Length-prefixed frame I/O over a connected stream socket."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.send_lock = threading.Lock()
+
+    def send_bytes(self, data):
+        with self.send_lock:
+            self.sock.sendall(data)
+
+    def send_frames(self, frames):
+        self.send_bytes(b"".join(frames))
+
+    def recv_exactly(self, size):
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = self.sock.recv_into(view[received:], size - received)
+            if count == 0:
+                raise ConnectionError("Connection closed by peer")
+            received += count
+        return buffer
+
+    def recv_frame(self):
+        length, frame_type = FRAME_HEADER.unpack(self.recv_exactly(FRAME_HEADER.size))
+        return frame_type, self.recv_exactly(length - 1)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
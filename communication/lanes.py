@@ -0,0 +1,232 @@
+import queue
+import threading
+import time
+from collections import deque
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+
+SCHEDULING_STRICT = "strict"
+SCHEDULING_WEIGHTED = "weighted"
+
+class LaneFullError(queue.Full):
+    """Raised when a blocking lane stays full for longer than the send timeout.
+
+    From put_many(), `results` holds the flags of the messages handled before
+    the one that timed out; that message and every later one were not queued.
+    """
+
+    def __init__(self, lane_name, results=None):
+        super().__init__(f"Message bus lane '{lane_name}' is full")
+        self.lane_name = lane_name
+        self.results = results
+
+class ConflationSlot:
+    """Queue entry for a last-value message; newer messages overwrite it in place."""
+    __slots__ = ("key", "message")
+
+    def __init__(self, key, message):
+        self.key = key
+        self.message = message
+
+def conflation_key(message):
+    """Key identifying the state a message describes, or None if it must not be conflated."""
+    if message.recipient_id:
+        return None
+    payload = message.payload or {}
+    if "command" in payload:
+        return None
+    return (message.topic, payload.get("agent_id") or message.sender_id)
+
+class Lane:
+    def __init__(self, name, priority=0, weight=1, maxsize=0, overflow=OVERFLOW_BLOCK):
+        if overflow not in (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST):
+            raise ValueError(f"Unknown overflow policy '{overflow}' for lane '{name}'")
+        self.name = name
+        self.priority = priority
+        self.weight = weight
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.items = deque()
+        self.conflation_slots = {}
+        self.current_weight = 0
+        self.enqueued_count = 0
+        self.dropped_count = 0
+        self.conflated_count = 0
+        self.not_full = None
+
+    def is_full(self):
+        return self.maxsize > 0 and len(self.items) >= self.maxsize
+
+    def stats(self):
+        return {
+            "depth": len(self.items),
+            "maxsize": self.maxsize,
+            "overflow": self.overflow,
+            "enqueued": self.enqueued_count,
+            "dropped": self.dropped_count,
+            "conflated": self.conflated_count,
+        }
+
+    def popleft(self):
+        entry = self.items.popleft()
+        if isinstance(entry, ConflationSlot):
+            if self.conflation_slots.get(entry.key) is entry:
+                del self.conflation_slots[entry.key]
+            return entry.message
+        return entry
+
+class PriorityLanes:
+    """A queue.Queue-like container that serves several bounded lanes by priority.
+
+    With strict scheduling the lowest-priority-number lane with pending items is
+    always served first. With weighted scheduling, lanes are served by smooth
+    weighted round-robin so low-priority lanes still make progress under load.
+
+    Messages on conflated topics replace any still-queued message describing the
+    same (topic, agent) state instead of queueing behind it.
+    """
+
+    def __init__(self, lane_configs, topic_lanes, default_lane, scheduling=SCHEDULING_WEIGHTED,
+                 conflated_topics=frozenset()):
+        if scheduling not in (SCHEDULING_STRICT, SCHEDULING_WEIGHTED):
+            raise ValueError(f"Unknown lane scheduling '{scheduling}'")
+        self.mutex = threading.Lock()
+        self.not_empty = threading.Condition(self.mutex)
+        self.lanes = {}
+        for name, config in lane_configs.items():
+            lane = Lane(name, **config)
+            lane.not_full = threading.Condition(self.mutex)
+            self.lanes[name] = lane
+        if default_lane not in self.lanes:
+            raise ValueError(f"Default lane '{default_lane}' is not configured")
+        self.ordered_lanes = sorted(self.lanes.values(), key=lambda lane: lane.priority)
+        self.topic_lanes = topic_lanes
+        self.default_lane = default_lane
+        self.scheduling = scheduling
+        self.conflated_topics = conflated_topics
+        self.pending = 0
+
+    def lane_for(self, topic):
+        return self.lanes.get(self.topic_lanes.get(topic, self.default_lane)) or self.lanes[self.default_lane]
+
+    def put(self, message, block=True, timeout=None):
+        """Enqueue a message. Returns False when the lane dropped it, raises LaneFullError on timeout."""
+        with self.mutex:
+            return self._put_locked(message, block, timeout)
+
+    def put_many(self, messages, block=True, timeout=None):
+        """Enqueue messages in order under one lock acquisition; returns a flag per message.
+
+        If a lane times out part way, the LaneFullError carries the flags of the
+        messages already handled, so the caller knows exactly which were queued.
+        """
+        results = []
+        with self.mutex:
+            for message in messages:
+                try:
+                    results.append(self._put_locked(message, block, timeout))
+                except LaneFullError as e:
+                    e.results = results
+                    raise
+        return results
+
+    def _put_locked(self, message, block, timeout):
+        topic = message.topic
+        lane = self.lane_for(topic)
+        key = conflation_key(message) if topic in self.conflated_topics else None
+        if key is not None and self._conflate(lane, key, message):
+            return True
+        if lane.is_full():
+            if lane.overflow == OVERFLOW_DROP_NEWEST:
+                lane.dropped_count += 1
+                return False
+            if lane.overflow == OVERFLOW_DROP_OLDEST:
+                lane.popleft()
+                lane.dropped_count += 1
+                self.pending -= 1
+            else:
+                self._wait_not_full(lane, block, timeout)
+                if key is not None and self._conflate(lane, key, message):
+                    return True
+        if key is not None:
+            entry = lane.conflation_slots[key] = ConflationSlot(key, message)
+        else:
+            entry = message
+        lane.items.append(entry)
+        lane.enqueued_count += 1
+        self.pending += 1
+        self.not_empty.notify()
+        return True
+
+    def _conflate(self, lane, key, message):
+        slot = lane.conflation_slots.get(key)
+        if slot is None:
+            return False
+        slot.message = message
+        lane.conflated_count += 1
+        return True
+
+    def _wait_not_full(self, lane, block, timeout):
+        if not block:
+            raise LaneFullError(lane.name)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while lane.is_full():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise LaneFullError(lane.name)
+            lane.not_full.wait(remaining)
+
+    def get(self, block=True, timeout=None):
+        return self.get_many(1, block, timeout)[0]
+
+    def get_many(self, max_items, block=True, timeout=None):
+        """Wait for at least one message, then drain up to max_items in lane order."""
+        with self.mutex:
+            if not block:
+                if not self.pending:
+                    raise queue.Empty
+            elif timeout is None:
+                while not self.pending:
+                    self.not_empty.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while not self.pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self.not_empty.wait(remaining)
+            messages = []
+            while self.pending and len(messages) < max_items:
+                lane = self._select_lane()
+                messages.append(lane.popleft())
+                self.pending -= 1
+                lane.not_full.notify()
+            return messages
+
+    def _select_lane(self):
+        if self.scheduling == SCHEDULING_STRICT:
+            return next(lane for lane in self.ordered_lanes if lane.items)
+
+        ready = [lane for lane in self.ordered_lanes if lane.items]
+        total_weight = 0
+        selected = None
+        for lane in ready:
+            lane.current_weight += lane.weight
+            total_weight += lane.weight
+            if selected is None or lane.current_weight > selected.current_weight:
+                selected = lane
+        selected.current_weight -= total_weight
+        return selected
+
+    def qsize(self):
+        with self.mutex:
+            return self.pending
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def stats(self):
+        with self.mutex:
+            return {name: lane.stats() for name, lane in self.lanes.items()}
@@ -2,48 +2,180 @@ import queue
 import threading
 import logging
 from collections import defaultdict
-from config.settings import MESSAGE_BUS_PULL_TIMEOUT
+from communication.lanes import PriorityLanes
+from communication.protocol import TOPIC_LANES, DEFAULT_LANE, CONFLATED_TOPICS, TOPIC_REPLY, BROADCAST
+from communication.request_reply import RequestTracker, new_reply_address
+from communication.routing import SubscriptionTable
+from config.settings import (
+    MESSAGE_BUS_PULL_TIMEOUT, MESSAGE_BUS_DISPATCH_THREADS, MESSAGE_BUS_SEND_TIMEOUT,
+    MESSAGE_BUS_LANES, MESSAGE_BUS_LANE_SCHEDULING, MESSAGE_BUS_SHARD_QUEUE_SIZE,
+    MESSAGE_BUS_BATCH_SIZE, REQUEST_TIMEOUT
+)
+
+def invoke_callback(topic, callback, item):
+    try:
+        callback(item)
+    except Exception as e:
+        logging.error(f"Error processing message in callback for topic {topic}: {e}")
+
+class DispatchShard(threading.Thread):
+    """Delivers messages for the subscribers hashed to this shard, in arrival order."""
+
+    def __init__(self, index, maxsize=0):
+        super().__init__(name=f"MessageBus-shard-{index}")
+        self.index = index
+        self.deliveries = queue.Queue(maxsize)
+        self.depth_lock = threading.Lock()
+        self.pending_count = 0
+        self.delivered_count = 0
+        self._is_running = True
+        self.daemon = True
+
+    def submit(self, deliveries):
+        with self.depth_lock:
+            self.pending_count += len(deliveries)
+        self.deliveries.put(deliveries)
+
+    def depth(self):
+        return self.pending_count
+
+    def run(self):
+        while self._is_running:
+            try:
+                deliveries = self.deliveries.get(timeout=MESSAGE_BUS_PULL_TIMEOUT)
+            except queue.Empty:
+                continue
+            for topic, callback, item in deliveries:
+                invoke_callback(topic, callback, item)
+            with self.depth_lock:
+                self.pending_count -= len(deliveries)
+            self.delivered_count += len(deliveries)
+
+    def stop(self):
+        self._is_running = False
 
 class MessageBus(threading.Thread):
-    def __init__(self):
+    def __init__(self, dispatch_threads=MESSAGE_BUS_DISPATCH_THREADS, lanes=MESSAGE_BUS_LANES,
+                 lane_scheduling=MESSAGE_BUS_LANE_SCHEDULING, send_timeout=MESSAGE_BUS_SEND_TIMEOUT,
+                 conflated_topics=CONFLATED_TOPICS, batch_size=MESSAGE_BUS_BATCH_SIZE):
         super().__init__(name="MessageBus")
-        self.message_queue = queue.Queue()
-        self.subscribers = defaultdict(list)
-        self.lock = threading.Lock()
+        self.message_queue = PriorityLanes(lanes, TOPIC_LANES, DEFAULT_LANE, lane_scheduling, conflated_topics)
+        self.send_timeout = send_timeout
+        self.batch_size = batch_size
+        self.subscriptions = SubscriptionTable()
+        self.batch_subscriptions = SubscriptionTable()
+        self.shards = [DispatchShard(i, MESSAGE_BUS_SHARD_QUEUE_SIZE) for i in range(dispatch_threads)]
+        self.requests = RequestTracker(new_reply_address("bus"))
+        self.subscriptions.add(TOPIC_REPLY, self.requests.resolve, self.requests.reply_address)
         self._is_running = True
         self.daemon = True
 
-    def subscribe(self, topic, callback):
-        with self.lock:
-            self.subscribers[topic].append(callback)
-        logging.info(f"New subscription to topic '{topic}'")
+    def subscribe(self, topic, callback, agent_id=None):
+        agent_id = self.subscriptions.add(topic, callback, agent_id)
+        logging.info(f"New subscription to topic '{topic}'" + (f" for agent '{agent_id}'" if agent_id else ""))
+
+    def subscribe_batch(self, topic, callback, agent_id=None):
+        """Subscribe a callback that receives a list of every pending message for the topic at once."""
+        agent_id = self.batch_subscriptions.add(topic, callback, agent_id)
+        logging.info(f"New batch subscription to topic '{topic}'" + (f" for agent '{agent_id}'" if agent_id else ""))
+
+    def unsubscribe(self, callback):
+        self.subscriptions.remove(callback)
+        self.batch_subscriptions.remove(callback)
 
     def send_message(self, message):
-        self.message_queue.put(message)
+        """Queue a message for delivery.
+
+        Returns False if the message's lane dropped it. Raises LaneFullError if a
+        blocking lane stays full past the send timeout; the bus thread and the
+        shard threads never block on a full lane (see may_block).
+        """
+        block = self.may_block()
+        return self.message_queue.put(message, block=block, timeout=self.send_timeout)
+
+    def send_messages(self, messages):
+        """Queue several messages under a single lock acquisition.
+
+        Returns one accepted/dropped flag per message, in order. A LaneFullError
+        raised part way carries the flags of the messages before the full lane
+        in `results`; the rest were not queued.
+        """
+        block = self.may_block()
+        return self.message_queue.put_many(messages, block=block, timeout=self.send_timeout)
+
+    def may_block(self):
+        """Whether the calling thread may wait for room in a full lane.
+
+        Only the bus thread drains the lanes, and it waits on the bounded shard
+        queues. A callback running on a shard thread that waited on a full lane
+        could hold up the very dispatch that would free it, so the bus thread
+        and the shard threads fail fast instead.
+        """
+        current = threading.current_thread()
+        return current is not self and current not in self.shards
+
+    def request(self, topic, payload=None, timeout=REQUEST_TIMEOUT, recipient_id=None, sender_id=None):
+        """Send a request; the returned future resolves with the reply payload or raises TimeoutError."""
+        message, future = self.requests.open(topic, sender_id, payload, recipient_id, timeout)
+        self.send_message(message)
+        return future
+
+    def scatter_gather(self, topic, payload=None, timeout=REQUEST_TIMEOUT, recipient_id=BROADCAST,
+                       sender_id=None, expected_replies=None):
+        """Send a request to many responders; the future resolves with every reply payload received by the deadline."""
+        message, future = self.requests.open(topic, sender_id, payload, recipient_id, timeout, True, expected_replies)
+        self.send_message(message)
+        return future
+
+    def shard_for(self, shard_key):
+        return self.shards[hash(shard_key) % len(self.shards)]
+
+    def get_shard_depths(self):
+        return {shard.name: shard.depth() for shard in self.shards}
+
+    def get_lane_stats(self):
+        return self.message_queue.stats()
+
+    def dispatch(self, messages):
+        deliveries = defaultdict(list)
+        batches = {}
+        for message in messages:
+            topic = message.topic
+            recipient = message.recipient_id
+            for shard_key, callback in self.subscriptions.lookup(topic, recipient):
+                deliveries[shard_key].append((topic, callback, message))
+            for shard_key, callback in self.batch_subscriptions.lookup(topic, recipient):
+                batch = batches.get((topic, callback))
+                if batch is None:
+                    batch = batches[(topic, callback)] = []
+                    deliveries[shard_key].append((topic, callback, batch))
+                batch.append(message)
+
+        if not self.shards:
+            for shard_deliveries in deliveries.values():
+                for topic, callback, item in shard_deliveries:
+                    invoke_callback(topic, callback, item)
+            return
+
+        per_shard = defaultdict(list)
+        for shard_key, shard_deliveries in deliveries.items():
+            per_shard[self.shard_for(shard_key)].extend(shard_deliveries)
+        for shard, shard_deliveries in per_shard.items():
+            shard.submit(shard_deliveries)
 
     def run(self):
         logging.info("Message Bus is running.")
+        for shard in self.shards:
+            shard.start()
         while self._is_running:
             try:
-                message = self.message_queue.get(timeout=MESSAGE_BUS_PULL_TIMEOUT)
-                topic = message.get("topic")
-                recipient = message.get("recipient_id")
-                
-                with self.lock:
-                    subscribers = self.subscribers.get(topic, [])
-                
-                for callback in subscribers:
-                    try:
-                        if recipient:
-                            if hasattr(callback.__self__, 'agent_id') and callback.__self__.agent_id == recipient:
-                                callback(message)
-                        else:
-                            callback(message)
-                    except Exception as e:
-                        logging.error(f"Error processing message in callback for topic {topic}: {e}")
+                messages = self.message_queue.get_many(self.batch_size, timeout=MESSAGE_BUS_PULL_TIMEOUT)
             except queue.Empty:
                 continue
+            self.dispatch(messages)
+        for shard in self.shards:
+            shard.stop()
         logging.info("Message Bus is shutting down.")
 
     def stop(self):
-        self._is_running = False
\ No newline at end of file
+        self._is_running = False
@@ -1,24 +1,108 @@
-TOPIC_TASK_REQUEST = "task_request"
-TOPIC_TASK_EXECUTE = "task_execute"
-TOPIC_TASK_COMPLETED = "task_completed"
-TOPIC_AGENT_REGISTER = "agent_register"
-TOPIC_AGENT_HEARTBEAT = "agent_heartbeat"
-TOPIC_AGENT_STATUS_UPDATE = "agent_status"
-TOPIC_SYSTEM_LOG = "system_log"
-TOPIC_RESOURCE_UPDATE = "resource_update"
-TOPIC_SYSTEM_COMMAND = "system_command" 
+import sys
+
+TOPIC_TASK_REQUEST = sys.intern("task_request")
+TOPIC_TASK_EXECUTE = sys.intern("task_execute")
+TOPIC_TASK_COMPLETED = sys.intern("task_completed")
+TOPIC_AGENT_REGISTER = sys.intern("agent_register")
+TOPIC_AGENT_HEARTBEAT = sys.intern("agent_heartbeat")
+TOPIC_AGENT_STATUS_UPDATE = sys.intern("agent_status")
+TOPIC_SYSTEM_LOG = sys.intern("system_log")
+TOPIC_RESOURCE_UPDATE = sys.intern("resource_update")
+TOPIC_SYSTEM_COMMAND = sys.intern("system_command")
+TOPIC_REPLY = sys.intern("reply")
+TOPIC_WORKER_DISCOVERY = sys.intern("worker_discovery")
+TOPIC_CLUSTER_QUERY = sys.intern("cluster_query")
+TOPIC_TASK_RETURN = sys.intern("task_return")
+TOPIC_STEAL_CANDIDATES = sys.intern("steal_candidates")
+TOPIC_TASK_STEAL = sys.intern("task_steal")
+TOPIC_TASK_STOLEN = sys.intern("task_stolen")
 
 CMD_PAUSE_WORKER = "pause_worker"
 CMD_RESUME_WORKER = "resume_worker"
 CMD_SCALE_OUT = "scale_out"
 CMD_SCALE_IN = "scale_in"
 CMD_SHUTDOWN_WORKER = "shutdown_worker"
+CMD_CANCEL_TASK = "cancel_task"
+
+BROADCAST = "broadcast"
+
+LANE_CONTROL = "control"
+LANE_TASKS = "tasks"
+LANE_STATUS = "status"
+LANE_LOG = "log"
+
+TOPIC_LANES = {
+    TOPIC_SYSTEM_COMMAND: LANE_CONTROL,
+    TOPIC_TASK_EXECUTE: LANE_CONTROL,
+    TOPIC_AGENT_REGISTER: LANE_CONTROL,
+    TOPIC_TASK_COMPLETED: LANE_CONTROL,
+    TOPIC_REPLY: LANE_CONTROL,
+    TOPIC_WORKER_DISCOVERY: LANE_CONTROL,
+    TOPIC_CLUSTER_QUERY: LANE_CONTROL,
+    TOPIC_TASK_RETURN: LANE_CONTROL,
+    TOPIC_STEAL_CANDIDATES: LANE_CONTROL,
+    TOPIC_TASK_STEAL: LANE_CONTROL,
+    TOPIC_TASK_STOLEN: LANE_CONTROL,
+    TOPIC_TASK_REQUEST: LANE_TASKS,
+    TOPIC_AGENT_STATUS_UPDATE: LANE_STATUS,
+    TOPIC_AGENT_HEARTBEAT: LANE_STATUS,
+    TOPIC_RESOURCE_UPDATE: LANE_STATUS,
+    TOPIC_SYSTEM_LOG: LANE_LOG,
+}
+DEFAULT_LANE = LANE_CONTROL
+
+CONFLATED_TOPICS = frozenset({TOPIC_AGENT_STATUS_UPDATE, TOPIC_RESOURCE_UPDATE})
+
+class Message:
+    """A bus message.
+
+    Fields are slots rather than dict keys, so hot paths read them as plain
+    attributes. A message without a payload keeps payload=None; the dict is only
+    allocated when a handler first reads it through the mapping accessors
+    (message["payload"], message.get("payload", {})), which keep handlers
+    written against the old dict messages working.
+    """
+    __slots__ = ("topic", "sender_id", "recipient_id", "payload")
+
+    FIELDS = frozenset({"topic", "sender_id", "recipient_id", "payload"})
+
+    def __init__(self, topic, sender_id, payload=None, recipient_id=None):
+        self.topic = topic
+        self.sender_id = sender_id
+        self.recipient_id = recipient_id
+        self.payload = payload or None
+
+    def __getitem__(self, key):
+        if key == "payload":
+            return self.get_payload()
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if key == "payload":
+            return self.get_payload()
+        if key not in self.FIELDS:
+            return default
+        return getattr(self, key)
+
+    def get_payload(self):
+        if self.payload is None:
+            self.payload = {}
+        return self.payload
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def keys(self):
+        return ("topic", "sender_id", "recipient_id", "payload")
+
+    def to_dict(self):
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self):
+        return f"Message({self.to_dict()!r})"
 
 def create_message(topic, sender_id, payload=None, recipient_id=None):
     """Factory function to create a standardized message."""
-    return {
-        "topic": topic,
-        "sender_id": sender_id,
-        "recipient_id": recipient_id,
-        "payload": payload or {},
-    }
\ No newline at end of file
+    return Message(topic, sender_id, payload, recipient_id)
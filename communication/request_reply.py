@@ -0,0 +1,106 @@
+import itertools
+import os
+import threading
+from concurrent.futures import Future
+from communication.protocol import create_message, TOPIC_REPLY
+from utils.timer_wheel import get_timer_wheel
+
+class ReplyFuture(Future):
+    """Future for an outstanding request.
+
+    A plain request resolves with the first reply's payload and fails with
+    TimeoutError at its deadline. A gathering request collects every reply
+    payload and resolves with the list at the deadline, or earlier once the
+    expected number of replies has arrived.
+    """
+
+    def __init__(self, correlation_id, gather=False, expected_replies=None):
+        super().__init__()
+        self.correlation_id = correlation_id
+        self.gather = gather
+        self.expected_replies = expected_replies
+        self.replies = []
+        self.lock = threading.Lock()
+
+    def add_reply(self, payload):
+        with self.lock:
+            if self.done():
+                return
+            if not self.gather:
+                self.set_result(payload)
+                return
+            self.replies.append(payload)
+            if self.expected_replies is not None and len(self.replies) >= self.expected_replies:
+                self.set_result(list(self.replies))
+
+    def expect(self, count):
+        """Complete a gathering request as soon as `count` replies are in."""
+        with self.lock:
+            self.expected_replies = count
+            if not self.done() and len(self.replies) >= count:
+                self.set_result(list(self.replies))
+
+    def expire(self):
+        with self.lock:
+            if self.done():
+                return
+            if self.gather:
+                self.set_result(list(self.replies))
+            else:
+                self.set_exception(TimeoutError(f"No reply to request {self.correlation_id}"))
+
+class RequestTracker:
+    """Outstanding requests of one bus, keyed by correlation id.
+
+    Requests carry the correlation id and the bus's reply address in their
+    payload; responders answer with reply_to(), and each bus subscribes
+    resolve() to TOPIC_REPLY at its reply address. Deadlines run on the shared
+    timer wheel.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, reply_address):
+        self.reply_address = reply_address
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def open(self, topic, sender_id, payload, recipient_id, timeout, gather=False, expected_replies=None):
+        correlation_id = f"{self.reply_address}:{next(self._ids)}"
+        future = ReplyFuture(correlation_id, gather, expected_replies)
+        with self.lock:
+            self.pending[correlation_id] = future
+        timer_wheel = get_timer_wheel()
+        timer = timer_wheel.schedule(timeout, lambda: self.expire(correlation_id))
+        future.add_done_callback(lambda _: timer_wheel.cancel(timer))
+        # Drop gathered requests from the table as soon as they complete early.
+        future.add_done_callback(lambda _: self.discard(correlation_id))
+        request_payload = dict(payload or {}, correlation_id=correlation_id, reply_to=self.reply_address)
+        return create_message(topic, sender_id, request_payload, recipient_id), future
+
+    def resolve(self, message):
+        """Route a reply to its request; returns False if it belongs to another bus."""
+        payload = message.payload or {}
+        future = self.pending.get(payload.get("correlation_id"))
+        if future is None:
+            return False
+        future.add_reply(payload)
+        return True
+
+    def expire(self, correlation_id):
+        future = self.discard(correlation_id)
+        if future:
+            future.expire()
+
+    def discard(self, correlation_id):
+        with self.lock:
+            return self.pending.pop(correlation_id, None)
+
+def new_reply_address(prefix):
+    return f"{prefix}-{os.getpid()}-{next(RequestTracker._ids)}"
+
+def reply_to(request, sender_id, payload=None):
+    """Build the reply to a request message."""
+    request_payload = request.get_payload()
+    reply_payload = dict(payload or {}, correlation_id=request_payload.get("correlation_id"))
+    return create_message(TOPIC_REPLY, sender_id, reply_payload, request_payload.get("reply_to"))
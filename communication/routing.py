@@ -0,0 +1,44 @@
+import threading
+from collections import defaultdict
+from communication.protocol import BROADCAST
+
+def owner_agent_id(callback):
+    return getattr(getattr(callback, "__self__", None), "agent_id", None)
+
+class SubscriptionTable:
+    """Subscribers per topic plus a (topic, agent_id) index for directed messages.
+
+    Each entry is a (shard_key, callback) pair. The shard key is the owning agent
+    id, or the topic for callbacks that do not belong to an agent, so deliveries
+    to one subscriber can be kept in order.
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(list)
+        self.routes = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def add(self, topic, callback, agent_id=None):
+        if agent_id is None:
+            agent_id = owner_agent_id(callback)
+        shard_key = agent_id if agent_id is not None else topic
+        entry = (shard_key, callback)
+        # Lists are replaced rather than mutated so lookups never need the lock.
+        with self.lock:
+            self.subscribers[topic] = self.subscribers[topic] + [entry]
+            if agent_id is not None:
+                self.routes[(topic, agent_id)] = self.routes[(topic, agent_id)] + [entry]
+        return agent_id
+
+    def lookup(self, topic, recipient):
+        if recipient is None or recipient == BROADCAST:
+            return self.subscribers.get(topic, ())
+        return self.routes.get((topic, recipient), ())
+
+    def remove(self, callback):
+        with self.lock:
+            for table in (self.subscribers, self.routes):
+                for key, entries in list(table.items()):
+                    remaining = [entry for entry in entries if entry[1] is not callback]
+                    if len(remaining) != len(entries):
+                        table[key] = remaining
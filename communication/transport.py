@@ -0,0 +1,364 @@
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from communication.framing import (
+    FramedSocket, FRAME_MESSAGE, FRAME_SUBSCRIBE, FRAME_DELIVER,
+    decode_message, decode_value, deliver_frame, message_frame, subscribe_frame
+)
+from communication.protocol import TOPIC_REPLY, BROADCAST
+from communication.request_reply import RequestTracker, new_reply_address
+from communication.routing import owner_agent_id
+from config.settings import TRANSPORT_POOL_SIZE, TRANSPORT_COALESCE_DELAY, TRANSPORT_COALESCE_MAX_BYTES, REQUEST_TIMEOUT
+
+def default_ipc_address():
+    if hasattr(socket, "AF_UNIX"):
+        return os.path.join(tempfile.gettempdir(), f"mas-bus-{os.getpid()}.sock")
+    return ("127.0.0.1", 0)
+
+def parse_address(value):
+    """"host:port" becomes a TCP address; anything else is taken as a Unix socket path."""
+    host, sep, port = value.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return value
+
+def create_listener(address, backlog=128):
+    if isinstance(address, str):
+        if os.path.exists(address):
+            os.unlink(address)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(address)
+    sock.listen(backlog)
+    return sock
+
+def connect(address):
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.connect(address)
+    return sock
+
+class CoalescingWriter(threading.Thread):
+    """Write-behind queue for one connection.
+
+    Senders only append encoded frames; this thread writes everything pending
+    with one sendall, so frames queued while the previous write was in progress
+    go out together, Nagle-style, without delaying an isolated message. A
+    non-zero `delay` additionally holds the first frame back (up to
+    `max_bytes`) to build bigger writes on slow links, at a latency cost.
+    """
+
+    def __init__(self, framed, delay=TRANSPORT_COALESCE_DELAY, max_bytes=TRANSPORT_COALESCE_MAX_BYTES):
+        super().__init__(name="TransportWriter", daemon=True)
+        self.framed = framed
+        self.delay = delay
+        self.max_bytes = max_bytes
+        self.pending = []
+        self.pending_bytes = 0
+        self.condition = threading.Condition()
+        self.frames_written = 0
+        self.writes = 0
+        self._is_running = True
+
+    def write(self, data):
+        with self.condition:
+            if not self._is_running:
+                return False
+            self.pending.append(data)
+            self.pending_bytes += len(data)
+            if len(self.pending) == 1 or self.pending_bytes >= self.max_bytes:
+                self.condition.notify()
+            return True
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self._is_running and not self.pending:
+                    self.condition.wait()
+                if self.delay and self._is_running:
+                    deadline = time.monotonic() + self.delay
+                    while self._is_running and self.pending_bytes < self.max_bytes:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.condition.wait(remaining)
+                frames, self.pending, self.pending_bytes = self.pending, [], 0
+            if not frames:
+                return
+            try:
+                self.framed.send_frames(frames)
+            except OSError as e:
+                logging.error(f"Transport write failed: {e}")
+                self.close()
+                return
+            self.frames_written += len(frames)
+            self.writes += 1
+
+    def stats(self):
+        return {"frames": self.frames_written, "writes": self.writes, "pending_bytes": self.pending_bytes}
+
+    def close(self):
+        with self.condition:
+            self._is_running = False
+            self.condition.notify()
+
+class RemoteConnection(threading.Thread):
+    """Server side of one client connection: applies its subscriptions and publishes its messages."""
+
+    def __init__(self, server, framed):
+        super().__init__(name="TransportConnection", daemon=True)
+        self.server = server
+        self.framed = framed
+        self.writer = CoalescingWriter(framed, server.coalesce_delay)
+        self.forwarders = []
+
+    def run(self):
+        self.writer.start()
+        try:
+            while True:
+                frame_type, body = self.framed.recv_frame()
+                if frame_type == FRAME_MESSAGE:
+                    message, _ = decode_message(body)
+                    try:
+                        self.server.message_bus.send_message(message)
+                    except Exception as e:
+                        logging.error(f"Transport could not publish {message.topic} from {message.sender_id}: {e}")
+                elif frame_type == FRAME_SUBSCRIBE:
+                    topic, offset = decode_value(body, 0)
+                    agent_id, _ = decode_value(body, offset)
+                    self.subscribe(topic, agent_id)
+                else:
+                    logging.warning(f"Transport ignoring unexpected frame type {frame_type}")
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.close()
+
+    def subscribe(self, topic, agent_id):
+        def forward(message):
+            if not self.writer.write(deliver_frame(agent_id, message)):
+                logging.error(f"Transport failed to forward {message.topic} to {agent_id}: connection closed")
+        self.forwarders.append(forward)
+        self.server.message_bus.subscribe(topic, forward, agent_id=agent_id)
+
+    def close(self):
+        for forward in self.forwarders:
+            self.server.message_bus.unsubscribe(forward)
+        self.forwarders = []
+        self.writer.close()
+        self.framed.close()
+        self.server.connections.discard(self)
+
+class TransportServer(threading.Thread):
+    """Exposes a local MessageBus to agents running in other processes or on other nodes.
+
+    Clients (RemoteMessageBus) subscribe and publish over a stream socket using
+    the binary frames from communication.framing; their subscriptions are
+    registered on the local bus so routing and broadcast work unchanged.
+    """
+
+    def __init__(self, message_bus, address=None, coalesce_delay=TRANSPORT_COALESCE_DELAY):
+        super().__init__(name="TransportServer", daemon=True)
+        self.message_bus = message_bus
+        self.coalesce_delay = coalesce_delay
+        self.listener = create_listener(address or default_ipc_address())
+        self.address = self.listener.getsockname()
+        self.connections = set()
+        self._is_running = True
+
+    def run(self):
+        logging.info(f"Transport server listening on {self.address}")
+        while self._is_running:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                break
+            if sock.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connection = RemoteConnection(self, FramedSocket(sock))
+            self.connections.add(connection)
+            connection.start()
+        logging.info("Transport server is shutting down.")
+
+    def stop(self):
+        self._is_running = False
+        self.listener.close()
+        for connection in list(self.connections):
+            connection.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+class PooledConnection(threading.Thread):
+    """One persistent client connection of a ConnectionPool; reads the deliveries sent back on it."""
+
+    def __init__(self, pool, index):
+        super().__init__(name=f"TransportClient-{index}", daemon=True)
+        self.pool = pool
+        self.framed = FramedSocket(connect(pool.address))
+        self.writer = CoalescingWriter(self.framed, pool.coalesce_delay)
+
+    def run(self):
+        self.writer.start()
+        try:
+            while True:
+                frame_type, body = self.framed.recv_frame()
+                if frame_type != FRAME_DELIVER:
+                    continue
+                target, offset = decode_value(body, 0)
+                message, _ = decode_message(body, offset)
+                self.pool.deliver(target, message)
+        except (ConnectionError, OSError):
+            if not self.pool.closed:
+                logging.error(f"Lost connection to message bus at {self.pool.address}")
+
+    def close(self):
+        self.writer.close()
+        self.framed.close()
+
+class ConnectionPool:
+    """Persistent connections to one bus address, shared by every RemoteMessageBus in the process.
+
+    An agent's subscriptions and messages always go over the same connection
+    (picked by agent id), so the server sees them in the order the agent sent
+    them and deliveries to that agent come back in bus order.
+    """
+
+    pools = {}
+    pools_lock = threading.Lock()
+
+    @classmethod
+    def acquire(cls, address, size=TRANSPORT_POOL_SIZE, coalesce_delay=TRANSPORT_COALESCE_DELAY):
+        with cls.pools_lock:
+            pool = cls.pools.get(address)
+            if pool is None:
+                pool = cls.pools[address] = cls(address, size, coalesce_delay)
+            pool.users += 1
+            return pool
+
+    @classmethod
+    def release(cls, pool):
+        with cls.pools_lock:
+            pool.users -= 1
+            if pool.users > 0:
+                return
+            if cls.pools.get(pool.address) is pool:
+                del cls.pools[pool.address]
+        pool.close()
+
+    def __init__(self, address, size=TRANSPORT_POOL_SIZE, coalesce_delay=TRANSPORT_COALESCE_DELAY):
+        self.address = address
+        self.coalesce_delay = coalesce_delay
+        self.users = 0
+        self.closed = False
+        self.callbacks = defaultdict(list)
+        self.lock = threading.Lock()
+        self.connections = [PooledConnection(self, i) for i in range(max(1, size))]
+        for connection in self.connections:
+            connection.start()
+
+    def connection_for(self, key):
+        return self.connections[hash(key) % len(self.connections)]
+
+    def subscribe(self, topic, callback, agent_id):
+        key = (topic, agent_id)
+        with self.lock:
+            first = key not in self.callbacks
+            self.callbacks[key] = self.callbacks[key] + [callback]
+        # The server routes to (topic, agent_id) once; local callbacks fan out from here.
+        if first:
+            self.connection_for(agent_id if agent_id is not None else topic).writer.write(subscribe_frame(topic, agent_id))
+
+    def send(self, message):
+        return self.connection_for(message.sender_id).writer.write(message_frame(message))
+
+    def send_many(self, messages):
+        frames = defaultdict(list)
+        for message in messages:
+            frames[self.connection_for(message.sender_id)].append(message_frame(message))
+        written = {connection: connection.writer.write(b"".join(connection_frames)) for connection, connection_frames in frames.items()}
+        return [written[self.connection_for(message.sender_id)] for message in messages]
+
+    def deliver(self, target, message):
+        for callback in self.callbacks.get((message.topic, target), ()):
+            try:
+                callback(message)
+            except Exception as e:
+                logging.error(f"Error processing message in callback for topic {message.topic}: {e}")
+
+    def stats(self):
+        return {connection.name: connection.writer.stats() for connection in self.connections}
+
+    def close(self):
+        self.closed = True
+        for connection in self.connections:
+            connection.close()
+
+class RemoteMessageBus:
+    """MessageBus stand-in for agents in another process or on another node.
+
+    Talks to a TransportServer (the controller's local transport or a broker)
+    through the process-wide ConnectionPool for that address, so any number of
+    agents in one process share a few persistent connections.
+    """
+
+    def __init__(self, address, pool_size=TRANSPORT_POOL_SIZE, coalesce_delay=TRANSPORT_COALESCE_DELAY):
+        self.address = address
+        self.pool = ConnectionPool.acquire(address, pool_size, coalesce_delay)
+        self._is_running = True
+        self.requests = RequestTracker(new_reply_address(f"remote-{socket.gethostname()}"))
+        self.pool.subscribe(TOPIC_REPLY, self.requests.resolve, self.requests.reply_address)
+
+    def subscribe(self, topic, callback, agent_id=None):
+        if agent_id is None:
+            agent_id = owner_agent_id(callback)
+        self.pool.subscribe(topic, callback, agent_id)
+
+    def subscribe_batch(self, topic, callback, agent_id=None):
+        if agent_id is None:
+            agent_id = owner_agent_id(callback)
+        self.subscribe(topic, lambda message: callback([message]), agent_id)
+
+    def send_message(self, message):
+        return self.pool.send(message)
+
+    def send_messages(self, messages):
+        return self.pool.send_many(list(messages))
+
+    def request(self, topic, payload=None, timeout=REQUEST_TIMEOUT, recipient_id=None, sender_id=None):
+        """Send a request; the returned future resolves with the reply payload or raises TimeoutError."""
+        message, future = self.requests.open(topic, sender_id, payload, recipient_id, timeout)
+        self.send_message(message)
+        return future
+
+    def scatter_gather(self, topic, payload=None, timeout=REQUEST_TIMEOUT, recipient_id=BROADCAST,
+                       sender_id=None, expected_replies=None):
+        """Send a request to many responders; the future resolves with every reply payload received by the deadline."""
+        message, future = self.requests.open(topic, sender_id, payload, recipient_id, timeout, True, expected_replies)
+        self.send_message(message)
+        return future
+
+    def get_shard_depths(self):
+        return {}
+
+    def get_lane_stats(self):
+        return self.pool.stats()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        if self._is_running:
+            self._is_running = False
+            ConnectionPool.release(self.pool)
+
+    def join(self, timeout=None):
+        pass
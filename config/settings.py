@@ -1,5 +1,6 @@
 
 NUM_WORKERS = 5 
+AGENT_RUNTIME = "threads"
 INITIAL_NODES = ["node-1", "node-2", "node-3", "node-4", "node-5"] 
 TASK_GENERATION_INTERVAL = 0.2  
 
@@ -10,6 +11,10 @@ RESOURCE_MANAGER_CHECK_INTERVAL = 5
 
 TASK_EXECUTION_TIME_MIN = 2   
 TASK_EXECUTION_TIME_MAX = 6  
+TASK_WORKLOAD = "sleep"
+WORKER_SLOTS = 2
+WORKER_PREFETCH_DEPTH = 1
+CPU_WORK_ITERATIONS_PER_SECOND = 10_000_000
 
 
 HIGH_CPU_THRESHOLD = 70.0 
@@ -25,4 +30,64 @@ SCHEDULER_ID = "scheduler"
 DASHBOARD_ID = "dashboard"
 CLUSTER_MANAGER_ID = "cluster_manager"
 
-MESSAGE_BUS_PULL_TIMEOUT = 1.0 
\ No newline at end of file
+MESSAGE_BUS_PULL_TIMEOUT = 1.0
+MESSAGE_BUS_DISPATCH_THREADS = 4
+MESSAGE_BUS_SHARD_QUEUE_SIZE = 1000
+MESSAGE_BUS_BATCH_SIZE = 256
+MESSAGE_BUS_SEND_TIMEOUT = 5.0
+MESSAGE_BUS_LANE_SCHEDULING = "weighted"
+MESSAGE_BUS_LANES = {
+    "control": {"priority": 0, "weight": 8, "maxsize": 10000, "overflow": "block"},
+    "tasks": {"priority": 1, "weight": 4, "maxsize": 1000, "overflow": "block"},
+    "status": {"priority": 2, "weight": 2, "maxsize": 5000, "overflow": "drop_oldest"},
+    "log": {"priority": 3, "weight": 1, "maxsize": 5000, "overflow": "drop_newest"},
+}
+BROKER_ADDRESS = None
+BROKER_HOST = "127.0.0.1"
+BROKER_PORT = 7450
+TRANSPORT_POOL_SIZE = 2
+TRANSPORT_COALESCE_DELAY = 0.0
+TRANSPORT_COALESCE_MAX_BYTES = 65536
+REQUEST_TIMEOUT = 2.0
+DISCOVERY_TIMEOUT = 0.5
+DISCOVERY_MIN_INTERVAL = 5
+TIMER_WHEEL_TICK = 0.01
+TIMER_WHEEL_SLOTS = 64
+TIMER_WHEEL_LEVELS = 4
+TASK_EXECUTORS = {
+    "Render video frame sequence": "process",
+    "Run ML inference on image batch": "process",
+    "Calculate financial risk model for transaction": "process",
+}
+DEFAULT_TASK_EXECUTOR = "thread"
+PROCESS_POOL_SIZE = None
+SHARED_MEMORY_THRESHOLD = 65536
+TASK_PROGRESS_INTERVAL = 1.0
+WORK_STEALING = True
+WORK_STEAL_MAX_VICTIMS = 3
+WORK_STEAL_TIMEOUT = 0.5
+HEDGE_PERCENTILE = 95
+HEDGE_BUDGET_PERCENT = 5
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200
+HEDGE_CHECK_INTERVAL = 1.0
+RESOURCE_SAMPLE_INTERVAL = 1.0
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_TTL = 300
+TASK_BATCH_MAX_SIZE = 4
+TASK_BATCH_MAX_WAIT = 0.05
+BACKLOG_AGING_RATE = 0.1
+BACKLOG_WAIT_WINDOW = 1000
+LOCALITY_WAIT = 2.0
+PLACEMENT_STRATEGY = "most_free"
+PLACEMENT_HASH_REPLICAS = 64
+PREDICTOR_EWMA_ALPHA = 0.2
+PREDICTOR_WINDOW = 200
+PREDICTOR_MIN_SAMPLES = 5
+PREDICTOR_REKEY_INTERVAL = 1.0
+SHORTEST_JOB_FIRST = True
+DISPATCH_RETRY_DELAY = 1.0
+BACKLOG_SJF_SPAN = 0.9
+BACKLOG_SJF_SCALE = 10.0
+HEDGE_ESTIMATE_FACTOR = 1.5
+DASHBOARD_COMPLETED_WINDOW = 10000
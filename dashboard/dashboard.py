@@ -2,11 +2,12 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext
 import queue
 import time
+from collections import OrderedDict
 from datetime import datetime
 from communication.protocol import (
     TOPIC_AGENT_STATUS_UPDATE, TOPIC_SYSTEM_LOG, TOPIC_TASK_COMPLETED, TOPIC_AGENT_REGISTER
 )
-from config.settings import DASHBOARD_ID
+from config.settings import DASHBOARD_ID, DASHBOARD_COMPLETED_WINDOW
 
 class Dashboard:
     def __init__(self, root, message_bus, task_queue):
@@ -71,6 +72,8 @@ class Dashboard:
                                               font=("Arial", 12, "bold"))
         self.completed_tasks_label.pack()
         self.completed_count = 0
+        # Recently completed task ids, oldest first; a duplicate arrives soon after the first report.
+        self.completed_task_ids = OrderedDict()
         
         perf_frame = ttk.LabelFrame(metrics_frame, text="Performance", padding="10")
         perf_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
@@ -182,13 +185,17 @@ class Dashboard:
 
     def subscribe_to_topics(self):
         self.message_bus.subscribe(TOPIC_AGENT_REGISTER, 
-                                  lambda msg: self.gui_queue.put((self.handle_agent_update, msg)))
+                                  lambda msg: self.gui_queue.put((self.handle_agent_update, msg)),
+                                  agent_id=self.agent_id)
         self.message_bus.subscribe(TOPIC_AGENT_STATUS_UPDATE, 
-                                  lambda msg: self.gui_queue.put((self.handle_agent_update, msg)))
-        self.message_bus.subscribe(TOPIC_SYSTEM_LOG, 
-                                  lambda msg: self.gui_queue.put((self.update_log, msg)))
+                                  lambda msg: self.gui_queue.put((self.handle_agent_update, msg)),
+                                  agent_id=self.agent_id)
+        self.message_bus.subscribe_batch(TOPIC_SYSTEM_LOG, 
+                                  lambda msgs: self.gui_queue.put((self.update_logs, msgs)),
+                                  agent_id=self.agent_id)
         self.message_bus.subscribe(TOPIC_TASK_COMPLETED, 
-                                  lambda msg: self.gui_queue.put((self.update_completed_count, msg)))
+                                  lambda msg: self.gui_queue.put((self.update_completed_count, msg)),
+                                  agent_id=self.agent_id)
 
     def process_gui_queue(self):
         try:
@@ -221,6 +228,9 @@ class Dashboard:
         cpu_usage = payload.get("cpu_usage", current_metadata.get("cpu_usage", 0))
         memory_usage = payload.get("memory_usage", current_metadata.get("memory_usage", 0))
         tasks_completed = payload.get("tasks_completed", current_metadata.get("tasks_completed", 0))
+        slots = payload.get("slots", current_metadata.get("slots"))
+        free_slots = payload.get("free_slots", current_metadata.get("free_slots"))
+        queued_tasks = payload.get("queued_tasks", current_metadata.get("queued_tasks", 0))
 
         metadata = self.worker_metadata.setdefault(agent_id, {})
         metadata.update({
@@ -229,7 +239,10 @@ class Dashboard:
             "last_update": last_update,
             "cpu_usage": cpu_usage,
             "memory_usage": memory_usage,
-            "tasks_completed": tasks_completed
+            "tasks_completed": tasks_completed,
+            "slots": slots,
+            "free_slots": free_slots,
+            "queued_tasks": queued_tasks
         })
         
         tags = []
@@ -249,12 +262,19 @@ class Dashboard:
         memory_display = f"{memory_usage:.1f}%" if memory_usage > 0 else "--"
         tasks_display = str(tasks_completed) if tasks_completed > 0 else "0"
         
-        values_tuple = (agent_id, node_id, status, task_id, cpu_display, memory_display, tasks_display, last_update)
+        status_display = f"{status} {slots - free_slots}/{slots}" if slots and free_slots is not None else status
+        if queued_tasks:
+            status_display += f" +{queued_tasks}"
+        values_tuple = (agent_id, node_id, status_display, task_id, cpu_display, memory_display, tasks_display, last_update)
         if self.agent_status_tree.exists(agent_id):
             self.agent_status_tree.item(agent_id, values=values_tuple, tags=tags)
         else:
             self.agent_status_tree.insert("", "end", iid=agent_id, values=values_tuple, tags=tags)
 
+    def update_logs(self, messages):
+        for message in messages:
+            self.update_log(message)
+
     def update_log(self, message):
         log_entry = message["payload"]["log"]
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -293,6 +313,13 @@ class Dashboard:
             self.task_queue_label.config(foreground="#0066cc")
 
     def update_completed_count(self, message):
+        payload = message["payload"]
+        # Hedged tasks can report more than once, and cancelled copies report too.
+        if payload.get("status", "completed") != "completed" or payload.get("task_id") in self.completed_task_ids:
+            return
+        self.completed_task_ids[payload.get("task_id")] = None
+        if len(self.completed_task_ids) > DASHBOARD_COMPLETED_WINDOW:
+            self.completed_task_ids.popitem(last=False)
         self.completed_count += 1
         self.completed_tasks_label.config(text=f"Completed: {self.completed_count}")
         
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from config.settings import RESULT_CACHE_SIZE, RESULT_CACHE_TTL
+
+class ResultStorage:
+    """Results by key, optionally bounded.
+
+    With `max_entries` the least recently used result is evicted once the
+    store is full; with `ttl` a result expires that many seconds after it was
+    saved.
+    """
+
+    def __init__(self, max_entries=None, ttl=None):
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def save_result(self, task_id, result):
+        with self._lock:
+            self._results[task_id] = (result, time.monotonic())
+            self._results.move_to_end(task_id)
+            while self.max_entries is not None and len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+    def get_result(self, task_id):
+        with self._lock:
+            entry = self._results.get(task_id)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._results[task_id]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(task_id)
+            self.hits += 1
+            return entry[0]
+
+    def get_all_results(self):
+        with self._lock:
+            return {task_id: entry[0] for task_id, entry in self._results.items()}
+
+    def __len__(self):
+        return len(self._results)
+
+def content_key(data):
+    """Stable hash of task data, so identical payloads share a cache entry."""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+class ResultCache:
+    """Task results keyed by content, with singleflight execution.
+
+    run() returns a stored result when there is one. Otherwise the first
+    caller for a key computes it while later callers for the same key wait for
+    that result instead of computing it again. If the first computation fails,
+    one of the waiters takes over. A caller passing coalesce=False (a hedge
+    copy racing a straggler) never waits on an execution in flight: it
+    computes the result itself and stores it.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL):
+        self.storage = ResultStorage(max_entries, ttl)
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def run(self, key, compute, coalesce=True):
+        """Returns (result, source), source being "hit", "coalesced" or "miss"."""
+        if not coalesce:
+            with self.lock:
+                result = self.storage.get_result(key)
+                if result is not None:
+                    return result, "hit"
+                self.executions += 1
+            result = compute()
+            with self.lock:
+                self.storage.save_result(key, result)
+            return result, "miss"
+        while True:
+            with self.lock:
+                result = self.storage.get_result(key)
+                if result is not None:
+                    return result, "hit"
+                leader = self.in_flight.get(key)
+                if leader is None:
+                    leader = self.in_flight[key] = Future()
+                    self.executions += 1
+                    break
+                self.coalesced += 1
+            try:
+                return leader.result(), "coalesced"
+            except Exception:
+                continue
+
+        try:
+            result = compute()
+        except BaseException as e:
+            self.fail(key, e)
+            raise
+        self.finish(key, result)
+        return result, "miss"
+
+    def claim(self, keys):
+        """Batch form of run(): sort keys into stored results, executions to wait for, and keys to compute.
+
+        Returns (stored, waiting, claimed): results by key, in-flight futures
+        by key, and the keys the caller now leads and must settle with finish()
+        or fail(). A key repeated in `keys` counts as coalesced.
+        """
+        stored, waiting, claimed = {}, {}, []
+        with self.lock:
+            for key in keys:
+                if key in stored or key in waiting or key in claimed:
+                    self.coalesced += 1
+                    continue
+                result = self.storage.get_result(key)
+                if result is not None:
+                    stored[key] = result
+                elif key in self.in_flight:
+                    waiting[key] = self.in_flight[key]
+                    self.coalesced += 1
+                else:
+                    self.in_flight[key] = Future()
+                    self.executions += 1
+                    claimed.append(key)
+        return stored, waiting, claimed
+
+    def finish(self, key, result):
+        with self.lock:
+            self.storage.save_result(key, result)
+            leader = self.in_flight.pop(key)
+        leader.set_result(result)
+
+    def fail(self, key, error):
+        with self.lock:
+            leader = self.in_flight.pop(key)
+        leader.set_exception(error)
+
+    def stats(self):
+        with self.lock:
+            hits = self.storage.hits
+            lookups = hits + self.coalesced + self.executions
+            return {
+                "size": len(self.storage),
+                "hits": hits,
+                "coalesced": self.coalesced,
+                "misses": self.executions,
+                "hit_rate": round((hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+                "evictions": self.storage.evictions,
+                "expirations": self.storage.expirations,
+                "in_flight": len(self.in_flight)
+            }
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+def get_result_cache():
+    """The process-wide ResultCache shared by every worker in the process."""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache()
+        return _result_cache
@@ -13,10 +13,15 @@ from config import settings, logging_config
 from tasks.task import Task
 from tasks.task_queue import TaskQueue
 from tasks.scheduler import Scheduler
+from tasks.predictor import get_processing_time_predictor
 from communication.message_bus import MessageBus
+from communication.async_message_bus import AsyncMessageBus, SyncBusAdapter
+from communication.transport import TransportServer, RemoteMessageBus, parse_address
 from dashboard.dashboard import Dashboard
 
 from agents.worker_agent import WorkerAgent
+from agents.async_worker_agent import AsyncWorkerAgent
+from agents.worker_process import WorkerProcessHandle
 from agents.load_balancer import LoadBalancerAgent
 from agents.monitor_agent import MonitorAgent
 from agents.resource_manager import ResourceManagerAgent
@@ -39,8 +44,27 @@ def main():
     logging_config.setup_logging()
     logging.info("Starting Enhanced Multi-Agent System...")
 
-    message_bus = MessageBus()
-    task_queue = TaskQueue()
+    transport_server = None
+    if settings.BROKER_ADDRESS:
+        # Multi-node: the bus lives in broker.py; remote nodes attach their workers with worker_node.py.
+        worker_bus = message_bus = RemoteMessageBus(parse_address(settings.BROKER_ADDRESS))
+        worker_factory = lambda worker_id, node_id: WorkerAgent(worker_id, message_bus, node_id)
+    elif settings.AGENT_RUNTIME == "asyncio":
+        # Workers run as coroutines on the async bus; the remaining thread agents
+        # and the dashboard plug into it through the adapter.
+        worker_bus = AsyncMessageBus()
+        message_bus = SyncBusAdapter(worker_bus)
+        worker_factory = lambda worker_id, node_id: AsyncWorkerAgent(worker_id, worker_bus, node_id)
+    elif settings.AGENT_RUNTIME == "processes":
+        # Each worker is its own OS process talking to this bus over the local transport.
+        worker_bus = message_bus = MessageBus()
+        transport_server = TransportServer(message_bus)
+        worker_factory = lambda worker_id, node_id: WorkerProcessHandle(worker_id, node_id, transport_server.address)
+    else:
+        worker_bus = message_bus = MessageBus()
+        worker_factory = lambda worker_id, node_id: WorkerAgent(worker_id, message_bus, node_id)
+    predictor = get_processing_time_predictor()
+    task_queue = TaskQueue(estimate=predictor.estimate if settings.SHORTEST_JOB_FIRST else None)
     
     agents = []
     agents_lock = threading.Lock()
@@ -49,14 +73,14 @@ def main():
     for i in range(settings.NUM_WORKERS):
         worker_id = f"worker_initial_{i}"
         node_id = settings.INITIAL_NODES[i % len(settings.INITIAL_NODES)]
-        agents.append(WorkerAgent(worker_id, message_bus, node_id))
+        agents.append(worker_factory(worker_id, node_id))
 
     agents.append(LoadBalancerAgent(message_bus))
     agents.append(MonitorAgent(message_bus))
     agents.append(ResourceManagerAgent(message_bus, task_queue))
-    agents.append(ClusterManagerAgent(message_bus, agents, agents_lock))
+    agents.append(ClusterManagerAgent(message_bus, agents, agents_lock, worker_factory))
     data_file_path = "data/tasks.json"
-    scheduler = Scheduler(task_queue, message_bus, "data/tasks.json")
+    scheduler = Scheduler(task_queue, message_bus, "data/tasks.json", predictor)
     
     logging.info("Phase 2: Registering all agent subscriptions...")
     for agent in agents:
@@ -66,7 +90,9 @@ def main():
     app = Dashboard(root, message_bus, task_queue)
 
     logging.info("Phase 3: Starting all threads...")
-    message_bus.start()
+    worker_bus.start()
+    if transport_server:
+        transport_server.start()
     scheduler.start()
     for agent in agents:
         agent.start()
@@ -88,8 +114,10 @@ def main():
         scheduler.join(2)
         for agent in agents:
             agent.join(2)
-        message_bus.stop()
-        message_bus.join(2)
+        if transport_server:
+            transport_server.stop()
+        worker_bus.stop()
+        worker_bus.join(2)
         
         logging.info("System has been shut down.")
         root.destroy()
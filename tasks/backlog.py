@@ -0,0 +1,116 @@
+import heapq
+import itertools
+import time
+from config.settings import BACKLOG_AGING_RATE, BACKLOG_SJF_SPAN, BACKLOG_SJF_SCALE
+
+def backlog_key(priority, arrival, expected=None, aging_rate=BACKLOG_AGING_RATE,
+                sjf_span=BACKLOG_SJF_SPAN, sjf_scale=BACKLOG_SJF_SCALE):
+    """Sort key for a waiting task, lower is more urgent; TaskBacklog and TaskQueue share it.
+
+    `arrival` is in seconds from a fixed epoch, each worth `aging_rate`
+    priority levels. An `expected` run time e adds sjf_span * e / (e + sjf_scale),
+    which is always less than one priority level.
+    """
+    key = priority + aging_rate * arrival
+    if expected is not None:
+        expected = max(0.0, expected)
+        key += sjf_span * expected / (expected + sjf_scale)
+    return key
+
+class TaskBacklog:
+    """Tasks waiting for a worker, most urgent first.
+
+    Lower priority numbers are more urgent, as in TaskQueue. A task's key is
+    its priority plus `aging_rate` times the seconds since the backlog was
+    created, so every second spent waiting is worth `aging_rate` priority
+    levels: a priority-10 task goes ahead of priority-1 tasks that arrive more
+    than 9 / aging_rate seconds after it. Keys only change in reprioritize(),
+    so push and pop are O(log n).
+
+    With `estimate`, a task's key also grows with its expected run time e,
+    by `sjf_span` * e / (e + `sjf_scale`). The term orders tasks of one
+    priority shortest first but stays below `sjf_span` (less than one priority
+    level), so an estimate never moves a task past another priority class. A
+    long task is passed only by tasks of its priority arriving less than
+    `sjf_span` / aging_rate seconds after it.
+
+    Tasks are also kept in one heap per `group(task)`, so take() can pull the
+    most urgent tasks of one type for a batch. An entry removed through one
+    heap is marked dead and skipped when it reaches the top of the other.
+    """
+
+    def __init__(self, group, aging_rate=BACKLOG_AGING_RATE, estimate=None,
+                 sjf_span=BACKLOG_SJF_SPAN, sjf_scale=BACKLOG_SJF_SCALE):
+        self.group = group
+        self.aging_rate = aging_rate
+        self.estimate = estimate
+        self.sjf_span = sjf_span
+        self.sjf_scale = sjf_scale
+        self.epoch = time.time()
+        self.heap = []
+        self.groups = {}
+        self.sequence = itertools.count()
+        self.size = 0
+
+    def push(self, task, enqueued_at=None):
+        """Queue a task; a task coming back keeps its original `enqueued_at`, and so its place."""
+        if enqueued_at is None:
+            enqueued_at = time.time()
+        entry = [self.key(task, enqueued_at), next(self.sequence), task, enqueued_at, True]
+        heapq.heappush(self.heap, entry)
+        heapq.heappush(self.groups.setdefault(self.group(task), []), entry)
+        self.size += 1
+
+    def key(self, task, enqueued_at):
+        expected = self.estimate(task) if self.estimate is not None else None
+        return backlog_key(task.get("priority", 10), enqueued_at - self.epoch, expected,
+                           self.aging_rate, self.sjf_span, self.sjf_scale)
+
+    def reprioritize(self):
+        """Recompute every key, after the estimates have changed. O(n)."""
+        for entry in self.heap:
+            if entry[4]:
+                entry[0] = self.key(entry[2], entry[3])
+        heapq.heapify(self.heap)
+        for heap in self.groups.values():
+            heapq.heapify(heap)
+
+    def pop(self):
+        """Remove the most urgent task; returns (task, enqueued_at)."""
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            if entry[4]:
+                popped = self.remove(entry)
+                self.prune(self.group(entry[2]))
+                return popped
+        raise IndexError("pop from an empty backlog")
+
+    def take(self, group, limit):
+        """Remove up to `limit` of the most urgent tasks in `group`, as (task, enqueued_at) pairs."""
+        heap = self.groups.get(group, [])
+        taken = []
+        while heap and len(taken) < limit:
+            entry = heapq.heappop(heap)
+            if entry[4]:
+                taken.append(self.remove(entry))
+        self.prune(group)
+        while self.heap and not self.heap[0][4]:
+            heapq.heappop(self.heap)
+        return taken
+
+    def remove(self, entry):
+        entry[4] = False
+        self.size -= 1
+        return entry[2], entry[3]
+
+    def prune(self, group):
+        heap = self.groups.get(group)
+        if heap is None:
+            return
+        while heap and not heap[0][4]:
+            heapq.heappop(heap)
+        if not heap:
+            del self.groups[group]
+
+    def __len__(self):
+        return self.size
@@ -0,0 +1,91 @@
+import threading
+from collections import deque
+from agents.task_executors import expected_processing_time, task_type
+from config.settings import PREDICTOR_EWMA_ALPHA, PREDICTOR_WINDOW, PREDICTOR_MIN_SAMPLES
+
+class ProcessingTimePredictor:
+    """Learns how long tasks take from their completions.
+
+    Durations (start to TOPIC_TASK_COMPLETED, a batch's split over its
+    members) are tracked per template and per (template, node) as an EWMA
+    plus a window of recent samples for quantiles. Cache hits count too: a
+    template mostly served from the cache is cheap to run. Estimates use the
+    most specific stats with PREDICTOR_MIN_SAMPLES samples, and fall back to
+    expected_processing_time() for templates not seen yet.
+    """
+
+    def __init__(self, alpha=PREDICTOR_EWMA_ALPHA, window=PREDICTOR_WINDOW, min_samples=PREDICTOR_MIN_SAMPLES):
+        self.alpha = alpha
+        self.window = window
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.version = 0
+
+    def observe(self, task, node_id, duration):
+        template = task_type(task)
+        with self.lock:
+            for key in ((template, None), (template, node_id)):
+                stats = self.stats.get(key)
+                if stats is None:
+                    stats = self.stats[key] = {"ewma": duration, "count": 0, "samples": deque(maxlen=self.window)}
+                else:
+                    stats["ewma"] += self.alpha * (duration - stats["ewma"])
+                stats["count"] += 1
+                stats["samples"].append(duration)
+            self.version += 1
+
+    def lookup(self, task, node_id):
+        template = task_type(task)
+        for key in ((template, node_id), (template, None)):
+            stats = self.stats.get(key)
+            if stats is not None and stats["count"] >= self.min_samples:
+                return stats
+        return None
+
+    def estimate(self, task, node_id=None):
+        """Expected seconds to run `task`, on `node_id` when given."""
+        with self.lock:
+            stats = self.lookup(task, node_id)
+            return stats["ewma"] if stats else expected_processing_time(task)
+
+    def known(self, task, node_id=None):
+        """Whether estimates for `task` come from observed durations rather than the fallback."""
+        with self.lock:
+            return self.lookup(task, node_id) is not None
+
+    def quantile(self, task, q, node_id=None):
+        """The `q` quantile (0 to 1) of recent durations of tasks like `task`."""
+        with self.lock:
+            stats = self.lookup(task, node_id)
+            if stats is None:
+                return expected_processing_time(task)
+            ordered = sorted(stats["samples"])
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def summary(self):
+        """Per template: samples seen, EWMA, p50 and p95 of the recent window."""
+        with self.lock:
+            summary = {}
+            for (template, node_id), stats in self.stats.items():
+                if node_id is not None:
+                    continue
+                ordered = sorted(stats["samples"])
+                summary[template] = {
+                    "count": stats["count"],
+                    "ewma": stats["ewma"],
+                    "p50": ordered[len(ordered) // 2],
+                    "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                }
+            return summary
+
+_predictor = None
+_predictor_lock = threading.Lock()
+
+def get_processing_time_predictor():
+    """The process-wide predictor, fed by the load balancer and read by the scheduler."""
+    global _predictor
+    with _predictor_lock:
+        if _predictor is None:
+            _predictor = ProcessingTimePredictor()
+        return _predictor
@@ -1,20 +1,25 @@
 import threading
 import logging
 import queue
+from communication.lanes import LaneFullError
 from communication.protocol import create_message, TOPIC_TASK_REQUEST
-from config.settings import SCHEDULER_ID, LOAD_BALANCER_ID
+from config.settings import SCHEDULER_ID, LOAD_BALANCER_ID, PREDICTOR_REKEY_INTERVAL
+from tasks.predictor import get_processing_time_predictor
 from tasks.task import Task
 from data.processor import process_data_from_file
 import time
 
 class Scheduler(threading.Thread):
-    def __init__(self, task_queue, message_bus, data_file_path):
+    def __init__(self, task_queue, message_bus, data_file_path, predictor=None):
         super().__init__(name=SCHEDULER_ID)
         self.task_queue = task_queue
         self.message_bus = message_bus
         self.data_file_path = data_file_path
         self._is_running = True
         self.daemon = True
+        self.predictor = predictor or get_processing_time_predictor()
+        self.predictor_version = self.predictor.version
+        self.last_reprioritized = time.time()
 
     def run(self):
         logging.info("Scheduler is running, watching the central task queue.")
@@ -24,6 +29,8 @@ class Scheduler(threading.Thread):
                 task = self.task_queue.get_task(block=True)
                 if task is None:
                     continue
+                if time.time() - self.last_reprioritized >= PREDICTOR_REKEY_INTERVAL:
+                    self.reprioritize_queue()
                 task_payload = {
                     "task_id": task.task_id,
                     "data": task.data,
@@ -36,7 +43,13 @@ class Scheduler(threading.Thread):
                     sender_id=SCHEDULER_ID,
                     payload={"task": task_payload}
                 )
-                self.message_bus.send_message(msg)
+                try:
+                    self.message_bus.send_message(msg)
+                except LaneFullError as e:
+                    logging.warning(f"{e}; returning task {task.task_id} to the queue and backing off.")
+                    self.task_queue.add_task(task)
+                    threading.Event().wait(1)
+                    continue
                 time.sleep(0.1)
             except queue.Empty:
                 continue
@@ -45,6 +58,14 @@ class Scheduler(threading.Thread):
                 threading.Event().wait(1)
         logging.info("Scheduler is shutting down.")
 
+    def reprioritize_queue(self):
+        """Re-order the queue once the predictor has learned something since the last time."""
+        version = self.predictor.version
+        if version != self.predictor_version and len(self.task_queue):
+            self.task_queue.reprioritize()
+        self.predictor_version = version
+        self.last_reprioritized = time.time()
+
     def load_initial_tasks(self):
         logging.info(f"Performing initial task load from: {self.data_file_path}")
         try:
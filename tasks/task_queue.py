@@ -1,22 +1,59 @@
+import heapq
+import itertools
+import math
 import queue
+import time
+from config.settings import BACKLOG_AGING_RATE
+from tasks.backlog import backlog_key
 
 class TaskQueue:
-    def __init__(self):
+    """Tasks by priority with aging, keyed like TaskBacklog (see backlog_key).
+
+    A task ages from its creation_time, so one put back keeps its place. With
+    `estimate`, tasks of one priority go shortest expected run time first, but
+    aging still bounds how long a long task waits behind short ones.
+    """
+
+    def __init__(self, estimate=None, aging_rate=BACKLOG_AGING_RATE):
         self._queue = queue.PriorityQueue()
+        self.estimate = estimate
+        self.aging_rate = aging_rate
+        self.epoch = time.time()
+        self.sequence = itertools.count()
+
+    def expected_time(self, task):
+        if self.estimate is None:
+            return None
+        return self.estimate({"data": task.data, "location": task.data_location})
+
+    def key(self, task):
+        return backlog_key(task.priority, task.creation_time - self.epoch, self.expected_time(task), self.aging_rate)
 
     def add_task(self, task):
         if task is None:
-            self._queue.put((999, None)) 
+            self._queue.put((math.inf, next(self.sequence), None))
             return
-        self._queue.put((task.priority, task))
+        self._queue.put((self.key(task), next(self.sequence), task))
 
     def get_task(self, block=True, timeout=None):
         try:
-            priority, task = self._queue.get(block=block, timeout=timeout)
+            key, sequence, task = self._queue.get(block=block, timeout=timeout)
             return task
         except queue.Empty:
             return None
 
+    def reprioritize(self):
+        """Re-order queued tasks after the estimates have changed."""
+        if self.estimate is None:
+            return
+        with self._queue.mutex:
+            items = self._queue.queue
+            items[:] = [
+                (self.key(task) if task is not None else key, sequence, task)
+                for key, sequence, task in items
+            ]
+            heapq.heapify(items)
+
     def __len__(self):
         return self._queue.qsize()
 
@@ -0,0 +1,71 @@
+import logging
+import threading
+import time
+import psutil
+from config.settings import RESOURCE_SAMPLE_INTERVAL
+
+class ResourceSampler(threading.Thread):
+    """Samples node and process resource use every `interval` seconds and caches it.
+
+    One sampler serves every agent in the process, so psutil runs once per
+    interval however many workers report. The process figures include child
+    processes (the task process pool). Readers get the cached reading.
+    """
+
+    def __init__(self, interval=RESOURCE_SAMPLE_INTERVAL):
+        super().__init__(name="ResourceSampler", daemon=True)
+        self.interval = interval
+        self.process = psutil.Process()
+        self.children = {}
+        self.stopped = threading.Event()
+        psutil.cpu_percent(None)
+        self.process.cpu_percent(None)
+        self.reading = self.sample()
+
+    def sample(self):
+        memory = psutil.virtual_memory()
+        process_cpu = self.process.cpu_percent(None)
+        rss = self.process.memory_info().rss
+        children = {}
+        for child in self.process.children(recursive=True):
+            # cpu_percent() measures since the previous call on the same object.
+            child = self.children.get(child.pid, child)
+            try:
+                process_cpu += child.cpu_percent(None)
+                rss += child.memory_info().rss
+            except psutil.Error:
+                continue
+            children[child.pid] = child
+        self.children = children
+        return {
+            "timestamp": time.time(),
+            "node_cpu_percent": psutil.cpu_percent(None),
+            "node_memory_percent": memory.percent,
+            "process_cpu_percent": process_cpu,
+            "process_rss": rss,
+            "process_memory_percent": 100.0 * rss / memory.total,
+            "process_threads": self.process.num_threads(),
+            "child_processes": len(children)
+        }
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.reading = self.sample()
+            except psutil.Error as e:
+                logging.error(f"Resource sampling failed: {e}")
+
+    def stop(self):
+        self.stopped.set()
+
+_resource_sampler = None
+_resource_sampler_lock = threading.Lock()
+
+def get_resource_sampler():
+    """The process-wide ResourceSampler, started on first use."""
+    global _resource_sampler
+    with _resource_sampler_lock:
+        if _resource_sampler is None:
+            _resource_sampler = ResourceSampler()
+            _resource_sampler.start()
+        return _resource_sampler
@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from config.settings import TIMER_WHEEL_TICK, TIMER_WHEEL_SLOTS, TIMER_WHEEL_LEVELS
+
+class TimerHandle:
+    __slots__ = ("expiry", "callback", "interval_ticks", "slot", "cancelled")
+
+    def __init__(self, expiry, callback, interval_ticks):
+        self.expiry = expiry
+        self.callback = callback
+        self.interval_ticks = interval_ticks
+        self.slot = None
+        self.cancelled = False
+
+class TimerWheel(threading.Thread):
+    """Hierarchical timing wheel shared by every timer in the process.
+
+    Time is counted in ticks of `tick` seconds. Level 0 holds timers due within
+    the current rotation of `slots` ticks, and each higher level covers `slots`
+    times the span of the one below it. A timer is filed at the lowest level
+    where its expiry differs from the current tick; when the wheel reaches that
+    slot, the timer cascades down a level, until level 0 fires it. Scheduling and
+    cancelling are O(1). The single wheel thread sleeps until the next occupied
+    slot instead of ticking through empty ones.
+
+    Callbacks run on the wheel thread and must be short; agents hand them to
+    their own thread (see BaseAgent.schedule).
+    """
+
+    def __init__(self, tick=TIMER_WHEEL_TICK, slots=TIMER_WHEEL_SLOTS, levels=TIMER_WHEEL_LEVELS):
+        super().__init__(name="TimerWheel", daemon=True)
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.spans = [slots ** level for level in range(levels + 1)]
+        self.wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self.overflow = set()
+        self.origin = time.monotonic()
+        self.current_tick = 0
+        self.pending = 0
+        self.condition = threading.Condition()
+        self._is_running = True
+
+    def schedule(self, delay, callback, interval=None):
+        """Call `callback` after `delay` seconds, then every `interval` seconds if given. Returns a handle for cancel()."""
+        now_tick = int((time.monotonic() - self.origin) / self.tick)
+        interval_ticks = max(1, round(interval / self.tick)) if interval else None
+        with self.condition:
+            handle = TimerHandle(max(now_tick + max(1, round(delay / self.tick)), self.current_tick + 1), callback, interval_ticks)
+            self._place(handle)
+            self.pending += 1
+            self.condition.notify()
+        return handle
+
+    def cancel(self, handle):
+        with self.condition:
+            if handle.cancelled:
+                return
+            handle.cancelled = True
+            if handle.slot is not None:
+                handle.slot.discard(handle)
+                handle.slot = None
+                self.pending -= 1
+
+    def _place(self, handle):
+        expiry = max(handle.expiry, self.current_tick)
+        for level in range(self.levels):
+            if expiry // self.spans[level + 1] == self.current_tick // self.spans[level + 1]:
+                slot = self.wheels[level][(expiry // self.spans[level]) % self.slots]
+                break
+        else:
+            slot = self.overflow
+        slot.add(handle)
+        handle.slot = slot
+
+    def _next_event_tick(self):
+        """The next tick at which a slot fires or cascades; None if nothing is scheduled."""
+        if not self.pending:
+            return None
+        base = self.current_tick
+        for level in range(self.levels):
+            digit = (base // self.spans[level]) % self.slots
+            wheel = self.wheels[level]
+            for index in range(digit + 1, self.slots):
+                if wheel[index]:
+                    return (base // self.spans[level + 1]) * self.spans[level + 1] + index * self.spans[level]
+        return (base // self.spans[self.levels] + 1) * self.spans[self.levels]
+
+    def _advance_to(self, tick):
+        self.current_tick = tick
+        if tick % self.spans[self.levels] == 0:
+            cascading, self.overflow = self.overflow, set()
+            for handle in cascading:
+                self._place(handle)
+        for level in range(self.levels - 1, 0, -1):
+            if tick % self.spans[level] == 0:
+                slot = self.wheels[level][(tick // self.spans[level]) % self.slots]
+                cascading = list(slot)
+                slot.clear()
+                for handle in cascading:
+                    self._place(handle)
+        slot = self.wheels[0][tick % self.slots]
+        due = list(slot)
+        slot.clear()
+        for handle in due:
+            handle.slot = None
+            if handle.interval_ticks and not handle.cancelled:
+                handle.expiry += handle.interval_ticks
+                self._place(handle)
+            else:
+                self.pending -= 1
+        return due
+
+    def run(self):
+        while self._is_running:
+            with self.condition:
+                next_tick = self._next_event_tick()
+                now_tick = int((time.monotonic() - self.origin) / self.tick)
+                if next_tick is None or next_tick > now_tick:
+                    timeout = None if next_tick is None else (next_tick * self.tick + self.origin) - time.monotonic()
+                    self.condition.wait(timeout)
+                    continue
+                due = self._advance_to(next_tick)
+            for handle in due:
+                if handle.cancelled:
+                    continue
+                try:
+                    handle.callback()
+                except Exception as e:
+                    logging.error(f"Timer callback {getattr(handle.callback, '__name__', handle.callback)} failed: {e}")
+
+    def stop(self):
+        with self.condition:
+            self._is_running = False
+            self.condition.notify()
+
+_timer_wheel = None
+_timer_wheel_lock = threading.Lock()
+
+def get_timer_wheel():
+    """The process-wide TimerWheel, started on first use."""
+    global _timer_wheel
+    with _timer_wheel_lock:
+        if _timer_wheel is None:
+            _timer_wheel = TimerWheel()
+            _timer_wheel.start()
+        return _timer_wheel
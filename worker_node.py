@@ -0,0 +1,46 @@
+import sys
+import os
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+import argparse
+import logging
+import signal
+import threading
+
+from config import settings, logging_config
+from communication.transport import RemoteMessageBus, parse_address
+from agents.worker_agent import WorkerAgent
+
+def main():
+    """Runs a node's worker agents against a remote broker; they register with the load balancer as usual."""
+    parser = argparse.ArgumentParser(description="Run worker agents for one node against a message broker.")
+    parser.add_argument("--broker", default=f"{settings.BROKER_HOST}:{settings.BROKER_PORT}", help="host:port of broker.py")
+    parser.add_argument("--node", required=True, help="node id the workers report (matches task locations)")
+    parser.add_argument("--workers", type=int, default=settings.NUM_WORKERS)
+    args = parser.parse_args()
+
+    logging_config.setup_logging()
+    message_bus = RemoteMessageBus(parse_address(args.broker))
+    workers = [WorkerAgent(f"worker_{args.node}_{i}", message_bus, args.node) for i in range(args.workers)]
+    for worker in workers:
+        worker.register_subscriptions()
+    for worker in workers:
+        worker.start()
+    logging.info(f"Node {args.node} running {len(workers)} workers against {args.broker}")
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    try:
+        while not stopped.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    for worker in workers:
+        worker.stop()
+    for worker in workers:
+        worker.join(2)
+    message_bus.stop()
+
+if __name__ == "__main__":
+    main()